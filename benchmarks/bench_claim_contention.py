@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""Benchmark many agents claiming todo tasks at once.
+
+Usage:
+    python benchmarks/bench_claim_contention.py [--claimers 100] [--tasks 500]
+
+Creates ``--tasks`` todo tasks in a temporary data directory, then lets
+``--claimers`` concurrent agents take tasks until none are left, in two ways:
+
+- ``list+update``: ``GET /tasks/?status=todo``, pick the first task, then
+  ``PUT /tasks/status/{id}`` to inprogress (what agents did before)
+- ``claim``: ``POST /tasks/claim``
+
+Requests go through the ASGI app in process. For each way it prints the
+time to drain the queue, claim latency percentiles, response bytes per
+claim, how many tasks were handed to more than one agent, and how many
+requests failed (listing reads the database while updates write it).
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+os.environ["TASKHUB_DATA_DIR"] = tempfile.mkdtemp(prefix="taskhub-bench-")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx  # noqa: E402
+
+from taskhub_mcp.api import app  # noqa: E402
+from taskhub_mcp.api.dependencies import get_db  # noqa: E402
+
+
+def create_tasks(count: int):
+    rng = random.Random(0)
+    db = get_db()
+    db.truncate()
+    db.insert_multiple(
+        {
+            "id": f"task-{i:05d}",
+            "status": "todo",
+            "file_path": f"task-{i:05d}.md",
+            "priority": rng.choice(["high", "medium", "low", None]),
+            "updated_at": f"2025-01-01T00:00:{i % 60:02d}",
+        }
+        for i in range(count)
+    )
+
+
+class RequestFailed(Exception):
+    def __init__(self, size: int):
+        self.size = size
+
+
+async def list_and_update(client: httpx.AsyncClient, agent: str):
+    response = await client.get("/tasks/", params={"status": "todo"})
+    size = len(response.content)
+    if response.status_code != 200:
+        raise RequestFailed(size)
+    tasks = response.json()
+    if not tasks:
+        return None, size
+    task_id = tasks[0]["id"]
+    response = await client.put(f"/tasks/status/{task_id}", params={"new_status": "inprogress", "assignee": agent})
+    size += len(response.content)
+    if response.status_code != 200:
+        raise RequestFailed(size)
+    return task_id, size
+
+
+async def claim(client: httpx.AsyncClient, agent: str):
+    response = await client.post("/tasks/claim", params={"assignee": agent})
+    if response.status_code != 200:
+        raise RequestFailed(len(response.content))
+    task = response.json()["task"]
+    return (task["id"] if task else None), len(response.content)
+
+
+async def run(method, claimers: int, tasks: int):
+    create_tasks(tasks)
+    claimed = []
+    latencies = []
+    sizes = []
+    errors = 0
+
+    async def agent(name: str):
+        nonlocal errors
+        while True:
+            start = time.perf_counter()
+            try:
+                task_id, size = await method(client, name)
+            except RequestFailed as e:
+                errors += 1
+                sizes.append(e.size)
+                continue
+            latencies.append(time.perf_counter() - start)
+            sizes.append(size)
+            if task_id is None:
+                return
+            claimed.append(task_id)
+
+    # Failed requests come back as 500 responses instead of raising
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://taskhub") as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(agent(f"agent-{i}") for i in range(claimers)))
+        elapsed = time.perf_counter() - start
+
+    counts = Counter(claimed)
+    duplicated = sum(1 for c in counts.values() if c > 1)
+    latencies.sort()
+    return {
+        "seconds": elapsed,
+        "claims": len(claimed),
+        "unique": len(counts),
+        "duplicated": duplicated,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000,
+        "bytes_per_claim": sum(sizes) / max(1, len(claimed)),
+        "errors": errors,
+    }
+
+
+async def main_async(args):
+    print(f"{args.claimers} claimers, {args.tasks} todo tasks\n")
+    print(
+        f"{'method':<12} {'seconds':>8} {'claims':>7} {'unique':>7} {'dup':>5} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'bytes/claim':>12} {'errors':>7}"
+    )
+    for label, method in (("list+update", list_and_update), ("claim", claim)):
+        r = await run(method, args.claimers, args.tasks)
+        print(
+            f"{label:<12} {r['seconds']:8.2f} {r['claims']:7d} {r['unique']:7d} {r['duplicated']:5d} "
+            f"{r['p50_ms']:8.1f} {r['p95_ms']:8.1f} {r['bytes_per_claim']:12.0f} {r['errors']:7d}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--claimers", type=int, default=100)
+    parser.add_argument("--tasks", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
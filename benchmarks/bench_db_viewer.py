@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Benchmark db_viewer on a large database: load everything vs streaming.
+
+Usage:
+    python benchmarks/bench_db_viewer.py [--tasks 80000]
+
+Writes a TinyDB task database with ``--tasks`` tasks to a temporary
+directory, then measures the time and peak Python memory (tracemalloc) of:
+
+- ``load all``: ``TinyDB(path).all()`` and one table with every row (what
+  db_viewer did before)
+- ``first page``: the streaming viewer with ``--limit 100``
+- ``all pages``: the streaming viewer printing every row in pages
+- ``stats only``: the streaming viewer with ``--stats-only``
+
+Output is rendered to /dev/null. Times are measured in a separate run from
+memory, since tracing allocations slows Python down. Rendering every row
+takes minutes at the default size; pass a smaller ``--tasks`` for a quick run.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from rich.console import Console  # noqa: E402
+from tinydb import TinyDB  # noqa: E402
+
+from taskhub_mcp import db_viewer  # noqa: E402
+
+
+def write_database(path: Path, count: int):
+    rng = random.Random(0)
+    documents = {
+        str(i): {
+            "id": f"{rng.getrandbits(128):032x}",
+            "status": rng.choice(("todo", "inprogress", "review", "done")),
+            "file_path": f"features/task_{i}.md",
+            "updated_at": "2025-06-21T15:30:00.123456",
+            "priority": rng.choice(("high", "medium", "low", None)),
+            "assignee": rng.choice(("alice", "bob", "carol", None)),
+            "artifacts": None,
+            "depends_on": None,
+            "tags": None,
+        }
+        for i in range(1, count + 1)
+    }
+    with open(path, "w") as f:
+        json.dump({"_default": documents}, f)
+
+
+def load_all(path: Path):
+    tasks = TinyDB(str(path)).all()
+    table = db_viewer._new_table(1)
+    for idx, task in enumerate(tasks, 1):
+        db_viewer._add_row(table, idx, task)
+    db_viewer.console.print(table)
+
+
+def measure(run):
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=80000)
+    args = parser.parse_args()
+
+    path = Path(tempfile.mkdtemp(prefix="taskhub-bench-")) / "tasks_db.json"
+    write_database(path, args.tasks)
+    db_viewer.console = Console(file=open(os.devnull, "w"), width=160)
+
+    print(f"{args.tasks} tasks, {path.stat().st_size / 1024 / 1024:.1f} MB database\n")
+    print(f"{'method':<12} {'seconds':>8} {'peak MB':>8}")
+    for label, run in (
+        ("load all", lambda: load_all(path)),
+        ("first page", lambda: db_viewer.view_database(str(path), limit=100)),
+        ("all pages", lambda: db_viewer.view_database(str(path))),
+        ("stats only", lambda: db_viewer.view_database(str(path), stats_only=True)),
+    ):
+        elapsed, peak = measure(run)
+        print(f"{label:<12} {elapsed:8.2f} {peak / 1024 / 1024:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Benchmark execution start latency with and without the worker pool.
+
+Usage:
+    python benchmarks/bench_exec_start_latency.py [--runner native] [--runs 50] [--pool-size 4]
+
+Starts ``--runs`` short executions one after another and measures the time
+from the start request to the first byte in the execution's log, first with
+the worker pool disabled and then with ``--pool-size`` pooled workers.
+Executions are started a little apart, as requests usually arrive, so the
+pool has time to refill; the p50 and p95 latencies are printed for both.
+Everything runs in a temporary data directory.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+DATA_DIR = tempfile.mkdtemp(prefix="taskhub-bench-")
+os.environ["TASKHUB_DATA_DIR"] = DATA_DIR
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from taskhub_mcp.task_executor import TaskExecutor  # noqa: E402
+from taskhub_mcp.tmux_client import tmux_client  # noqa: E402
+
+SCRIPT = "#!/bin/bash\necho started\n"
+
+
+async def first_byte_latency(executor: TaskExecutor, task_id: str, runner: str) -> float:
+    """Start one execution and wait for the first byte of its log."""
+    start = time.perf_counter()
+    record = await executor.execute_task(task_id, SCRIPT, runner)
+    log_file = Path(record["log_file"])
+    while not log_file.exists() or log_file.stat().st_size == 0:
+        await asyncio.sleep(0.0005)
+    latency = time.perf_counter() - start
+    await executor.wait_for_completion(record["execution_id"])
+    return latency
+
+
+async def measure(runner: str, runs: int, pool_size: int, gap: float) -> list:
+    base = Path(DATA_DIR) / f"{runner}-{pool_size}"
+    (base / "tasks").mkdir(parents=True)
+    executor = TaskExecutor(tasks_dir=base / "tasks", logs_dir=base / "logs", pool_size=pool_size)
+    executor.runners[runner].pool.start()
+    # Let the pool fill before the first request
+    await asyncio.sleep(1.0)
+    latencies = []
+    try:
+        for i in range(runs):
+            task_id = f"bench{pool_size}-{i:04d}"
+            latencies.append(await first_byte_latency(executor, task_id, runner))
+            if runner == "tmux":
+                await executor.stop_task_execution(task_id)
+            await asyncio.sleep(gap)
+        if pool_size:
+            metrics = executor.pool_metrics()[runner]
+            print(f"  pool: {metrics['hits']} hits, {metrics['misses']} misses, {metrics['spawned']} spawned")
+    finally:
+        await executor.close()
+    return latencies
+
+
+def report(label: str, latencies: list):
+    ordered = sorted(latencies)
+    p50 = statistics.median(ordered) * 1000
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000
+    print(f"{label:<24} p50 {p50:8.2f} ms   p95 {p95:8.2f} ms   ({len(ordered)} runs)")
+    return p50
+
+
+async def run(args):
+    print(f"Starting {args.runs} {args.runner} executions per configuration in {DATA_DIR}\n")
+    cold = await measure(args.runner, args.runs, 0, args.gap)
+    warm = await measure(args.runner, args.runs, args.pool_size, args.gap)
+    cold_p50 = report("without pool", cold)
+    warm_p50 = report(f"pool of {args.pool_size}", warm)
+    if warm_p50 > 0:
+        print(f"\np50 speedup: {cold_p50 / warm_p50:.1f}x")
+    await tmux_client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runner", choices=["native", "tmux"], default="native")
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--gap", type=float, default=0.05, help="Seconds between executions")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Benchmark lease expiry with the timer wheel against a full scan per tick.
+
+Usage:
+    python benchmarks/bench_lease_wheel.py [--leases 100000] [--ticks 600] [--ttl 300]
+
+Holds ``--leases`` leases with TTLs spread up to ``--ttl`` seconds and
+simulates ``--ticks`` one-second ticks on a virtual clock. Each tick a
+hundredth of the leases is renewed by a heartbeat and the expired ones are
+collected, once with ``TimerWheel`` and once by scanning every lease, as a
+periodic sweep would. Prints the time per tick and per heartbeat. The
+wheel's slowest ticks are the ones that move a higher level's slot down.
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from taskhub_mcp.timer_wheel import TimerWheel  # noqa: E402
+
+
+def run_wheel(deadlines, renewals, ttl):
+    wheel = TimerWheel(0.0)
+    for key, deadline in deadlines.items():
+        wheel.schedule(key, deadline)
+    tick_times, renew_times, expired = [], [], 0
+    for now, renewed in enumerate(renewals, 1):
+        start = time.perf_counter()
+        for key in renewed:
+            if key in wheel:
+                wheel.schedule(key, now + ttl)
+        renew_times.append((time.perf_counter() - start) / max(1, len(renewed)))
+        start = time.perf_counter()
+        expired += len(wheel.advance(now))
+        tick_times.append(time.perf_counter() - start)
+    return tick_times, renew_times, expired
+
+
+def run_scan(deadlines, renewals, ttl):
+    deadlines = dict(deadlines)
+    tick_times, renew_times, expired = [], [], 0
+    for now, renewed in enumerate(renewals, 1):
+        start = time.perf_counter()
+        for key in renewed:
+            if key in deadlines:
+                deadlines[key] = now + ttl
+        renew_times.append((time.perf_counter() - start) / max(1, len(renewed)))
+        start = time.perf_counter()
+        due = [key for key, deadline in deadlines.items() if deadline <= now]
+        for key in due:
+            del deadlines[key]
+        expired += len(due)
+        tick_times.append(time.perf_counter() - start)
+    return tick_times, renew_times, expired
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--leases", type=int, default=100000)
+    parser.add_argument("--ticks", type=int, default=600)
+    parser.add_argument("--ttl", type=int, default=300)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    deadlines = {f"task-{i}": rng.uniform(1, args.ttl) for i in range(args.leases)}
+    keys = list(deadlines)
+    renewals = [rng.sample(keys, args.leases // 100) for _ in range(args.ticks)]
+
+    print(f"{args.leases} leases, {args.ticks} ticks, ttl {args.ttl}s, {args.leases // 100} heartbeats per tick\n")
+    print(
+        f"{'method':<8} {'tick p50 ms':>12} {'tick mean ms':>13} {'tick max ms':>12} "
+        f"{'heartbeat us':>13} {'expired':>8}"
+    )
+    for name, run in (("scan", run_scan), ("wheel", run_wheel)):
+        tick_times, renew_times, expired = run(deadlines, renewals, args.ttl)
+        print(
+            f"{name:<8} {statistics.median(tick_times) * 1000:12.3f} {statistics.mean(tick_times) * 1000:13.3f} "
+            f"{max(tick_times) * 1000:12.3f} "
+            f"{statistics.mean(renew_times) * 1e6:13.2f} {expired:8d}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Benchmark log tailing and cursor paging on a large synthetic log.
+
+Usage:
+    python benchmarks/bench_log_tail.py [--size-mb 1024] [--compare] [--keep]
+
+Writes a synthetic build log (1 GB by default) to a temporary directory,
+then times ``log_reader.tail`` and cursor paging. ``tracemalloc`` reports the
+peak Python allocation of each operation. With ``--compare`` the old
+``readlines()`` approach is timed too; on a 1 GB log it needs several GB of
+memory.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from taskhub_mcp import log_reader  # noqa: E402
+
+
+def write_log(path: Path, size_mb: int):
+    """Write a log of roughly ``size_mb`` MB with lines of varying length."""
+    rng = random.Random(0)
+    words = ["compiling", "linking", "module", "warning:", "test", "passed", "src/core/file.c", "PROGRESS:"]
+    chunks = [
+        "\n".join(" ".join(rng.choice(words) for _ in range(rng.randint(2, 30))) for _ in range(1000)) + "\n"
+        for _ in range(64)
+    ]
+    target = size_mb * 1024 * 1024
+    written = 0
+    with open(path, "w") as f:
+        while written < target:
+            chunk = chunks[rng.randrange(len(chunks))]
+            f.write(chunk)
+            written += len(chunk)
+
+
+def measure(label: str, fn, repeat: int = 5):
+    """Run ``fn`` and print its best time and peak allocation."""
+    best = float("inf")
+    peak = 0
+    for _ in range(repeat):
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    print(f"{label:<40} {best * 1000:10.2f} ms  peak {peak / 1024:10.1f} KiB")
+    return result
+
+
+def naive_tail(path: Path, count: int):
+    with open(path, "r") as f:
+        lines = f.readlines()
+    return [line.rstrip() for line in lines[-count:]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=1024, help="Size of the synthetic log")
+    parser.add_argument("--compare", action="store_true", help="Also time the readlines() approach")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated log")
+    args = parser.parse_args()
+
+    tmp_dir = Path(tempfile.mkdtemp(prefix="taskhub-bench-"))
+    path = tmp_dir / "synthetic.log"
+    print(f"Writing {args.size_mb} MB log to {path} ...")
+    start = time.perf_counter()
+    write_log(path, args.size_mb)
+    size = path.stat().st_size
+    print(f"  {size / 1024 / 1024:.0f} MB in {time.perf_counter() - start:.1f} s\n")
+
+    try:
+        for count in (100, 1000, 10000):
+            measure(f"tail {count} lines", lambda count=count: log_reader.tail(str(path), count))
+
+        page = log_reader.tail(str(path), 100)
+        measure("page before (100 lines)", lambda: log_reader.read_before(str(path), page.start_offset, 100))
+        measure("page after, start of file (100 lines)", lambda: log_reader.read_after(str(path), 0, 100))
+        middle = size // 2
+        measure("offset in the middle (100 lines)", lambda: log_reader.read_from_offset(str(path), middle, 100))
+
+        def walk_back(pages: int):
+            cursor = size
+            for _ in range(pages):
+                cursor = log_reader.read_before(str(path), cursor, 100).prev_cursor
+            return cursor
+
+        measure("walk back 100 pages of 100 lines", lambda: walk_back(100), repeat=3)
+
+        if args.compare:
+            measure("readlines() tail 100 lines", lambda: naive_tail(path, 100), repeat=1)
+    finally:
+        if args.keep:
+            print(f"\nLog kept at {path}")
+        else:
+            os.unlink(path)
+            tmp_dir.rmdir()
+
+
+if __name__ == "__main__":
+    main()
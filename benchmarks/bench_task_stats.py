@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Benchmark a board summary: GET /tasks/stats vs list_tasks for every status.
+
+Usage:
+    python benchmarks/bench_task_stats.py [--tasks 10000] [--runs 20]
+
+Creates ``--tasks`` tasks with random statuses, priorities and assignees in
+a temporary data directory, then builds the counts per status, priority and
+assignee ``--runs`` times, once by calling ``GET /tasks/?status=...`` for
+each status and counting on the client (what orchestrators did before),
+and once with ``GET /tasks/stats``. Prints the time and response bytes per
+summary.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+os.environ["TASKHUB_DATA_DIR"] = tempfile.mkdtemp(prefix="taskhub-bench-")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx  # noqa: E402
+
+from taskhub_mcp.api import app  # noqa: E402
+from taskhub_mcp.api.dependencies import get_db, get_task_stats  # noqa: E402
+
+STATUSES = ("todo", "inprogress", "review", "done")
+
+
+def create_tasks(count: int):
+    rng = random.Random(0)
+    db = get_db()
+    db.truncate()
+    db.insert_multiple(
+        {
+            "id": f"task-{i}",
+            "status": rng.choice(STATUSES),
+            "file_path": f"task_{i}.md",
+            "priority": rng.choice(("high", "medium", "low", None)),
+            "assignee": rng.choice(("alice", "bob", "carol", None)),
+            "updated_at": "2025-01-01T00:00:00",
+        }
+        for i in range(count)
+    )
+
+
+async def list_every_status(client: httpx.AsyncClient):
+    size = 0
+    by_priority, by_assignee = Counter(), Counter()
+    for status in STATUSES:
+        response = await client.get("/tasks/", params={"status": status})
+        size += len(response.content)
+        for task in response.json():
+            by_priority[task.get("priority") or "none"] += 1
+            by_assignee[task.get("assignee") or "unassigned"] += 1
+    return size
+
+
+async def stats(client: httpx.AsyncClient):
+    response = await client.get("/tasks/stats")
+    return len(response.content)
+
+
+async def main_async(args):
+    create_tasks(args.tasks)
+    get_task_stats()
+    print(f"{args.tasks} tasks, {args.runs} summaries\n")
+    print(f"{'method':<14} {'p50 ms':>9} {'bytes':>10}")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://taskhub") as client:
+        for label, method in (("list x4", list_every_status), ("stats", stats)):
+            times, size = [], 0
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                size = await method(client)
+                times.append(time.perf_counter() - start)
+            print(f"{label:<14} {statistics.median(times) * 1000:9.2f} {size:10d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
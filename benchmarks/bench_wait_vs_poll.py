@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Benchmark agents waiting for new tasks: polling list_tasks vs GET /tasks/wait.
+
+Usage:
+    python benchmarks/bench_wait_vs_poll.py [--agents 20] [--tasks 20] [--interval 0.5] [--backlog 200] [--poll-interval 0.25]
+
+Starts with ``--backlog`` todo tasks in a temporary data directory, then
+creates ``--tasks`` more, one every ``--interval`` seconds, while
+``--agents`` agents watch for new todo tasks in two ways:
+
+- ``poll``: ``GET /tasks/?status=todo`` every ``--poll-interval`` seconds
+- ``wait``: ``GET /tasks/wait?status=todo`` with the last version seen
+
+Requests go through the ASGI app in process. For each way it prints the
+number of requests and response bytes per agent, and how long after its
+creation agents noticed a task (p50 and max).
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ["TASKHUB_DATA_DIR"] = tempfile.mkdtemp(prefix="taskhub-bench-")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx  # noqa: E402
+
+from taskhub_mcp.api import app  # noqa: E402
+from taskhub_mcp.api.dependencies import get_db, get_task_changes  # noqa: E402
+
+
+def create_backlog(count: int):
+    db = get_db()
+    db.truncate()
+    db.insert_multiple(
+        {"id": f"backlog-{i}", "status": "todo", "file_path": f"backlog_{i}.md", "updated_at": "2025-01-01T00:00:00"}
+        for i in range(count)
+    )
+
+
+async def poll(client: httpx.AsyncClient, seen: set, args, stats: dict):
+    await asyncio.sleep(args.poll_interval)
+    response = await client.get("/tasks/", params={"status": "todo"})
+    stats["requests"] += 1
+    stats["bytes"] += len(response.content)
+    return [t["id"] for t in response.json() if t["id"] not in seen]
+
+
+async def wait(client: httpx.AsyncClient, seen: set, args, stats: dict):
+    params = {"status": "todo", "timeout": 30}
+    if stats.get("version") is not None:
+        params["since_version"] = stats["version"]
+    response = await client.get("/tasks/wait", params=params)
+    stats["requests"] += 1
+    stats["bytes"] += len(response.content)
+    result = response.json()
+    stats["version"] = result["version"]
+    return [c["task_id"] for c in result["changes"] if c["task_id"] not in seen]
+
+
+async def run(method, args):
+    create_backlog(args.backlog)
+    created = {}
+    delays = []
+    agent_stats = []
+
+    async def agent():
+        seen = {f"backlog-{i}" for i in range(args.backlog)}
+        stats = {"requests": 0, "bytes": 0, "version": None}
+        agent_stats.append(stats)
+        while len(seen) < args.backlog + args.tasks:
+            for task_id in await method(client, seen, args, stats):
+                seen.add(task_id)
+                if task_id in created:
+                    delays.append(time.perf_counter() - created[task_id])
+
+    async def producer():
+        for i in range(args.tasks):
+            await asyncio.sleep(args.interval)
+            start = time.perf_counter()
+            response = await client.post("/tasks/create", params={"title": f"new task {i}"})
+            created[response.json()["task"]["id"]] = start
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://taskhub", timeout=60) as client:
+        # The wait version starts at the feed's current one, so no agent misses a task
+        agents = [asyncio.create_task(agent()) for _ in range(args.agents)]
+        await asyncio.sleep(0.1)
+        await producer()
+        await asyncio.wait_for(asyncio.gather(*agents), 60)
+
+    return {
+        "requests": statistics.mean(s["requests"] for s in agent_stats),
+        "kb": statistics.mean(s["bytes"] for s in agent_stats) / 1024,
+        "p50_ms": statistics.median(delays) * 1000,
+        "max_ms": max(delays) * 1000,
+    }
+
+
+async def main_async(args):
+    get_task_changes()
+    print(f"{args.agents} agents, {args.tasks} new tasks every {args.interval}s, {args.backlog} backlog tasks\n")
+    print(f"{'method':<8} {'req/agent':>10} {'KB/agent':>9} {'notice p50 ms':>14} {'notice max ms':>14}")
+    for label, method in (("poll", poll), ("wait", wait)):
+        r = await run(method, args)
+        print(f"{label:<8} {r['requests']:10.1f} {r['kb']:9.1f} {r['p50_ms']:14.1f} {r['max_ms']:14.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--agents", type=int, default=20)
+    parser.add_argument("--tasks", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.5)
+    parser.add_argument("--backlog", type=int, default=200)
+    parser.add_argument("--poll-interval", type=float, default=0.25)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,19 @@
+import asyncio
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict
 from tinydb import TinyDB, Query
 from pathlib import Path
 from ..markdown_sync import MarkdownTaskParser, MarkdownTaskWriter
 from ..task_executor import TaskExecutor
-from ..config import DB_PATH, TASKS_DIR, LOGS_DIR
+from ..execution_scheduler import ExecutionScheduler
+from ..dag_scheduler import DagScheduler
+from ..task_queue import ClaimQueue
+from ..task_leases import LeaseManager
+from ..task_changes import TaskChangeFeed
+from ..task_stats import TaskStats
+from ..event_broadcaster import event_broadcaster
+from ..config import DB_PATH, TASKS_DIR, LOGS_DIR, REVIEW_ON_COMPLETE
 
 # Database setup
 def get_db():
@@ -18,9 +29,97 @@ def get_parser():
 def get_writer():
     return MarkdownTaskWriter(str(TASKS_DIR))
 
-# Task executor
+async def update_task_status(task_id: str, status: str, **event_fields: Any):
+    """Set a task's status in the index and its Markdown file, and broadcast it."""
+    db = get_db()
+    update_data = {"status": status, "updated_at": datetime.now().isoformat()}
+    if event_fields.get("artifacts"):
+        update_data["artifacts"] = event_fields["artifacts"]
+    if status != "inprogress":
+        update_data["lease_ttl"] = None
+        get_lease_manager().release(task_id)
+    db.update(update_data, TaskQuery.id == task_id)
+    updated_task = db.get(TaskQuery.id == task_id)
+    if updated_task is None:
+        return
+    get_writer().update_task_file(updated_task["file_path"], updated_task)
+    await event_broadcaster.broadcast_task_update(task_id=task_id, status=status, **event_fields)
+
+async def move_to_review(execution: Dict[str, Any]):
+    """Move a task that is still in progress to review once its execution finishes."""
+    if execution["status"] not in ("completed", "failed"):
+        return
+    if not execution.get("review_on_complete", REVIEW_ON_COMPLETE):
+        return
+    if execution.get("matrix_id"):
+        # Wait for the last run of the matrix
+        matrix = get_executor().get_matrix_status(execution["matrix_id"])
+        if matrix and matrix["status"] in ("queued", "running"):
+            return
+    task = get_db().get(TaskQuery.id == execution["task_id"])
+    if not task or task.get("status") != "inprogress":
+        return
+    await update_task_status(
+        task["id"],
+        "review",
+        execution_id=execution["execution_id"],
+        exit_code=execution.get("exit_code")
+    )
+
+# Task executor, shared by all requests so per-process state is not lost
+@lru_cache(maxsize=None)
 def get_executor():
-    return TaskExecutor(tasks_dir=TASKS_DIR, logs_dir=LOGS_DIR)
+    executor = TaskExecutor(tasks_dir=TASKS_DIR, logs_dir=LOGS_DIR)
+    executor.add_completion_listener(move_to_review)
+    return executor
+
+# Execution queue in front of the shared executor
+@lru_cache(maxsize=None)
+def get_scheduler():
+    return ExecutionScheduler(get_executor())
+
+# Dependency-ordered runs on top of the execution queue
+@lru_cache(maxsize=None)
+def get_dag_scheduler():
+    return DagScheduler(get_scheduler(), update_task_status)
+
+# Work queue for agents claiming todo tasks
+@lru_cache(maxsize=None)
+def get_claim_queue():
+    return ClaimQueue(DB_PATH)
+
+async def expire_lease(task_id: str, assignee: str):
+    """Return a task whose lease ran out to todo, unless it already moved on."""
+    task = await asyncio.to_thread(get_claim_queue().release, task_id, assignee)
+    if task is None:
+        return
+    await asyncio.to_thread(get_writer().update_task_file, task["file_path"], task)
+    await event_broadcaster.broadcast_task_update(
+        task_id=task_id,
+        status="todo",
+        reason="lease_expired",
+        previous_assignee=assignee
+    )
+
+# Leases on claimed tasks, expired back to todo when heartbeats stop
+@lru_cache(maxsize=None)
+def get_lease_manager():
+    return LeaseManager(expire_lease)
+
+# Numbered task changes for long-polling clients, fed by the event broadcaster
+@lru_cache(maxsize=None)
+def get_task_changes():
+    feed = TaskChangeFeed()
+    event_broadcaster.add_listener(feed.on_event)
+    return feed
+
+# Task counts per status, priority and assignee, kept current by task events
+@lru_cache(maxsize=None)
+def get_task_stats():
+    stats = TaskStats(lambda: get_db().all())
+    stats.load()
+    event_broadcaster.add_listener(stats.on_event)
+    return stats
 
 # Ensure tasks directory exists
 def ensure_tasks_directory():
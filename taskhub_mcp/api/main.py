@@ -1,16 +1,54 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from .routers import tasks, execution, help, events
+from .routers import tasks, dag, execution, help, events
+from .dependencies import get_db, get_executor, get_scheduler, get_dag_scheduler, get_lease_manager, get_task_changes, get_task_stats
+from ..event_broadcaster import event_broadcaster
+from ..log_lifecycle import log_lifecycle
+from ..log_search import log_searcher
+from ..tmux_client import tmux_client
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop the background services shared by all requests."""
+    await event_broadcaster.start()
+    # Listen before anything can change a task
+    get_task_changes()
+    await get_task_stats().start()
+    get_executor().recover()
+    get_executor().warm_up()
+    await get_scheduler().start()
+    await log_lifecycle.start()
+    get_lease_manager().recover(get_db().all())
+    await get_lease_manager().start()
+    try:
+        yield
+    finally:
+        await get_task_stats().stop()
+        await get_lease_manager().stop()
+        await log_lifecycle.stop()
+        log_searcher.close()
+        await get_dag_scheduler().close()
+        await get_scheduler().stop()
+        await get_executor().close()
+        await tmux_client.close()
+        await event_broadcaster.stop()
+
 
 app = FastAPI(
     title="TaskHub MCP",
     description="AI-first Git-native task management system designed for Claude and other AI agents",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Include routers
 app.include_router(tasks.router)
+# Before the execution router, whose /exec/{task_id} would match /exec/dag
+app.include_router(dag.router)
 app.include_router(execution.router)
 app.include_router(help.router)
-app.include_router(events.router)
\ No newline at end of file
+app.include_router(events.router)
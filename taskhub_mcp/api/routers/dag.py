@@ -0,0 +1,99 @@
+import asyncio
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, List, Literal, Tuple
+
+from ..dependencies import get_db, get_parser, get_dag_scheduler
+from ...dag_scheduler import select_tasks
+from ...task_graph import TaskGraph
+
+router = APIRouter(prefix="/exec/dag", tags=["Task Execution"])
+
+class DagRunRequest(BaseModel):
+    task_ids: Optional[List[str]] = None
+    max_parallel: Optional[int] = Field(None, gt=0, description="Executions of this run active at once")
+    runner: Optional[Literal["tmux", "native"]] = None
+    mark_done: bool = True
+
+def _load_run(task_ids: Optional[List[str]]) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """Read every task, and the cache settings of those the run will execute."""
+    tasks = get_db().all()
+    selected = select_tasks(TaskGraph(tasks), task_ids)
+    
+    # Cache settings and input files come from each task's frontmatter
+    parser = get_parser()
+    options = {}
+    for task in tasks:
+        if task["id"] not in selected:
+            continue
+        task_file = parser.base_path / task["file_path"]
+        metadata = parser.parse_task_file(task_file) if task_file.exists() else None
+        if metadata:
+            inputs = metadata.get("inputs") or []
+            options[task["id"]] = {
+                "use_cache": bool(metadata.get("cache")),
+                "inputs": [inputs] if isinstance(inputs, str) else inputs
+            }
+    return tasks, options
+
+@router.post("")
+async def run_dag(request: DagRunRequest = DagRunRequest()) -> Dict[str, Any]:
+    """Run tasks in dependency order
+
+    Runs `task_ids` (default: every task that is not done) together with the
+    unfinished tasks they depend on through `depends_on`. Every task whose
+    dependencies have succeeded is queued at once, up to `max_parallel`
+    (default: TASKHUB_MAX_CONCURRENT_EXECUTIONS); the others start as their
+    dependencies finish. With `mark_done`, tasks are set to done when their
+    execution succeeds, and to review when it fails. Tasks that depend on a
+    failed task are skipped. Use GET /exec/dag/{run_id} to follow the run.
+    """
+    try:
+        tasks, options = await asyncio.to_thread(_load_run, request.task_ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        run = get_dag_scheduler().start(
+            tasks,
+            targets=request.task_ids,
+            max_parallel=request.max_parallel,
+            runner=request.runner,
+            mark_done=request.mark_done,
+            options=options
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return run.summary()
+
+@router.get("")
+async def list_dag_runs() -> Dict[str, Any]:
+    """List recent DAG runs"""
+    runs = get_dag_scheduler().runs.values()
+    return {
+        "runs": [
+            {
+                "run_id": run.run_id,
+                "status": run.status,
+                "started_at": run.started_at,
+                "completed_at": run.completed_at,
+                "tasks": len(run.nodes)
+            }
+            for run in runs
+        ]
+    }
+
+@router.get("/{run_id}")
+async def dag_status(run_id: str) -> Dict[str, Any]:
+    """Get the progress of a DAG run, with its makespan and critical path"""
+    run = get_dag_scheduler().get(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="DAG run not found")
+    return run.summary()
+
+@router.delete("/{run_id}")
+async def cancel_dag(run_id: str) -> Dict[str, Any]:
+    """Stop starting new tasks of a DAG run; started executions keep running"""
+    if not await get_dag_scheduler().cancel(run_id):
+        raise HTTPException(status_code=404, detail="DAG run not found or already finished")
+    return get_dag_scheduler().get(run_id).summary()
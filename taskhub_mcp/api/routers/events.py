@@ -1,44 +1,23 @@
 """SSE event streaming endpoints."""
 
 import asyncio
+import json
 import logging
-from typing import AsyncGenerator
+from datetime import datetime, timezone
+from typing import Any, Iterator, Optional
 
-from fastapi import APIRouter, Request
-from sse_starlette.sse import EventSourceResponse
+from fastapi import APIRouter, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 
+from taskhub_mcp.config import WS_BATCH_MAX_EVENTS, WS_BATCH_WINDOW
 from taskhub_mcp.event_broadcaster import event_broadcaster
+from taskhub_mcp.api.services.sse_stream import SSEStreamResponse, sse_streams
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/events", tags=["events"])
 
 
-async def event_generator(request: Request, queue: asyncio.Queue) -> AsyncGenerator[str, None]:
-    """Generate SSE events for a client."""
-    logger.info("Starting SSE event stream for client")
-    
-    try:
-        while True:
-            # Check if client is still connected
-            if await request.is_disconnected():
-                logger.info("Client disconnected from SSE stream")
-                break
-            
-            try:
-                # Wait for events with timeout to allow periodic connection checks
-                event = await asyncio.wait_for(queue.get(), timeout=30.0)
-                yield f"data: {event}\n\n"
-            except asyncio.TimeoutError:
-                # Send keepalive ping
-                yield ": keepalive\n\n"
-            except Exception as e:
-                logger.error(f"Error in event generator: {e}")
-                break
-    finally:
-        await event_broadcaster.disconnect(queue)
-
-
 @router.get("/stream")
 async def stream_events(request: Request):
     """
@@ -65,15 +44,27 @@ async def stream_events(request: Request):
     }
     ```
     """
+    # Refuse new streams once the cap is reached instead of degrading everyone
+    if sse_streams.is_full:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many SSE connections, retry later",
+            headers={"Retry-After": "5"}
+        )
+    
     # Connect the client
     queue = await event_broadcaster.connect()
     
     # Send initial connection event
     await queue.put('{"event": "connected", "data": {"message": "SSE connection established"}}')
     
+    async def on_close():
+        await event_broadcaster.disconnect(queue)
+    
     # Return SSE response
-    return EventSourceResponse(
-        event_generator(request, queue),
+    return SSEStreamResponse(
+        queue,
+        on_close=on_close,
         headers={
             "Cache-Control": "no-cache",
             "X-Accel-Buffering": "no",  # Disable Nginx buffering
@@ -81,11 +72,148 @@ async def stream_events(request: Request):
     )
 
 
+def _split_param(value: Optional[str]) -> Optional[list]:
+    """Parse a comma-separated query parameter into a list."""
+    if not value:
+        return None
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _is_string_list(value: Any) -> bool:
+    """Whether a subscription field is null or a list of strings."""
+    return value is None or (isinstance(value, list) and all(isinstance(item, str) for item in value))
+
+
+async def _receive_subscriptions(websocket: WebSocket, queue: asyncio.Queue):
+    """Apply subscription changes sent by a WebSocket client."""
+    while True:
+        try:
+            message = json.loads(await websocket.receive_text())
+        except json.JSONDecodeError:
+            await websocket.send_json({"type": "error", "message": "Invalid JSON"})
+            continue
+        if not isinstance(message, dict) or message.get("action") != "subscribe":
+            await websocket.send_json({"type": "error", "message": "Unsupported message"})
+            continue
+        event_types = message.get("event_types")
+        task_ids = message.get("task_ids")
+        if not _is_string_list(event_types) or not _is_string_list(task_ids):
+            await websocket.send_json({
+                "type": "error",
+                "message": "event_types and task_ids must be lists of strings or null"
+            })
+            continue
+        event_broadcaster.set_filter(queue, event_types, task_ids)
+        await websocket.send_json({
+            "type": "subscribed",
+            "event_types": event_types,
+            "task_ids": task_ids
+        })
+
+
+@router.websocket("/ws")
+async def websocket_events(
+    websocket: WebSocket,
+    event_types: Optional[str] = None,
+    task_ids: Optional[str] = None
+):
+    """
+    Stream task events over a WebSocket.
+    
+    Receives the same events as /events/stream. Events arriving close
+    together are sent as one frame:
+    
+    ```json
+    {"type": "batch", "events": [{"id": "uuid", "event": "task_updated", ...}]}
+    ```
+    
+    Initial filters may be given as comma-separated `event_types` and
+    `task_ids` query parameters. Send
+    `{"action": "subscribe", "event_types": [...], "task_ids": [...]}` at any
+    time to replace them; `null` means no filtering on that field.
+    
+    permessage-deflate is negotiated by the server when the client offers it.
+    """
+    await websocket.accept()
+    queue = await event_broadcaster.connect()
+    event_broadcaster.set_filter(queue, _split_param(event_types), _split_param(task_ids))
+    receiver = asyncio.create_task(_receive_subscriptions(websocket, queue))
+    
+    try:
+        await websocket.send_json({"type": "connected", "message": "WebSocket connection established"})
+        while True:
+            getter = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait({getter, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if getter not in done:
+                getter.cancel()
+                break
+            
+            # Give closely spaced events a moment to arrive, then send them together
+            batch = [getter.result()]
+            if WS_BATCH_WINDOW > 0:
+                await asyncio.sleep(WS_BATCH_WINDOW)
+            while len(batch) < WS_BATCH_MAX_EVENTS and not queue.empty():
+                batch.append(queue.get_nowait())
+            
+            # Events are already serialized, so the frame is assembled without re-encoding
+            await websocket.send_text('{"type": "batch", "events": [' + ",".join(batch) + "]}")
+    except WebSocketDisconnect:
+        logger.info("Client disconnected from WebSocket stream")
+    except Exception as e:
+        logger.error(f"Error in WebSocket stream: {e}")
+    finally:
+        receiver.cancel()
+        if receiver.done() and not receiver.cancelled() and receiver.exception():
+            logger.info("WebSocket receive loop ended")
+        await event_broadcaster.disconnect(queue)
+
+
 @router.get("/status")
 async def event_status():
     """Get the status of the event broadcasting system."""
     return {
         "status": "active",
         "connected_clients": event_broadcaster.client_count,
+        "sse_connections": sse_streams.count,
+        "max_sse_connections": sse_streams.max_connections,
         "endpoint": "/api/events/stream"
-    }
\ No newline at end of file
+    }
+
+
+def _to_timestamp(value: Optional[datetime]) -> Optional[float]:
+    """Convert a query datetime to a UNIX timestamp, treating naive values as UTC."""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+@router.get("/history")
+def event_history(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    task_id: Optional[str] = None,
+    limit: Optional[int] = None,
+):
+    """
+    Stream past events from the durable event history.
+    
+    Events are returned as newline-delimited JSON in timestamp order, read
+    straight from the on-disk segments.
+    
+    Args:
+        since: Only include events at or after this time (ISO 8601, UTC if no offset)
+        until: Only include events at or before this time
+        task_id: Only include events for this task
+        limit: Maximum number of events to return
+    """
+    history = event_broadcaster.history
+    if history is None:
+        raise HTTPException(status_code=404, detail="Event history is disabled")
+    
+    def generate() -> Iterator[str]:
+        for event in history.query(_to_timestamp(since), _to_timestamp(until), task_id, limit):
+            yield event + "\n"
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
@@ -1,59 +1,317 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import Optional, Dict, Any
-from datetime import datetime
+import asyncio
+import json
+from fastapi import APIRouter, HTTPException, Header
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, List, Literal, Tuple, Union
+from datetime import datetime, timezone
 
-from ..dependencies import get_db, TaskQuery, get_writer, get_executor
+from ..dependencies import get_db, TaskQuery, get_parser, get_writer, get_executor, get_scheduler, update_task_status
+from ..services.sse_stream import SSEStreamResponse, encode_event, sse_streams
+from ...config import BATCH_MAX_TASKS
 from ...event_broadcaster import event_broadcaster
+from ...log_follower import log_follower
+from ...log_search import log_searcher
 
 router = APIRouter(prefix="/exec", tags=["Task Execution"])
 
-class TaskExecuteRequest(BaseModel):
+# Encoded log frames buffered per stream before reading more of the file
+LOG_STREAM_MAX_QUEUED_FRAMES = 64
+# Largest number of lines one log search returns
+LOG_SEARCH_MAX_LIMIT = 1000
+
+class ExecutionOptions(BaseModel):
+    runner: Optional[Literal["tmux", "native"]] = None
+    review_on_complete: Optional[bool] = None
+    cpu_limit: Optional[float] = Field(None, gt=0, description="CPUs the execution may use, e.g. 0.5")
+    memory_limit_mb: Optional[int] = Field(None, gt=0, description="Memory limit in MiB")
+    use_cache: Optional[bool] = None
+
+class TaskExecuteRequest(ExecutionOptions):
     script_content: Optional[str] = None
+    matrix: Optional[List[Dict[str, Any]]] = Field(
+        None, description="One parameter set per run; the runs execute side by side"
+    )
 
 class TaskExecutionResponse(BaseModel):
     execution_id: str
     task_id: str
     session_name: str
     log_file: str
-    started_at: str
+    started_at: Optional[str] = None
+    queued_at: Optional[str] = None
     status: str
+    queue_position: Optional[int] = None
+    exit_code: Optional[int] = None
+    cached: bool = False
+    artifacts: Optional[List[str]] = None
+    matrix_id: Optional[str] = None
+    matrix_index: Optional[int] = None
+    params: Optional[Dict[str, str]] = None
 
-@router.post("/{task_id}", response_model=TaskExecutionResponse)
-async def execute(task_id: str, request: TaskExecuteRequest = TaskExecuteRequest()):
-    """Execute a task in a tmux session"""
+class MatrixExecutionResponse(BaseModel):
+    matrix_id: str
+    task_id: str
+    executions: List[TaskExecutionResponse]
+
+class BatchExecuteRequest(ExecutionOptions):
+    task_ids: List[str]
+
+class BatchExecutionResponse(BaseModel):
+    executions: List[TaskExecutionResponse]
+    errors: Dict[str, str] = {}
+
+def _run_fields(request: ExecutionOptions) -> Dict[str, Any]:
+    """Per-run settings stored with the execution record."""
+    extra = {}
+    # Per-run override of TASKHUB_REVIEW_ON_COMPLETE
+    if request.review_on_complete is not None:
+        extra["review_on_complete"] = request.review_on_complete
+    if request.cpu_limit is not None:
+        extra["cpu_limit"] = request.cpu_limit
+    if request.memory_limit_mb is not None:
+        extra["memory_limit_mb"] = request.memory_limit_mb
+    return extra
+
+def _cache_settings(task: Dict[str, Any], use_cache: Optional[bool]) -> Tuple[bool, List[str]]:
+    """Whether a run uses the result cache, and its input files, from the task's frontmatter."""
+    parser = get_parser()
+    task_file = parser.base_path / task["file_path"]
+    metadata = parser.parse_task_file(task_file) if task_file.exists() else None
+    if use_cache is None:
+        use_cache = bool(metadata and metadata.get("cache"))
+    inputs = (metadata or {}).get("inputs") or []
+    if isinstance(inputs, str):
+        inputs = [inputs]
+    return use_cache, inputs
+
+async def _announce(execution_info: Dict[str, Any]):
+    """Broadcast that an execution was queued."""
+    if execution_info.get("cached"):
+        # Already finished and announced by the executor
+        return
+    # "started" follows from the scheduler
+    await event_broadcaster.broadcast_execution_event(
+        task_id=execution_info["task_id"],
+        event_type="queued",
+        execution_id=execution_info["execution_id"],
+        queue_position=execution_info["queue_position"],
+        **({"matrix_id": execution_info["matrix_id"]} if execution_info.get("matrix_id") else {})
+    )
+
+async def _set_statuses(task_ids: List[str], status: str):
+    """Set the status of many tasks in one index update and broadcast it."""
     db = get_db()
     writer = get_writer()
-    executor = get_executor()
+    db.update({"status": status, "updated_at": datetime.now().isoformat()}, TaskQuery.id.one_of(task_ids))
+    updated_tasks = db.search(TaskQuery.id.one_of(task_ids))
+    
+    def write_markdown():
+        for updated_task in updated_tasks:
+            writer.update_task_file(updated_task["file_path"], updated_task)
+    
+    await asyncio.to_thread(write_markdown)
+    for updated_task in updated_tasks:
+        await event_broadcaster.broadcast_task_update(task_id=updated_task["id"], status=status)
+
+@router.post("/batch", response_model=BatchExecutionResponse)
+async def execute_batch(request: BatchExecuteRequest) -> BatchExecutionResponse:
+    """Queue many tasks for execution in one call
+    
+    Takes the same options as POST /exec/{task_id}, applied to every task.
+    All tasks are looked up in one query and moved to inprogress in one
+    update before their runs are queued. The runs are queued concurrently
+    and start as slots free up (TASKHUB_MAX_CONCURRENT_EXECUTIONS). Tasks
+    that cannot be queued, for example because they do not exist or are
+    already running, are listed under `errors` with the reason and keep
+    their previous status; the others are queued regardless.
+    """
+    task_ids = list(dict.fromkeys(request.task_ids))
+    if not task_ids:
+        raise HTTPException(status_code=400, detail="No task IDs given")
+    if len(task_ids) > BATCH_MAX_TASKS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_TASKS} tasks can be executed in one batch")
+    
+    db = get_db()
+    scheduler = get_scheduler()
+    tasks = {task["id"]: task for task in db.search(TaskQuery.id.one_of(task_ids))}
+    errors = {task_id: "Task not found" for task_id in task_ids if task_id not in tasks}
+    extra = _run_fields(request)
+    
+    async def submit(task: Dict[str, Any]) -> Dict[str, Any]:
+        if request.use_cache is False:
+            use_cache, inputs = False, []
+        else:
+            use_cache, inputs = await asyncio.to_thread(_cache_settings, task, request.use_cache)
+        return await scheduler.submit(
+            task["id"],
+            priority=task.get("priority"),
+            runner=request.runner,
+            use_cache=use_cache,
+            inputs=inputs,
+            **extra
+        )
+    
+    found = [tasks[task_id] for task_id in task_ids if task_id in tasks]
+    if found:
+        # Mark the tasks in progress first: a run may finish before the others
+        # are queued, and moving a task to review on completion only applies
+        # to tasks in progress
+        await _set_statuses([task["id"] for task in found], "inprogress")
+    results = await asyncio.gather(*(submit(task) for task in found), return_exceptions=True)
+    executions = []
+    # Tasks that could not be queued go back to their previous status
+    restore: Dict[str, List[str]] = {}
+    for task, result in zip(found, results):
+        if isinstance(result, BaseException):
+            errors[task["id"]] = str(result) if isinstance(result, ValueError) else f"Execution failed: {result}"
+            if task.get("status") != "inprogress":
+                restore.setdefault(task.get("status") or "todo", []).append(task["id"])
+        else:
+            executions.append(result)
+    for status, restored_ids in restore.items():
+        await _set_statuses(restored_ids, status)
+    
+    # Runs queued later may have moved ahead of earlier ones
+    positions = scheduler.positions()
+    for execution_info in executions:
+        scheduler.annotate(execution_info, positions)
+        await _announce(execution_info)
+    
+    return BatchExecutionResponse(
+        executions=[TaskExecutionResponse(**e) for e in executions],
+        errors=errors
+    )
+
+@router.post("/{task_id}", response_model=Union[TaskExecutionResponse, MatrixExecutionResponse])
+async def execute(task_id: str, request: TaskExecuteRequest = TaskExecuteRequest()):
+    """Queue a task for execution in a tmux session or as a native process
+    
+    The execution starts as soon as a slot is free (TASKHUB_MAX_CONCURRENT_EXECUTIONS),
+    higher priority tasks first. The response reports the queue position.
+    Set `runner` to "native" for headless runs without tmux; the default
+    comes from TASKHUB_RUNNER. Only tmux executions can be attached to.
+    When the script exits, its exit code is recorded and a `completed`,
+    `failed` or `stopped` execution event is broadcast. Set
+    `review_on_complete` to move the task to review at that point
+    (default: TASKHUB_REVIEW_ON_COMPLETE).
+    `cpu_limit` (CPUs) and `memory_limit_mb` cap the execution's resources;
+    CPU time, peak memory, I/O and wall time are reported under `resources`
+    in the execution status.
+    With `use_cache` (or `cache: true` in the task frontmatter), a run whose
+    script and frontmatter `inputs` files match an earlier successful run
+    returns that run's log, exit code and artifacts at once, with
+    `cached: true`.
+    With `matrix`, a list of parameter sets, one run per set is queued under a
+    shared `matrix_id`. The runs execute side by side, each with its own log
+    and session, and get their parameters as environment variables. Follow
+    them with GET /exec/matrix/{matrix_id}.
+    """
+    db = get_db()
+    scheduler = get_scheduler()
     
     # Verify task exists
     task = db.get(TaskQuery.id == task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
+    extra = _run_fields(request)
+    if request.use_cache is False:
+        use_cache, inputs = False, []
+    else:
+        use_cache, inputs = await asyncio.to_thread(_cache_settings, task, request.use_cache)
+    
+    # Mark the task in progress first: a cached run finishes during submit,
+    # and moving the task to review on completion only applies to tasks in progress
+    await update_task_status(task_id, "inprogress")
     try:
-        execution_info = await executor.execute_task(task_id, request.script_content)
-        
-        # Update task status to inprogress
-        db.update({"status": "inprogress", "updated_at": datetime.now().isoformat()}, TaskQuery.id == task_id)
-        
-        # Update Markdown file
-        updated_task = db.get(TaskQuery.id == task_id)
-        writer.update_task_file(updated_task["file_path"], updated_task)
-        
-        # Broadcast execution started event
-        await event_broadcaster.broadcast_execution_event(
+        if request.matrix is not None:
+            matrix_info = await scheduler.submit_matrix(
+                task_id,
+                request.matrix,
+                priority=task.get("priority"),
+                script_content=request.script_content,
+                runner=request.runner,
+                use_cache=use_cache,
+                inputs=inputs,
+                **extra
+            )
+            executions = matrix_info["executions"]
+        else:
+            executions = [await scheduler.submit(
+                task_id,
+                priority=task.get("priority"),
+                script_content=request.script_content,
+                runner=request.runner,
+                use_cache=use_cache,
+                inputs=inputs,
+                **extra
+            )]
+    except Exception as e:
+        # Nothing was queued; put the task back
+        if task.get("status") != "inprogress":
+            await update_task_status(task_id, task.get("status") or "todo")
+        if isinstance(e, ValueError):
+            raise HTTPException(status_code=400, detail=str(e))
+        raise HTTPException(status_code=500, detail=f"Execution failed: {str(e)}")
+    
+    # One sort places every run of a matrix; a single run is found in one pass
+    positions = scheduler.positions() if request.matrix is not None else None
+    for execution_info in executions:
+        scheduler.annotate(execution_info, positions)
+        await _announce(execution_info)
+    
+    if request.matrix is not None:
+        return MatrixExecutionResponse(
+            matrix_id=matrix_info["matrix_id"],
             task_id=task_id,
-            event_type="started",
-            session_name=execution_info["session_name"],
-            log_file=execution_info["log_file"]
+            executions=[TaskExecutionResponse(**e) for e in executions]
         )
-        
-        return TaskExecutionResponse(**execution_info)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    return TaskExecutionResponse(**executions[0])
+
+@router.get("/cache/stats")
+async def cache_stats() -> Dict[str, Any]:
+    """Get execution cache size, hit ratio and eviction counts."""
+    return get_executor().cache.metrics()
+
+@router.get("/matrix/{matrix_id}")
+async def matrix_status(matrix_id: str) -> Dict[str, Any]:
+    """Get the combined status and the runs of a matrix execution
+    
+    `status` is `queued` or `running` while any run is unfinished, then
+    `failed` if any run failed, `stopped` if any was stopped, and `completed`
+    otherwise.
+    """
+    status = get_executor().get_matrix_status(matrix_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Matrix execution not found")
+    positions = get_scheduler().positions()
+    status["executions"] = [get_scheduler().annotate(e, positions) for e in status["executions"]]
+    return status
+
+@router.get("/status")
+async def exec_statuses(task_ids: Optional[str] = None) -> Dict[str, Any]:
+    """Get execution queue and worker pool metrics and, optionally, the status of several tasks.
+    
+    Args:
+        task_ids: Comma-separated task IDs
+    """
+    executor = get_executor()
+    scheduler = get_scheduler()
+    result: Dict[str, Any] = {"queue": scheduler.metrics(), "worker_pools": executor.pool_metrics()}
+    if task_ids is None:
+        return result
+    
+    ids = [task_id.strip() for task_id in task_ids.split(",") if task_id.strip()]
+    try:
+        statuses = await executor.get_execution_statuses(ids)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Execution failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    positions = scheduler.positions()
+    result["statuses"] = {
+        task_id: scheduler.annotate(status, positions) for task_id, status in statuses.items()
+    }
+    return result
 
 @router.get("/status/{task_id}")
 async def exec_status(task_id: str) -> Dict[str, Any]:
@@ -61,23 +319,200 @@ async def exec_status(task_id: str) -> Dict[str, Any]:
     executor = get_executor()
     try:
         status = await executor.get_execution_status(task_id)
-        return status
+        return get_scheduler().annotate(status)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/history/{task_id}")
+async def exec_history(task_id: str, limit: Optional[int] = 20) -> Dict[str, Any]:
+    """Get past executions of a task, newest first"""
+    executor = get_executor()
+    history = executor.get_execution_history(task_id, limit)
+    return {
+        "task_id": task_id,
+        "executions": history,
+        "count": len(history)
+    }
+
+@router.get("/logs/search")
+async def search_logs(
+    q: str,
+    task_id: Optional[str] = None,
+    since: Optional[str] = None,
+    ignore_case: bool = False,
+    limit: int = 100
+) -> Dict[str, Any]:
+    """Search the logs of all executions for a text
+    
+    Returns the lines containing `q`, newest execution first, with their byte
+    `offset` (usable as `offset` in GET /exec/logs/{task_id}) and line number.
+    Narrow the search with `task_id` and `since` (ISO timestamp, UTC unless
+    it has an offset; executions queued earlier are left out). Logs are
+    scanned in parallel; finished logs are indexed on their first search, so
+    later searches skip logs that cannot contain `q`.
+    """
+    if not q:
+        raise HTTPException(status_code=400, detail="q must not be empty")
+    if not 1 <= limit <= LOG_SEARCH_MAX_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {LOG_SEARCH_MAX_LIMIT}")
+    
+    executions = get_executor().registry.all(task_id)
+    if since is not None:
+        try:
+            cutoff = datetime.fromisoformat(since)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid since timestamp: {since}")
+        if cutoff.tzinfo is not None:
+            cutoff = cutoff.astimezone(timezone.utc).replace(tzinfo=None)
+        executions = [
+            e for e in executions
+            if (e.get("queued_at") or e.get("started_at"))
+            and datetime.fromisoformat(e.get("queued_at") or e.get("started_at")) >= cutoff
+        ]
+    
+    result = await log_searcher.search(executions, q, ignore_case=ignore_case, limit=limit)
+    return {"query": q, **result}
+
 @router.get("/logs/{task_id}")
-async def get_logs(task_id: str, tail: int = 100) -> Dict[str, Any]:
-    """Get execution logs for a task"""
+async def get_logs(
+    task_id: str,
+    tail: int = 100,
+    offset: Optional[int] = None,
+    limit: Optional[int] = None,
+    before: Optional[int] = None,
+    after: Optional[int] = None,
+    execution_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """Get execution logs for a task
+    
+    Returns the last `tail` lines by default. To page through large logs, pass
+    `after` or `before` with a cursor from a previous response (`next_cursor`,
+    `prev_cursor`), or `offset` to start at any byte position. `limit` sets the
+    page size in lines.
+    """
+    if sum(cursor is not None for cursor in (offset, before, after)) > 1:
+        raise HTTPException(status_code=400, detail="Use only one of offset, before and after")
+    
     executor = get_executor()
     try:
-        logs = await executor.get_execution_logs(task_id, tail)
-        return {
-            "task_id": task_id,
-            "logs": logs,
-            "line_count": len(logs)
-        }
+        page = await executor.read_execution_log(
+            task_id, tail, offset=offset, limit=limit, before=before, after=after, execution_id=execution_id
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    
+    if page is None:
+        logs = ["No logs found for this task"]
+        return {"task_id": task_id, "logs": logs, "line_count": len(logs)}
+    return {
+        "task_id": task_id,
+        "logs": page.lines,
+        "line_count": len(page.lines),
+        "start_offset": page.start_offset,
+        "end_offset": page.end_offset,
+        "file_size": page.file_size,
+        "prev_cursor": page.prev_cursor,
+        "next_cursor": page.next_cursor
+    }
+
+@router.get("/logs/{task_id}/stream")
+async def stream_logs(
+    task_id: str,
+    offset: Optional[int] = None,
+    execution_id: Optional[str] = None,
+    format: Literal["sse", "text"] = "sse",
+    last_event_id: Optional[str] = Header(None)
+):
+    """Follow an execution log as it is written
+    
+    Only newly appended bytes are pushed. With the default `sse` format every
+    `log` event carries whole lines, and its `id` is the byte offset after them,
+    so reconnecting clients resume through Last-Event-ID (or `offset`). An `end`
+    event is sent once the execution has finished. The `text` format streams
+    the raw bytes as chunked plain text instead.
+    """
+    executor = get_executor()
+    record = executor.get_execution_record(task_id, execution_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"No execution found for task {task_id}")
+    
+    if offset is None and last_event_id is not None:
+        try:
+            offset = int(last_event_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Last-Event-ID must be a byte offset")
+    offset = max(0, offset or 0)
+    
+    log_file = record["log_file"]
+    eid = record["execution_id"]
+    chunks = log_follower.subscribe(log_file, offset, lambda: executor.is_execution_active(eid))
+    
+    if format == "text":
+        async def body():
+            try:
+                while (item := await chunks.get()) is not None:
+                    yield item[1]
+            finally:
+                log_follower.unsubscribe(log_file, chunks)
+        
+        return StreamingResponse(
+            body(),
+            media_type="text/plain; charset=utf-8",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    
+    if sse_streams.is_full:
+        log_follower.unsubscribe(log_file, chunks)
+        raise HTTPException(
+            status_code=503,
+            detail="Too many SSE connections, retry later",
+            headers={"Retry-After": "5"}
+        )
+    
+    # Bounded, so the file cursor is held back while a slow client has frames queued
+    frames: asyncio.Queue = asyncio.Queue(maxsize=LOG_STREAM_MAX_QUEUED_FRAMES)
+    
+    async def pump():
+        # Only whole lines are sent, so event IDs are always safe resume points
+        partial = b""
+        position = offset
+        while (item := await chunks.get()) is not None:
+            start, data = item
+            if start != position + len(partial):
+                # The log was truncated and is being read again from the start
+                partial = b""
+            data = partial + data
+            cut = data.rfind(b"\n") + 1
+            partial = data[cut:]
+            position = start + len(item[1]) - len(partial)
+            if cut:
+                text = data[:cut - 1].decode("utf-8", errors="replace")
+                await frames.put(encode_event(text, event_id=str(position), event="log"))
+        if partial:
+            position += len(partial)
+            await frames.put(encode_event(partial.decode("utf-8", errors="replace"), event_id=str(position), event="log"))
+        final = executor.get_execution_record(task_id, eid) or record
+        await frames.put(encode_event(
+            json.dumps({"status": final["status"], "exit_code": final.get("exit_code"), "offset": position}),
+            event_id=str(position),
+            event="end"
+        ))
+        await frames.put(None)
+    
+    pump_task = asyncio.create_task(pump())
+    
+    async def on_close():
+        pump_task.cancel()
+        log_follower.unsubscribe(log_file, chunks)
+    
+    return SSEStreamResponse(
+        frames,
+        on_close=on_close,
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        }
+    )
 
 @router.post("/stop/{task_id}")
 async def stop_exec(task_id: str) -> Dict[str, Any]:
@@ -87,6 +522,7 @@ async def stop_exec(task_id: str) -> Dict[str, Any]:
     executor = get_executor()
     
     try:
+        get_scheduler().cancel(task_id)
         success = await executor.stop_task_execution(task_id)
         if success:
             # Update task status back to todo or review
@@ -95,6 +531,7 @@ async def stop_exec(task_id: str) -> Dict[str, Any]:
             # Update Markdown file
             updated_task = db.get(TaskQuery.id == task_id)
             writer.update_task_file(updated_task["file_path"], updated_task)
+            await event_broadcaster.broadcast_task_update(task_id=task_id, status="review")
             
             return {"message": f"Task {task_id} execution stopped", "success": True}
         else:
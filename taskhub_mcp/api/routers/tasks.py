@@ -1,16 +1,43 @@
 from fastapi import APIRouter, HTTPException, BackgroundTasks
 from typing import List, Literal, Optional, Union
 from datetime import datetime
+from functools import partial
 from pathlib import Path
 import json
 import asyncio
 
+from anyio import from_thread
+
 from ...models import TaskIndex
-from ..dependencies import get_db, TaskQuery, get_parser, get_writer, ensure_tasks_directory
+from ...task_graph import TaskGraph
+from ..dependencies import get_db, TaskQuery, get_parser, get_writer, get_claim_queue, get_lease_manager, get_task_changes, get_task_stats, ensure_tasks_directory
 from ...event_broadcaster import event_broadcaster
+from ...config import TASK_LEASE_TTL, TASK_LEASE_MAX_TTL, TASK_WAIT_MAX_TIMEOUT
 
 router = APIRouter(prefix="/tasks", tags=["Task Management"])
 
+def _as_list(value: Optional[Union[List[str], str]]) -> Optional[List[str]]:
+    """Accept a list given as a JSON string from MCP, or a single value."""
+    if isinstance(value, str):
+        try:
+            parsed = json.loads(value)
+        except json.JSONDecodeError:
+            return [value]
+        return parsed if isinstance(parsed, list) else [value]
+    return value
+
+def _broadcast_created(task: dict):
+    """Announce a new task from a sync endpoint's worker thread."""
+    from_thread.run(partial(
+        event_broadcaster.broadcast_task_update,
+        task_id=task["id"],
+        status=task["status"],
+        created=True,
+        priority=task.get("priority"),
+        assignee=task.get("assignee"),
+        tags=task.get("tags")
+    ))
+
 @router.post("/index", response_model=TaskIndex)
 def index_task(file_path: str):
     """Index a new task file that was created outside of the API.
@@ -28,11 +55,19 @@ def index_task(file_path: str):
         HTTPException: If file indexing fails
     """
     db = get_db()
-    new_task = TaskIndex(file_path=file_path)
+    parser = get_parser()
+    task_data = parser.parse_task_file(parser.base_path / file_path) if (parser.base_path / file_path).exists() else None
+    task_data = task_data or {}
+    new_task = TaskIndex(
+        file_path=file_path,
+        depends_on=task_data.get("depends_on") or None,
+        tags=task_data.get("tags") or None
+    )
     task_dict = new_task.dict()
     # Convert datetime to ISO format for TinyDB
     task_dict["updated_at"] = task_dict["updated_at"].isoformat()
     db.insert(task_dict)
+    _broadcast_created(task_dict)
     return new_task
 
 @router.get("/", response_model=List[TaskIndex])
@@ -51,6 +86,52 @@ def list_tasks(status: Literal["todo", "inprogress", "review", "done"] = "todo")
     db = get_db()
     return db.search(TaskQuery.status == status)
 
+@router.get("/stats")
+def task_stats():
+    """Count tasks per status, priority and assignee.
+    
+    Use this for a board overview instead of calling list_tasks for every
+    status. The counts are kept up to date as tasks change, so this does not
+    read the tasks; they are checked against the database every minute.
+    
+    Returns:
+        dict: Total, counts by status, priority ("none" if unset) and assignee
+            ("unassigned" if unset), and when the counts were last checked
+    """
+    return get_task_stats().snapshot()
+
+@router.get("/wait")
+async def wait_for_changes(
+    since_version: Optional[int] = None,
+    status: Optional[Literal["todo", "inprogress", "review", "done"]] = None,
+    task_id: Optional[str] = None,
+    timeout: float = 30
+):
+    """Wait until tasks change, instead of polling list_tasks.
+    
+    Returns as soon as a task changes after `since_version` (a task is created,
+    claimed, changes status, or its lease expires), or with no changes after
+    `timeout` seconds. Pass the returned `version` as `since_version` in the
+    next call so no change is missed between calls. When `reset` is true the
+    changes since `since_version` are no longer known (too many, a sync, or
+    a server restart): list the tasks again.
+    
+    Args:
+        since_version: Last version seen; omit to wait for the next change
+        status: Only changes to this status, e.g. todo to wait for new work
+        task_id: Only changes of this task
+        timeout: Seconds to wait for a change
+        
+    Returns:
+        dict: The matching changes, the current version, and timed_out/reset flags
+        
+    Raises:
+        HTTPException: 400 if timeout is out of range
+    """
+    if timeout < 0 or timeout > TASK_WAIT_MAX_TIMEOUT:
+        raise HTTPException(status_code=400, detail=f"timeout must be between 0 and {TASK_WAIT_MAX_TIMEOUT:g} seconds")
+    return await get_task_changes().wait(since_version, status, task_id, timeout)
+
 @router.put("/status/{task_id}", response_model=TaskIndex)
 async def update_status(
     task_id: str, 
@@ -105,6 +186,11 @@ async def update_status(
     if assignee is not None:
         update_data["assignee"] = assignee
     
+    if new_status != "inprogress":
+        # Finished with the task; drop its lease
+        update_data["lease_ttl"] = None
+        get_lease_manager().release(task_id)
+    
     db.update(update_data, TaskQuery.id == task_id)
     updated_task = db.get(TaskQuery.id == task_id)
     
@@ -123,6 +209,103 @@ async def update_status(
     
     return updated_task
 
+def _check_lease_ttl(lease_ttl: int):
+    if lease_ttl < 0 or lease_ttl > TASK_LEASE_MAX_TTL:
+        raise HTTPException(status_code=400, detail=f"lease_ttl must be between 0 and {TASK_LEASE_MAX_TTL}")
+
+@router.post("/claim")
+async def claim_task(
+    assignee: str,
+    tags: Optional[Union[List[str], str]] = None,
+    lease_ttl: int = TASK_LEASE_TTL
+):
+    """Claim the next todo task for an agent.
+    
+    Picks the highest-priority todo task (oldest first within a priority) that
+    is unassigned or already assigned to `assignee`, carries every tag in
+    `tags` and has all its dependencies done, then sets it to inprogress with
+    `assignee`, in one step. Each task is handed out once, however many agents
+    claim at the same time. Use this instead of list_tasks followed by
+    update_status.
+    
+    The task is leased for `lease_ttl` seconds. Send heartbeats while working
+    on it; if none arrives in time, the task goes back to todo for another
+    agent. Moving the task to review or done ends the lease.
+    
+    Args:
+        assignee: Name of the claiming agent
+        tags: Optional tags the task must carry
+        lease_ttl: Seconds the claim lasts without a heartbeat (0 for no lease)
+        
+    Returns:
+        dict: The claimed task and its lease, or null when no todo task is eligible
+        
+    Raises:
+        HTTPException: 400 if assignee is empty or lease_ttl is out of range
+    """
+    if not assignee.strip():
+        raise HTTPException(status_code=400, detail="assignee must not be empty")
+    _check_lease_ttl(lease_ttl)
+    task = await asyncio.to_thread(get_claim_queue().claim, assignee, _as_list(tags), lease_ttl)
+    if task is None:
+        return {"task": None, "message": "No eligible todo task"}
+    
+    result = {"task": task}
+    if lease_ttl:
+        result["lease"] = get_lease_manager().grant(task["id"], assignee, lease_ttl).to_dict()
+    await asyncio.to_thread(get_writer().update_task_file, task["file_path"], task)
+    await event_broadcaster.broadcast_task_update(task_id=task["id"], status="inprogress", assignee=assignee)
+    return result
+
+@router.post("/heartbeat/{task_id}")
+async def heartbeat(task_id: str, assignee: str, lease_ttl: Optional[int] = None):
+    """Renew the lease on a claimed task.
+    
+    Call this well within the lease TTL (e.g. every third of it) while
+    working on a task from claim_task. A task whose lease runs out goes back
+    to todo. A heartbeat for an inprogress task of `assignee` without a lease
+    (e.g. after the lease expired but before the task was claimed again)
+    starts a new one.
+    
+    Args:
+        task_id: UUID of the claimed task
+        assignee: Name of the agent holding the task
+        lease_ttl: Optional new lease length in seconds
+        
+    Returns:
+        dict: The lease with its new expiry time
+        
+    Raises:
+        HTTPException: 404 if the task is not in progress for assignee, 400 if
+            it is leased to someone else or lease_ttl is out of range
+    """
+    if lease_ttl is not None:
+        _check_lease_ttl(lease_ttl)
+    leases = get_lease_manager()
+    db = get_db()
+    lease = leases.get(task_id)
+    if lease is not None:
+        previous_ttl = lease.ttl
+        try:
+            lease = leases.renew(task_id, assignee, lease_ttl or None)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if lease.ttl != previous_ttl:
+            # Kept with the task so the lease survives a restart
+            await asyncio.to_thread(db.update, {"lease_ttl": lease.ttl}, TaskQuery.id == task_id)
+        return lease.to_dict()
+    
+    task = await asyncio.to_thread(db.get, TaskQuery.id == task_id)
+    if not task or task.get("status") != "inprogress" or task.get("assignee") != assignee:
+        raise HTTPException(status_code=404, detail=f"Task is not in progress for {assignee}")
+    ttl = lease_ttl or task.get("lease_ttl") or TASK_LEASE_TTL
+    if not ttl:
+        raise HTTPException(status_code=400, detail="lease_ttl must be positive")
+    if ttl != task.get("lease_ttl"):
+        # Kept with the task so the lease survives a restart
+        await asyncio.to_thread(db.update, {"lease_ttl": ttl}, TaskQuery.id == task_id)
+    return leases.grant(task_id, assignee, ttl).to_dict()
+
 @router.post("/sync")
 def sync_files():
     """Scan task directory and sync all Markdown files to database.
@@ -131,7 +314,8 @@ def sync_files():
     Use this when tasks seem out of sync or after manual file operations.
     
     Returns:
-        dict: Message indicating number of tasks synced
+        dict: Message indicating number of tasks synced, and warnings about
+            unknown dependencies or dependency cycles
     """
     ensure_tasks_directory()
     parser = get_parser()
@@ -144,22 +328,38 @@ def sync_files():
     db.truncate()
     
     # Import all tasks
+    indexed = []
     for task_data in tasks:
         task = TaskIndex(
             file_path=task_data["file_path"],
             status=task_data["status"],
             priority=task_data.get("priority"),
-            assignee=task_data.get("assignee")
+            assignee=task_data.get("assignee"),
+            depends_on=task_data.get("depends_on") or None,
+            tags=task_data.get("tags") or None
         )
         task_dict = task.dict()
         # Convert datetime to ISO format for TinyDB
         task_dict["updated_at"] = task_dict["updated_at"].isoformat()
         db.insert(task_dict)
+        indexed.append(task_dict)
+    
+    # Dependency problems are reported, not rejected, so the index matches the files
+    graph = TaskGraph(indexed)
+    warnings = [f"{task_id} depends on unknown task {ref}" for task_id, refs in graph.unknown.items() for ref in refs]
+    cycle = graph.find_cycle()
+    if cycle:
+        warnings.append(f"Dependency cycle: {' -> '.join(cycle)}")
     
-    return {"message": f"Synced {len(tasks)} tasks from Markdown files"}
+    from_thread.run(event_broadcaster.broadcast, "tasks_synced", {"count": len(tasks)})
+    
+    result = {"message": f"Synced {len(tasks)} tasks from Markdown files"}
+    if warnings:
+        result["warnings"] = warnings
+    return result
 
 @router.post("/create")
-def create_task(title: str, content: str = "", directory: str = "", priority: Optional[Literal["low", "medium", "high"]] = None, assignee: Optional[str] = None):
+def create_task(title: str, content: str = "", directory: str = "", priority: Optional[Literal["low", "medium", "high"]] = None, assignee: Optional[str] = None, depends_on: Optional[Union[List[str], str]] = None, tags: Optional[Union[List[str], str]] = None):
     """Create a new task with corresponding Markdown file.
     
     Creates both a Markdown file and database entry for a new task.
@@ -171,16 +371,22 @@ def create_task(title: str, content: str = "", directory: str = "", priority: Op
         directory: Optional subdirectory within tasks folder
         priority: Optional priority level (low, medium, high)
         assignee: Optional assignee name
+        depends_on: Optional IDs or file paths of tasks that must be done first
+        tags: Optional tags, which agents can filter on when claiming tasks
         
     Returns:
         dict: Success message and created task information
         
     Raises:
-        HTTPException: If file creation fails
+        HTTPException: 400 if a dependency does not exist, or if file creation fails
     """
     writer = get_writer()
     db = get_db()
     
+    # Handle case where depends_on or tags come as JSON strings from MCP
+    depends_on = _as_list(depends_on)
+    tags = _as_list(tags)
+    
     # Generate file path
     safe_title = "".join(c for c in title if c.isalnum() or c in (' ', '-', '_')).rstrip()
     safe_title = safe_title.replace(' ', '_').lower()
@@ -190,14 +396,20 @@ def create_task(title: str, content: str = "", directory: str = "", priority: Op
     else:
         file_path = f"{safe_title}.md"
     
+    task = TaskIndex(file_path=file_path, priority=priority, assignee=assignee, depends_on=depends_on or None, tags=tags or None)
+    if depends_on:
+        unknown = TaskGraph(db.all() + [task.dict()]).unknown.get(task.id)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown task dependencies: {', '.join(unknown)}")
+    
     # Create Markdown file
-    if writer.create_task_file(file_path, title, content, priority, assignee):
+    if writer.create_task_file(file_path, title, content, priority, assignee, depends_on, tags):
         # Create database entry
-        task = TaskIndex(file_path=file_path, priority=priority, assignee=assignee)
         task_dict = task.dict()
         # Convert datetime to ISO format for TinyDB
         task_dict["updated_at"] = task_dict["updated_at"].isoformat()
         db.insert(task_dict)
+        _broadcast_created(task_dict)
         return {"message": "Task created", "task": task_dict}
     else:
         raise HTTPException(status_code=500, detail="Failed to create task file")
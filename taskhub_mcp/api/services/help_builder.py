@@ -132,6 +132,172 @@ def build_tool_info() -> Dict[str, ToolInfo]:
             related_tools=["list_tasks", "get_task_details"]
         ),
         
+        "claim_task": ToolInfo(
+            name="claim_task",
+            description="Take the next todo task and set it to inprogress in one step",
+            http_method="POST",
+            endpoint="/tasks/claim",
+            parameters=[
+                ParameterInfo(
+                    name="assignee",
+                    type="string",
+                    required=True,
+                    description="Name of the claiming agent, stored as the task's assignee"
+                ),
+                ParameterInfo(
+                    name="tags",
+                    type="array",
+                    required=False,
+                    description="Only claim tasks that carry all of these tags"
+                ),
+                ParameterInfo(
+                    name="lease_ttl",
+                    type="integer",
+                    required=False,
+                    default=600,
+                    description="Seconds the claim lasts without a heartbeat (0 for no lease)"
+                )
+            ],
+            examples=[
+                ExampleInfo(
+                    description="Claim the next GPU task",
+                    request={"assignee": "agent-1", "tags": ["gpu"]},
+                    response={"task": {"id": "456", "status": "inprogress", "priority": "high", "assignee": "agent-1", "tags": ["gpu"]}}
+                ),
+                ExampleInfo(
+                    description="Nothing left to do",
+                    request={"assignee": "agent-1"},
+                    response={"task": None, "message": "No eligible todo task"}
+                )
+            ],
+            related_tools=["heartbeat", "list_tasks", "update_status"],
+            notes=[
+                "Each task is handed to one agent, however many claim at the same time",
+                "Picks high priority first, then the oldest; skips tasks assigned to someone else",
+                "Tasks whose dependencies are not all done are skipped",
+                "Without heartbeats the task returns to todo when its lease runs out"
+            ]
+        ),
+        
+        "heartbeat": ToolInfo(
+            name="heartbeat",
+            description="Renew the lease on a task taken with claim_task",
+            http_method="POST",
+            endpoint="/tasks/heartbeat/{task_id}",
+            parameters=[
+                ParameterInfo(
+                    name="task_id",
+                    type="string",
+                    required=True,
+                    description="ID of the claimed task"
+                ),
+                ParameterInfo(
+                    name="assignee",
+                    type="string",
+                    required=True,
+                    description="Name of the agent holding the task"
+                ),
+                ParameterInfo(
+                    name="lease_ttl",
+                    type="integer",
+                    required=False,
+                    description="New lease length in seconds; keeps the current one if omitted"
+                )
+            ],
+            examples=[
+                ExampleInfo(
+                    description="Keep working on a claimed task",
+                    request={"task_id": "456", "assignee": "agent-1"},
+                    response={"task_id": "456", "assignee": "agent-1", "lease_ttl": 600, "lease_expires_at": "2025-06-21T16:15:00"}
+                )
+            ],
+            related_tools=["claim_task", "update_status"],
+            notes=[
+                "Send one every third of the lease TTL or so",
+                "Expired tasks go back to todo unassigned and a task_updated event with reason lease_expired is sent",
+                "404 means the lease expired and the task was taken back; claim a new task",
+                "Moving the task to review or done ends the lease"
+            ]
+        ),
+        
+        "task_stats": ToolInfo(
+            name="task_stats",
+            description="Count tasks by status, priority and assignee",
+            http_method="GET",
+            endpoint="/tasks/stats",
+            parameters=[],
+            examples=[
+                ExampleInfo(
+                    description="Get a board overview",
+                    request={},
+                    response={
+                        "total": 42,
+                        "by_status": {"todo": 20, "inprogress": 5, "review": 3, "done": 14},
+                        "by_priority": {"high": 6, "medium": 10, "low": 4, "none": 22},
+                        "by_assignee": {"alice": 8, "agent-1": 4, "unassigned": 30}
+                    }
+                )
+            ],
+            related_tools=["list_tasks", "wait_for_changes"],
+            notes=[
+                "Cheaper than calling list_tasks for every status",
+                "Counts are updated as tasks change and checked against the database every minute"
+            ]
+        ),
+        
+        "wait_for_changes": ToolInfo(
+            name="wait_for_changes",
+            description="Wait until tasks change, instead of polling list_tasks",
+            http_method="GET",
+            endpoint="/tasks/wait",
+            parameters=[
+                ParameterInfo(
+                    name="since_version",
+                    type="integer",
+                    required=False,
+                    description="version from the previous response; omit to wait for the next change"
+                ),
+                ParameterInfo(
+                    name="status",
+                    type="string",
+                    required=False,
+                    description="Only changes to this status",
+                    enum=["todo", "inprogress", "review", "done"]
+                ),
+                ParameterInfo(
+                    name="task_id",
+                    type="string",
+                    required=False,
+                    description="Only changes of this task"
+                ),
+                ParameterInfo(
+                    name="timeout",
+                    type="number",
+                    required=False,
+                    default=30,
+                    description="Seconds to wait for a change (up to 300)"
+                )
+            ],
+            examples=[
+                ExampleInfo(
+                    description="Wait for new work",
+                    request={"status": "todo", "since_version": 41},
+                    response={
+                        "version": 42,
+                        "changes": [{"version": 42, "task_id": "789", "status": "todo", "created": True}],
+                        "timed_out": False,
+                        "reset": False
+                    }
+                )
+            ],
+            related_tools=["claim_task", "list_tasks"],
+            notes=[
+                "Returns as soon as a matching change happens, or with no changes after timeout",
+                "Pass the returned version as since_version next time so no change is missed",
+                "When reset is true, call list_tasks again"
+            ]
+        ),
+        
         "sync_files": ToolInfo(
             name="sync_files",
             description="Scan the tasks directory and synchronize all Markdown files with the database",
@@ -186,6 +352,18 @@ def build_tool_info() -> Dict[str, ToolInfo]:
                     type="string",
                     required=False,
                     description="Assignee name for the task"
+                ),
+                ParameterInfo(
+                    name="depends_on",
+                    type="array",
+                    required=False,
+                    description="IDs or file paths of tasks that must be done first"
+                ),
+                ParameterInfo(
+                    name="tags",
+                    type="array",
+                    required=False,
+                    description="Tags of the task, which claim_task can filter on"
                 )
             ],
             examples=[
@@ -233,7 +411,7 @@ def build_tool_info() -> Dict[str, ToolInfo]:
         
         "execute_task": ToolInfo(
             name="execute_task",
-            description="Execute a task in a tmux session for long-running operations",
+            description="Queue a task for execution in a tmux session for long-running operations",
             http_method="POST",
             endpoint="/exec/{task_id}",
             parameters=[
@@ -248,6 +426,43 @@ def build_tool_info() -> Dict[str, ToolInfo]:
                     type="string",
                     required=False,
                     description="Optional script content to execute"
+                ),
+                ParameterInfo(
+                    name="runner",
+                    type="string",
+                    required=False,
+                    description="Runner backend: tmux for attachable sessions, native for headless subprocesses",
+                    enum=["tmux", "native"]
+                ),
+                ParameterInfo(
+                    name="review_on_complete",
+                    type="boolean",
+                    required=False,
+                    description="Move the task to review when the execution finishes (default: TASKHUB_REVIEW_ON_COMPLETE)"
+                ),
+                ParameterInfo(
+                    name="cpu_limit",
+                    type="number",
+                    required=False,
+                    description="CPUs the execution may use, e.g. 0.5 (needs the cgroup cpu controller)"
+                ),
+                ParameterInfo(
+                    name="memory_limit_mb",
+                    type="integer",
+                    required=False,
+                    description="Memory limit in MiB"
+                ),
+                ParameterInfo(
+                    name="use_cache",
+                    type="boolean",
+                    required=False,
+                    description="Return the cached result of an earlier successful run with the same script and inputs (default: frontmatter cache)"
+                ),
+                ParameterInfo(
+                    name="matrix",
+                    type="array",
+                    required=False,
+                    description="List of parameter sets; one run per set is queued, and the runs execute side by side"
                 )
             ],
             examples=[
@@ -258,11 +473,30 @@ def build_tool_info() -> Dict[str, ToolInfo]:
                         "execution_id": "exec-456",
                         "task_id": "123",
                         "session_name": "taskhub-123",
-                        "status": "running"
+                        "status": "queued",
+                        "queue_position": 1
+                    }
+                ),
+                ExampleInfo(
+                    description="Run three shards of a test suite at once",
+                    request={"task_id": "123", "matrix": [{"SHARD": 1}, {"SHARD": 2}, {"SHARD": 3}]},
+                    response={
+                        "matrix_id": "matrix-789",
+                        "task_id": "123",
+                        "executions": [{"execution_id": "exec-1", "matrix_index": 0, "params": {"SHARD": "1"}, "status": "queued"}]
                     }
                 )
             ],
-            related_tools=["exec_status", "get_logs", "stop_exec"]
+            related_tools=["exec_status", "matrix_status", "get_logs", "stop_exec"],
+            notes=[
+                "Returns immediately; the run starts when one of TASKHUB_MAX_CONCURRENT_EXECUTIONS slots is free",
+                "Queued runs start by task priority (high, medium, low, unset), then in submission order",
+                "GET /exec/status reports queue depth, running count and wait times",
+                "When the script exits, exit_code and completed_at are recorded and a completed/failed execution_event is broadcast",
+                "CPU time, peak memory, I/O and wall time are reported under resources in exec_status",
+                "Matrix parameters are exported as environment variables, with TASKHUB_MATRIX_ID and TASKHUB_MATRIX_INDEX",
+                "With TASKHUB_WORKER_POOL_SIZE set, runs start in pre-spawned single-use workers; see worker_pools in GET /exec/status"
+            ]
         ),
         
         "stream_events": ToolInfo(
@@ -290,7 +524,46 @@ def build_tool_info() -> Dict[str, ToolInfo]:
             notes=[
                 "Long-lived connection for real-time updates",
                 "Supports task_updated and execution_event types",
-                "Automatic keepalive pings every 30 seconds"
+                "Automatic keepalive pings after 30 seconds of inactivity",
+                "Returns 503 with Retry-After when the connection limit is reached"
+            ]
+        ),
+        
+        "websocket_events": ToolInfo(
+            name="websocket_events",
+            description="Stream task events over a WebSocket with batching, compression and live filter changes",
+            http_method="WEBSOCKET",
+            endpoint="/events/ws",
+            parameters=[
+                ParameterInfo(
+                    name="event_types",
+                    type="string",
+                    required=False,
+                    description="Comma-separated event types to receive initially"
+                ),
+                ParameterInfo(
+                    name="task_ids",
+                    type="string",
+                    required=False,
+                    description="Comma-separated task IDs to receive initially"
+                )
+            ],
+            examples=[
+                ExampleInfo(
+                    description="Change filters without reconnecting",
+                    request={"action": "subscribe", "task_ids": ["123"]},
+                    response={"type": "subscribed", "event_types": None, "task_ids": ["123"]}
+                ),
+                ExampleInfo(
+                    description="Batched event frame",
+                    request={},
+                    response={"type": "batch", "events": [{"event": "task_updated", "data": {"task_id": "123", "status": "done"}}]}
+                )
+            ],
+            related_tools=["stream_events", "event_status"],
+            notes=[
+                "Not callable as an MCP tool; connect with a WebSocket client",
+                "permessage-deflate is used when the client supports it"
             ]
         ),
         
@@ -307,11 +580,348 @@ def build_tool_info() -> Dict[str, ToolInfo]:
                     response={
                         "status": "active",
                         "connected_clients": 3,
+                        "sse_connections": 2,
+                        "max_sse_connections": 1000,
                         "endpoint": "/api/events/stream"
                     }
                 )
             ],
             related_tools=["stream_events"]
+        ),
+        
+        "event_history": ToolInfo(
+            name="event_history",
+            description="Replay past task and execution events from the durable event history",
+            http_method="GET",
+            endpoint="/events/history",
+            parameters=[
+                ParameterInfo(
+                    name="since",
+                    type="string",
+                    required=False,
+                    description="Only include events at or after this ISO 8601 time (UTC if no offset)"
+                ),
+                ParameterInfo(
+                    name="until",
+                    type="string",
+                    required=False,
+                    description="Only include events at or before this ISO 8601 time"
+                ),
+                ParameterInfo(
+                    name="task_id",
+                    type="string",
+                    required=False,
+                    description="Only include events for this task"
+                ),
+                ParameterInfo(
+                    name="limit",
+                    type="integer",
+                    required=False,
+                    description="Maximum number of events to return"
+                )
+            ],
+            examples=[
+                ExampleInfo(
+                    description="Reconstruct what happened to a task",
+                    request={"task_id": "123", "since": "2025-06-22T00:00:00"},
+                    response='{"id": "...", "event": "task_updated", "data": {"task_id": "123", "status": "inprogress"}, "timestamp": "2025-06-22T10:00:00Z"}\n'
+                )
+            ],
+            related_tools=["stream_events"],
+            notes=[
+                "Response is newline-delimited JSON, oldest event first"
+            ]
+        ),
+        
+        "stream_logs": ToolInfo(
+            name="stream_logs",
+            description="Follow an execution log live instead of polling get_logs",
+            http_method="GET",
+            endpoint="/exec/logs/{task_id}/stream",
+            parameters=[
+                ParameterInfo(
+                    name="task_id",
+                    type="string",
+                    required=True,
+                    description="UUID of the task whose log to follow"
+                ),
+                ParameterInfo(
+                    name="offset",
+                    type="integer",
+                    required=False,
+                    default=0,
+                    description="Byte offset to resume from (Last-Event-ID works too)"
+                ),
+                ParameterInfo(
+                    name="execution_id",
+                    type="string",
+                    required=False,
+                    description="Follow a specific execution instead of the latest one"
+                ),
+                ParameterInfo(
+                    name="format",
+                    type="string",
+                    required=False,
+                    default="sse",
+                    description="sse for log/end events, text for raw chunked output",
+                    enum=["sse", "text"]
+                )
+            ],
+            examples=[
+                ExampleInfo(
+                    description="Follow the latest execution of a task",
+                    request={"task_id": "123"},
+                    response="id: 42\nevent: log\ndata: Starting task execution: 123\ndata: Timestamp: ...\n\n"
+                )
+            ],
+            related_tools=["get_logs", "exec_status"],
+            notes=[
+                "Only newly appended bytes are sent; each log event's id is the byte offset after it",
+                "An end event with status and exit_code closes the stream when the execution finishes",
+                "Viewers of the same log share one file reader"
+            ]
+        ),
+        
+        "search_logs": ToolInfo(
+            name="search_logs",
+            description="Find which executions printed a text, across all logs",
+            http_method="GET",
+            endpoint="/exec/logs/search",
+            parameters=[
+                ParameterInfo(
+                    name="q",
+                    type="string",
+                    required=True,
+                    description="Literal text to look for"
+                ),
+                ParameterInfo(
+                    name="task_id",
+                    type="string",
+                    required=False,
+                    description="Only search the executions of this task"
+                ),
+                ParameterInfo(
+                    name="since",
+                    type="string",
+                    required=False,
+                    description="ISO timestamp (UTC unless it has an offset); skip executions queued earlier"
+                ),
+                ParameterInfo(
+                    name="ignore_case",
+                    type="boolean",
+                    required=False,
+                    default=False,
+                    description="Match ASCII letters regardless of case"
+                ),
+                ParameterInfo(
+                    name="limit",
+                    type="integer",
+                    required=False,
+                    default=100,
+                    description="Most matching lines to return (1-1000)"
+                )
+            ],
+            examples=[
+                ExampleInfo(
+                    description="Find the run that ran out of disk",
+                    request={"q": "No space left on device"},
+                    response={
+                        "query": "No space left on device",
+                        "hits": [{"task_id": "123", "execution_id": "exec-7", "offset": 688894, "line_number": 50001, "line": "cp: No space left on device"}],
+                        "truncated": False,
+                        "searched": 42,
+                        "skipped_by_index": 39
+                    }
+                )
+            ],
+            related_tools=["get_logs", "exec_history"],
+            notes=[
+                "Hits are ordered newest execution first; pass offset and execution_id to get_logs for context",
+                "Logs are scanned in parallel, including rotated and compressed parts",
+                "Finished logs are indexed on their first search, so later searches skip logs that cannot match"
+            ]
+        ),
+        
+        "cache_stats": ToolInfo(
+            name="cache_stats",
+            description="Get execution result cache size, hit ratio and evictions",
+            http_method="GET",
+            endpoint="/exec/cache/stats",
+            parameters=[],
+            examples=[
+                ExampleInfo(
+                    description="Check how often cached results are reused",
+                    request={},
+                    response={"entries": 42, "hits": 30, "misses": 12, "hit_ratio": 0.7143, "evictions": 0}
+                )
+            ],
+            related_tools=["execute_task"],
+            notes=[
+                "Runs opt in with use_cache or cache: true in the task frontmatter",
+                "The key hashes the script and the files listed under inputs in the frontmatter",
+                "Least recently used entries are evicted beyond TASKHUB_EXECUTION_CACHE_MAX_ENTRIES or _MAX_BYTES"
+            ]
+        ),
+        
+        "execute_batch": ToolInfo(
+            name="execute_batch",
+            description="Queue many tasks for execution in one call",
+            http_method="POST",
+            endpoint="/exec/batch",
+            parameters=[
+                ParameterInfo(
+                    name="task_ids",
+                    type="array",
+                    required=True,
+                    description="IDs of the tasks to execute"
+                ),
+                ParameterInfo(
+                    name="runner",
+                    type="string",
+                    required=False,
+                    description="Runner backend for every task",
+                    enum=["tmux", "native"]
+                ),
+                ParameterInfo(
+                    name="review_on_complete",
+                    type="boolean",
+                    required=False,
+                    description="Move each task to review when its execution finishes"
+                )
+            ],
+            examples=[
+                ExampleInfo(
+                    description="Start three tasks at once",
+                    request={"task_ids": ["123", "456", "789"], "runner": "native"},
+                    response={
+                        "executions": [{"execution_id": "exec-1", "task_id": "123", "status": "queued", "queue_position": 1}],
+                        "errors": {"789": "Task not found"}
+                    }
+                )
+            ],
+            related_tools=["execute_task", "exec_status"],
+            notes=[
+                "Takes the same options as execute_task (except script_content and matrix), applied to every task",
+                "Each task runs tasks/{task_id}/execute.sh",
+                "Tasks that cannot be queued are listed under errors; the others are queued anyway",
+                "At most TASKHUB_BATCH_MAX_TASKS tasks per call"
+            ]
+        ),
+        
+        "matrix_status": ToolInfo(
+            name="matrix_status",
+            description="Get the combined status and the runs of a matrix execution",
+            http_method="GET",
+            endpoint="/exec/matrix/{matrix_id}",
+            parameters=[
+                ParameterInfo(
+                    name="matrix_id",
+                    type="string",
+                    required=True,
+                    description="ID returned by execute_task with matrix"
+                )
+            ],
+            examples=[
+                ExampleInfo(
+                    description="Check which shards failed",
+                    request={"matrix_id": "matrix-789"},
+                    response={
+                        "status": "failed",
+                        "runs": 3,
+                        "counts": {"completed": 2, "failed": 1},
+                        "wall_seconds": 61.2,
+                        "failed_params": [{"SHARD": "3"}]
+                    }
+                )
+            ],
+            related_tools=["execute_task", "get_logs"],
+            notes=[
+                "status stays queued or running until every run has finished, then it is failed, stopped or completed",
+                "Pass a run's execution_id to get_logs to read its log",
+                "stop_exec stops every run of the task"
+            ]
+        ),
+        
+        "run_dag": ToolInfo(
+            name="run_dag",
+            description="Run tasks in dependency order, in parallel where dependencies allow",
+            http_method="POST",
+            endpoint="/exec/dag",
+            parameters=[
+                ParameterInfo(
+                    name="task_ids",
+                    type="array",
+                    required=False,
+                    description="Tasks to run; their unfinished dependencies run first. Defaults to every task not done"
+                ),
+                ParameterInfo(
+                    name="max_parallel",
+                    type="integer",
+                    required=False,
+                    description="Executions of this run active at once (default: TASKHUB_MAX_CONCURRENT_EXECUTIONS)"
+                ),
+                ParameterInfo(
+                    name="runner",
+                    type="string",
+                    required=False,
+                    description="Runner backend for every task",
+                    enum=["tmux", "native"]
+                ),
+                ParameterInfo(
+                    name="mark_done",
+                    type="boolean",
+                    required=False,
+                    description="Set tasks to done when they succeed and to review when they fail",
+                    default=True
+                )
+            ],
+            examples=[
+                ExampleInfo(
+                    description="Run a task after everything it depends on",
+                    request={"task_ids": ["deploy-task-uuid"], "max_parallel": 2},
+                    response={"run_id": "run-uuid", "status": "running", "counts": {"pending": 3}}
+                )
+            ],
+            related_tools=["dag_status", "execute_task"],
+            notes=[
+                "Dependencies are listed under depends_on in the task frontmatter, by task ID or file path",
+                "Each task runs tasks/{task_id}/execute.sh",
+                "Tasks that depend on a failed task are skipped",
+                "Returns 400 for unknown dependencies or a dependency cycle"
+            ]
+        ),
+        
+        "dag_status": ToolInfo(
+            name="dag_status",
+            description="Get the progress, makespan and critical path of a DAG run",
+            http_method="GET",
+            endpoint="/exec/dag/{run_id}",
+            parameters=[
+                ParameterInfo(
+                    name="run_id",
+                    type="string",
+                    required=True,
+                    description="ID returned by run_dag"
+                )
+            ],
+            examples=[
+                ExampleInfo(
+                    description="See which tasks limited the run",
+                    request={"run_id": "run-uuid"},
+                    response={
+                        "status": "completed",
+                        "makespan_seconds": 3.79,
+                        "critical_path": ["build", "test", "deploy"],
+                        "critical_path_seconds": 3.74,
+                        "parallelism": 1.27
+                    }
+                )
+            ],
+            related_tools=["run_dag"],
+            notes=[
+                "critical_path is the longest chain of dependent tasks by actual run time",
+                "Runs are kept in memory and lost on restart"
+            ]
         )
     }
     
@@ -330,6 +940,11 @@ def get_tool_usage_tips(tool_name: str) -> List[str]:
             "Include artifacts when marking as 'done'",
             "Status changes are automatically synced to Markdown"
         ],
+        "claim_task": [
+            "Prefer this over list_tasks followed by update_status when several agents work in parallel",
+            "Call again after finishing a task to get the next one",
+            "Send heartbeats while working so the task is not returned to todo"
+        ],
         "get_task_details": [
             "Returns full Markdown content of the task",
             "Use task_id from list_tasks response",
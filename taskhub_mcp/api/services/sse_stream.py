@@ -0,0 +1,157 @@
+"""Server-Sent Events response driven by queues, with shared keepalives.
+
+Each stream waits on its queue and on the ASGI receive channel, so an idle
+connection costs no timers. A single ticker sends one pre-encoded comment
+frame to every stream that has been idle for a keepalive interval.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Mapping, Optional, Set
+
+from starlette.responses import JSONResponse, Response
+from starlette.types import Receive, Scope, Send
+
+from ...config import SSE_KEEPALIVE_INTERVAL, SSE_MAX_CONNECTIONS
+
+logger = logging.getLogger(__name__)
+
+KEEPALIVE_FRAME = b": keepalive\n\n"
+
+# Queued by the disconnect watcher to end the stream
+_CLOSED = object()
+
+
+def encode_event(data: str, event_id: Optional[str] = None, event: Optional[str] = None) -> bytes:
+    """Encode a message as an SSE frame."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event is not None:
+        lines.append(f"event: {event}")
+    lines.extend(f"data: {line}" for line in data.split("\n"))
+    return ("\n".join(lines) + "\n\n").encode()
+
+
+class SSEStreamRegistry:
+    """Tracks open SSE streams and sends keepalives to idle ones."""
+
+    def __init__(self, keepalive_interval: float, max_connections: int):
+        self.keepalive_interval = keepalive_interval
+        self.max_connections = max_connections
+        self._streams: Set["SSEStreamResponse"] = set()
+        self._ticker: Optional[asyncio.Task] = None
+
+    @property
+    def count(self) -> int:
+        """Number of open SSE streams."""
+        return len(self._streams)
+
+    @property
+    def is_full(self) -> bool:
+        """Whether the connection cap has been reached."""
+        return self.max_connections > 0 and len(self._streams) >= self.max_connections
+
+    def register(self, stream: "SSEStreamResponse"):
+        self._streams.add(stream)
+        if self._ticker is None or self._ticker.done():
+            self._ticker = asyncio.create_task(self._tick())
+
+    def unregister(self, stream: "SSEStreamResponse"):
+        self._streams.discard(stream)
+
+    async def _tick(self):
+        # Runs only while streams are open, so an idle server has no ticker
+        loop = asyncio.get_running_loop()
+        while self._streams:
+            await asyncio.sleep(self.keepalive_interval)
+            idle_since = loop.time() - self.keepalive_interval
+            for stream in list(self._streams):
+                # A full (bounded) queue has frames to send already
+                if stream.last_sent <= idle_since and not stream.queue.full():
+                    stream.queue.put_nowait(KEEPALIVE_FRAME)
+
+
+sse_streams = SSEStreamRegistry(SSE_KEEPALIVE_INTERVAL, SSE_MAX_CONNECTIONS)
+
+
+class SSEStreamResponse(Response):
+    """Stream the contents of a queue to the client as Server-Sent Events.
+
+    ``str`` items are sent as ``data:`` frames and ``bytes`` items are
+    written as already-encoded frames. The stream ends when the client
+    disconnects or ``None`` is queued. The queue may be bounded to apply
+    backpressure to its producer. If the registry is full when the
+    response is sent, the client gets a 503 instead.
+    """
+
+    media_type = "text/event-stream"
+
+    def __init__(
+        self,
+        queue: asyncio.Queue,
+        on_close: Optional[Callable[[], Awaitable[None]]] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        registry: SSEStreamRegistry = sse_streams,
+    ):
+        self.queue = queue
+        self.on_close = on_close
+        self.registry = registry
+        self.status_code = 200
+        self.background = None
+        self.init_headers(headers)
+        self.last_sent = 0.0
+
+    async def _watch_disconnect(self, receive: Receive):
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                # Frames still queued for the departed client can be dropped
+                while self.queue.full():
+                    self.queue.get_nowait()
+                self.queue.put_nowait(_CLOSED)
+                return
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Counted only once it is sent, so a response that never is holds no
+        # slot; checking and registering without awaiting in between keeps
+        # concurrent requests from overshooting the cap
+        if self.registry.is_full:
+            try:
+                await JSONResponse(
+                    {"detail": "Too many SSE connections, retry later"},
+                    status_code=503,
+                    headers={"Retry-After": "5"}
+                )(scope, receive, send)
+            finally:
+                if self.on_close is not None:
+                    await self.on_close()
+            return
+        loop = asyncio.get_running_loop()
+        self.last_sent = loop.time()
+        self.registry.register(self)
+        watcher = asyncio.create_task(self._watch_disconnect(receive))
+        try:
+            await send({
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            })
+            while True:
+                item = await self.queue.get()
+                if item is _CLOSED:
+                    logger.info("Client disconnected from SSE stream")
+                    return
+                if item is None:
+                    break
+                frame = item if isinstance(item, bytes) else encode_event(item)
+                await send({"type": "http.response.body", "body": frame, "more_body": True})
+                self.last_sent = loop.time()
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        except OSError as e:
+            logger.info(f"SSE stream closed: {e}")
+        finally:
+            self.registry.unregister(self)
+            watcher.cancel()
+            if self.on_close is not None:
+                await self.on_close()
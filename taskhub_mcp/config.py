@@ -2,6 +2,7 @@
 Configuration for TaskHub MCP
 """
 
+import json
 import os
 import socket
 from pathlib import Path
@@ -64,6 +65,7 @@ def ensure_directories() -> tuple[Path, Path, Path]:
 # Global paths
 DB_DIR, TASKS_DIR, LOGS_DIR = ensure_directories()
 DB_PATH = DB_DIR / "tasks_db.json"
+EXECUTIONS_DB_PATH = DB_DIR / "executions_db.json"
 
 
 def get_port() -> int:
@@ -115,4 +117,119 @@ SERVER_PORT = get_port()
 # Development mode configuration
 # Set TASKHUB_ENV=production to disable auto-reload
 ENVIRONMENT = os.environ.get("TASKHUB_ENV", "development")
-AUTO_RELOAD = ENVIRONMENT != "production"
\ No newline at end of file
+AUTO_RELOAD = ENVIRONMENT != "production"
+
+# Event bus configuration
+# "memory" keeps broadcasts inside one process (default); "file" shares them
+# between all server workers and helper processes through an append-only log.
+EVENTS_DIR = get_data_dir() / "events"
+EVENT_BUS_BACKEND = os.environ.get("TASKHUB_EVENT_BUS", "memory")
+EVENT_BUS_PATH = Path(os.environ.get("TASKHUB_EVENT_BUS_PATH", EVENTS_DIR / "bus.log"))
+EVENT_BUS_MAX_BYTES = int(os.environ.get("TASKHUB_EVENT_BUS_MAX_BYTES", 16 * 1024 * 1024))
+EVENT_BUS_POLL_INTERVAL = float(os.environ.get("TASKHUB_EVENT_BUS_POLL_INTERVAL", "0.1"))
+
+# Event history configuration
+# Every broadcast is appended to size-rotated segments under events/history
+EVENT_HISTORY_ENABLED = os.environ.get("TASKHUB_EVENT_HISTORY", "1") != "0"
+EVENT_HISTORY_DIR = Path(os.environ.get("TASKHUB_EVENT_HISTORY_DIR", EVENTS_DIR / "history"))
+EVENT_HISTORY_SEGMENT_BYTES = int(os.environ.get("TASKHUB_EVENT_HISTORY_SEGMENT_BYTES", 8 * 1024 * 1024))
+EVENT_HISTORY_INDEX_INTERVAL = int(os.environ.get("TASKHUB_EVENT_HISTORY_INDEX_INTERVAL", 64 * 1024))
+EVENT_HISTORY_MAX_BYTES = int(os.environ.get("TASKHUB_EVENT_HISTORY_MAX_BYTES", 512 * 1024 * 1024))
+
+# WebSocket event transport configuration
+# Events arriving within the batch window are sent together in one frame
+WS_BATCH_WINDOW = float(os.environ.get("TASKHUB_WS_BATCH_WINDOW", "0.05"))
+WS_BATCH_MAX_EVENTS = int(os.environ.get("TASKHUB_WS_BATCH_MAX_EVENTS", "200"))
+
+# SSE configuration
+# Idle streams get a keepalive comment every interval; 0 disables the connection cap
+SSE_KEEPALIVE_INTERVAL = float(os.environ.get("TASKHUB_SSE_KEEPALIVE_INTERVAL", "30"))
+SSE_MAX_CONNECTIONS = int(os.environ.get("TASKHUB_SSE_MAX_CONNECTIONS", "1000"))
+
+# Execution output watching
+# Log lines matching these patterns are broadcast as structured execution events.
+# TASKHUB_OUTPUT_PATTERNS may hold a JSON object of {event name: regex} to add or
+# replace patterns; named groups become event fields.
+DEFAULT_OUTPUT_PATTERNS = {
+    "progress": r"^\s*PROGRESS:\s*(?P<percent>\d+(?:\.\d+)?)%\s*(?P<message>.*)$",
+    "artifact": r"^\s*ARTIFACT:\s*(?P<path>.+?)\s*$",
+    "error": r"^\s*ERROR:\s*(?P<message>.*)$",
+}
+
+
+def get_output_patterns() -> dict:
+    """Get the execution output patterns, merged with TASKHUB_OUTPUT_PATTERNS."""
+    patterns = dict(DEFAULT_OUTPUT_PATTERNS)
+    if patterns_json := os.environ.get("TASKHUB_OUTPUT_PATTERNS"):
+        try:
+            patterns.update(json.loads(patterns_json))
+        except (ValueError, TypeError):
+            print("Warning: Invalid TASKHUB_OUTPUT_PATTERNS value, using defaults")
+    return patterns
+
+
+OUTPUT_PATTERNS = get_output_patterns()
+OUTPUT_WATCH_INTERVAL = float(os.environ.get("TASKHUB_OUTPUT_WATCH_INTERVAL", "0.5"))
+# Fallback polling interval for following logs when inotify is unavailable
+LOG_FOLLOW_POLL_INTERVAL = float(os.environ.get("TASKHUB_LOG_FOLLOW_POLL_INTERVAL", "0.5"))
+
+# Log lifecycle configuration
+# Compression of rotated and finished logs: "gzip", "zstd" (needs zstandard) or "none"
+LOG_COMPRESSION = os.environ.get("TASKHUB_LOG_COMPRESSION", "gzip")
+# Running executions' logs are rotated into a compressed segment every this many bytes
+LOG_ROTATE_BYTES = int(os.environ.get("TASKHUB_LOG_ROTATE_BYTES", str(64 * 1024 * 1024)))
+# Finished logs are compressed once they have not been written for this many seconds
+LOG_COMPRESS_AFTER = float(os.environ.get("TASKHUB_LOG_COMPRESS_AFTER", "300"))
+# Oldest finished logs are deleted beyond this many bytes (0 disables)
+LOG_RETENTION_BYTES = int(os.environ.get("TASKHUB_LOG_RETENTION_BYTES", str(10 * 1024 * 1024 * 1024)))
+# Finished logs older than this many days are deleted (0 disables)
+LOG_RETENTION_DAYS = float(os.environ.get("TASKHUB_LOG_RETENTION_DAYS", "7"))
+# Seconds between lifecycle passes (0 disables the background manager)
+LOG_LIFECYCLE_INTERVAL = float(os.environ.get("TASKHUB_LOG_LIFECYCLE_INTERVAL", "60"))
+# Threads scanning logs in parallel for GET /exec/logs/search
+LOG_SEARCH_WORKERS = max(1, int(os.environ.get("TASKHUB_LOG_SEARCH_WORKERS", str(min(8, os.cpu_count() or 4)))))
+# Finished logs up to this size get a trigram index on their first search (0 disables)
+LOG_SEARCH_INDEX_MAX_BYTES = int(os.environ.get("TASKHUB_LOG_SEARCH_INDEX_MAX_BYTES", str(16 * 1024 * 1024)))
+# Structured events per second per execution; extra events are held back, and
+# progress updates are coalesced so only the latest is sent
+OUTPUT_EVENT_RATE = float(os.environ.get("TASKHUB_OUTPUT_EVENT_RATE", "2"))
+OUTPUT_EVENT_BURST = int(os.environ.get("TASKHUB_OUTPUT_EVENT_BURST", "10"))
+
+# Execution configuration
+# Default runner backend: "tmux" (attachable sessions) or "native" (plain subprocesses)
+DEFAULT_RUNNER = os.environ.get("TASKHUB_RUNNER", "tmux")
+# Executions allowed to run at once; further requests wait in a priority queue
+MAX_CONCURRENT_EXECUTIONS = max(1, int(os.environ.get("TASKHUB_MAX_CONCURRENT_EXECUTIONS", str(os.cpu_count() or 4))))
+# Idle worker shells kept ready per runner to cut start latency (0 disables the pool);
+# the pool follows recent demand up to this size
+WORKER_POOL_SIZE = max(0, int(os.environ.get("TASKHUB_WORKER_POOL_SIZE", "0")))
+WORKER_POOL_DIR = get_data_dir() / "pool"
+# Lease given to tasks claimed through POST /tasks/claim: seconds an agent may go
+# without a heartbeat before its task returns to todo (0 claims without a lease)
+TASK_LEASE_TTL = int(os.environ.get("TASKHUB_TASK_LEASE_TTL", "600"))
+TASK_LEASE_MAX_TTL = int(os.environ.get("TASKHUB_TASK_LEASE_MAX_TTL", "86400"))
+# Latest task changes kept for GET /tasks/wait; clients further behind must reload
+TASK_CHANGE_BUFFER = int(os.environ.get("TASKHUB_TASK_CHANGE_BUFFER", "1000"))
+# Longest GET /tasks/wait call, in seconds
+TASK_WAIT_MAX_TIMEOUT = float(os.environ.get("TASKHUB_TASK_WAIT_MAX_TIMEOUT", "300"))
+# Seconds between recounts of the task statistics from the database (0 disables)
+TASK_STATS_RECONCILE_INTERVAL = float(os.environ.get("TASKHUB_TASK_STATS_RECONCILE_INTERVAL", "60"))
+# Largest number of tasks one POST /exec/batch call may queue
+BATCH_MAX_TASKS = int(os.environ.get("TASKHUB_BATCH_MAX_TASKS", "200"))
+# Largest number of runs one matrix execution may launch
+MATRIX_MAX_RUNS = int(os.environ.get("TASKHUB_MATRIX_MAX_RUNS", "64"))
+# Move a task from inprogress to review when its execution finishes (overridable per run)
+REVIEW_ON_COMPLETE = os.environ.get("TASKHUB_REVIEW_ON_COMPLETE", "0") == "1"
+# Record CPU time, peak memory, I/O and wall time of every execution
+RESOURCE_ACCOUNTING = os.environ.get("TASKHUB_RESOURCE_ACCOUNTING", "1") != "0"
+# Opt-in cache of execution results, keyed by the script and its declared input files
+EXECUTION_CACHE_DIR = Path(os.environ.get("TASKHUB_EXECUTION_CACHE_DIR", get_data_dir() / "cache"))
+EXECUTION_CACHE_MAX_BYTES = int(os.environ.get("TASKHUB_EXECUTION_CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))
+EXECUTION_CACHE_MAX_ENTRIES = int(os.environ.get("TASKHUB_EXECUTION_CACHE_MAX_ENTRIES", "1000"))
+# cgroup v2 directory under which each execution gets its own cgroup ("auto" to
+# detect, "none" to collect rusage only); the server must be allowed to write it
+CGROUP_ROOT = os.environ.get("TASKHUB_CGROUP_ROOT", "auto")
+
+# tmux configuration
+# Multiplex tmux commands over one control-mode connection instead of forking per call
+TMUX_CONTROL_MODE = os.environ.get("TASKHUB_TMUX_CONTROL_MODE", "1") != "0"
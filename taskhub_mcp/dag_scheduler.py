@@ -0,0 +1,330 @@
+"""Runs tasks in dependency order.
+
+A DAG run takes a set of target tasks together with the dependencies they
+have not finished yet. Every task whose dependencies have succeeded is
+submitted to the execution scheduler straight away, at most ``max_parallel``
+at a time. As executions finish, their dependents become ready and are
+submitted in turn. When a task fails, the tasks that depend on it are
+skipped. Runs are kept in memory; each one reports its makespan and critical
+path once it has finished.
+"""
+
+import asyncio
+import logging
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from .config import MAX_CONCURRENT_EXECUTIONS
+from .event_broadcaster import event_broadcaster
+from .execution_scheduler import ExecutionScheduler
+from .task_graph import TaskGraph
+
+logger = logging.getLogger(__name__)
+
+# Called with a task ID, its new status and extra fields to store
+TaskStatusSetter = Callable[..., Awaitable[None]]
+# Finished runs kept for GET /exec/dag
+MAX_FINISHED_RUNS = 100
+
+
+@dataclass
+class DagNode:
+    task_id: str
+    dependencies: List[str]
+    priority: Optional[str] = None
+    use_cache: bool = False
+    inputs: List[str] = field(default_factory=list)
+    # pending -> running -> succeeded | failed, or pending -> skipped
+    state: str = "pending"
+    execution_id: Optional[str] = None
+    exit_code: Optional[int] = None
+    started_at: Optional[str] = None
+    completed_at: Optional[str] = None
+    error: Optional[str] = None
+    cached: bool = False
+
+    @property
+    def duration(self) -> Optional[float]:
+        if not self.started_at or not self.completed_at:
+            return None
+        started = datetime.fromisoformat(self.started_at)
+        completed = datetime.fromisoformat(self.completed_at)
+        return max(0.0, (completed - started).total_seconds())
+
+
+@dataclass
+class DagRun:
+    run_id: str
+    graph: TaskGraph
+    nodes: Dict[str, DagNode]
+    max_parallel: int
+    runner: Optional[str] = None
+    mark_done: bool = True
+    status: str = "running"
+    started_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+    completed_at: Optional[str] = None
+
+    def ready(self) -> List[DagNode]:
+        """Pending nodes whose dependencies in this run have all succeeded."""
+        return [
+            node for node in self.nodes.values()
+            if node.state == "pending"
+            and all(self.nodes[d].state == "succeeded" for d in node.dependencies if d in self.nodes)
+        ]
+
+    def summary(self) -> Dict[str, Any]:
+        durations = {t: n.duration for t, n in self.nodes.items() if n.duration is not None}
+        critical_path, critical_seconds = self.graph.critical_path(durations)
+        end = datetime.fromisoformat(self.completed_at) if self.completed_at else datetime.utcnow()
+        makespan = (end - datetime.fromisoformat(self.started_at)).total_seconds()
+        busy = sum(durations.values())
+        counts: Dict[str, int] = {}
+        for node in self.nodes.values():
+            counts[node.state] = counts.get(node.state, 0) + 1
+        return {
+            "run_id": self.run_id,
+            "status": self.status,
+            "started_at": self.started_at,
+            "completed_at": self.completed_at,
+            "max_parallel": self.max_parallel,
+            "counts": counts,
+            "order": self.graph.topological_order(self.nodes),
+            "makespan_seconds": round(makespan, 3),
+            "critical_path": critical_path,
+            "critical_path_seconds": round(critical_seconds, 3),
+            "task_seconds": round(busy, 3),
+            # Average number of tasks running at once
+            "parallelism": round(busy / makespan, 2) if makespan > 0 else None,
+            "nodes": {
+                task_id: {
+                    "state": node.state,
+                    "dependencies": node.dependencies,
+                    "execution_id": node.execution_id,
+                    "exit_code": node.exit_code,
+                    "started_at": node.started_at,
+                    "completed_at": node.completed_at,
+                    "duration_seconds": round(node.duration, 3) if node.duration is not None else None,
+                    "cached": node.cached,
+                    "error": node.error,
+                }
+                for task_id, node in self.nodes.items()
+            },
+        }
+
+
+def select_tasks(graph: TaskGraph, targets: Optional[List[str]] = None) -> Set[str]:
+    """Tasks a run of ``targets`` executes: the targets and their unfinished dependencies.
+
+    Args:
+        graph: Graph of every indexed task
+        targets: Tasks to run; defaults to every task that is not done
+
+    Raises:
+        ValueError: If a target is unknown
+    """
+    done = {task_id for task_id, task in graph.tasks.items() if task.get("status") == "done"}
+    if targets is None:
+        targets = [task_id for task_id in graph.tasks if task_id not in done]
+    missing = [task_id for task_id in targets if task_id not in graph.tasks]
+    if missing:
+        raise ValueError(f"Unknown tasks: {', '.join(missing)}")
+    return graph.closure(targets, skip=done)
+
+
+class DagScheduler:
+    """Submits tasks to the execution scheduler as their dependencies finish."""
+
+    def __init__(
+        self,
+        scheduler: ExecutionScheduler,
+        set_task_status: TaskStatusSetter,
+        max_parallel: int = MAX_CONCURRENT_EXECUTIONS,
+    ):
+        self.scheduler = scheduler
+        self.set_task_status = set_task_status
+        self.max_parallel = max(1, max_parallel)
+        self.runs: Dict[str, DagRun] = {}
+        self._drivers: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, asyncio.Future] = {}
+        scheduler.executor.add_completion_listener(self._on_completion)
+
+    async def _on_completion(self, record: Dict[str, Any]):
+        waiter = self._waiters.pop(record["execution_id"], None)
+        if waiter is not None and not waiter.done():
+            waiter.set_result(record)
+
+    def start(
+        self,
+        tasks: List[Dict[str, Any]],
+        targets: Optional[List[str]] = None,
+        max_parallel: Optional[int] = None,
+        runner: Optional[str] = None,
+        mark_done: bool = True,
+        options: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> DagRun:
+        """Start running tasks in dependency order.
+
+        Args:
+            tasks: Every indexed task, with ``id``, ``status``, ``file_path``
+                and ``depends_on``
+            targets: Tasks to run; defaults to every task that is not done.
+                Their unfinished dependencies are run first.
+            max_parallel: Executions of this run that may be active at once
+            runner: Runner backend for every execution
+            mark_done: Set each task to done when its execution succeeds
+            options: Per-task ``use_cache`` and ``inputs``
+
+        Returns:
+            The started run
+
+        Raises:
+            ValueError: If a task is unknown, or the dependencies are unknown
+                or contain a cycle
+        """
+        graph = TaskGraph(tasks)
+        selected = select_tasks(graph, targets)
+        sub_graph = TaskGraph(graph.tasks[task_id] for task_id in selected)
+        # References to finished tasks are satisfied, so only check what will run
+        for task_id in selected:
+            unknown = graph.unknown.get(task_id)
+            if unknown:
+                raise ValueError(f"Unknown task dependencies: {task_id}: {', '.join(unknown)}")
+        cycle = sub_graph.find_cycle()
+        if cycle is not None:
+            raise ValueError(f"Dependency cycle: {' -> '.join(cycle)}")
+
+        options = options or {}
+        nodes = {
+            task_id: DagNode(
+                task_id=task_id,
+                dependencies=sub_graph.dependencies[task_id],
+                priority=graph.tasks[task_id].get("priority"),
+                use_cache=bool(options.get(task_id, {}).get("use_cache")),
+                inputs=list(options.get(task_id, {}).get("inputs") or []),
+            )
+            for task_id in selected
+        }
+        run = DagRun(
+            run_id=str(uuid.uuid4()),
+            graph=sub_graph,
+            nodes=nodes,
+            max_parallel=max(1, max_parallel or self.max_parallel),
+            runner=runner,
+            mark_done=mark_done,
+        )
+        self.runs[run.run_id] = run
+        self._drivers[run.run_id] = asyncio.create_task(self._drive(run))
+        self._prune()
+        return run
+
+    def _prune(self):
+        finished = [run_id for run_id, run in self.runs.items() if run.status != "running"]
+        for run_id in finished[:max(0, len(finished) - MAX_FINISHED_RUNS)]:
+            del self.runs[run_id]
+
+    async def _launch(self, run: DagRun, node: DagNode) -> asyncio.Future:
+        """Submit a node's task; the future resolves with its final record."""
+        future = asyncio.get_running_loop().create_future()
+        node.state = "running"
+        # Before submitting, so a cached run that completes during submit
+        # finds the task in progress and can move it on
+        previous = run.graph.tasks[node.task_id].get("status") or "todo"
+        await self.set_task_status(node.task_id, "inprogress")
+        try:
+            record = await self.scheduler.submit(
+                node.task_id,
+                priority=node.priority,
+                runner=run.runner,
+                use_cache=node.use_cache,
+                inputs=node.inputs,
+                dag_run_id=run.run_id,
+                # The run decides the task status itself
+                review_on_complete=not run.mark_done,
+            )
+        except Exception as e:
+            if previous != "inprogress":
+                await self.set_task_status(node.task_id, previous)
+            future.set_result({"status": "failed", "error": str(e)})
+            return future
+
+        node.execution_id = record["execution_id"]
+        if record.get("cached"):
+            future.set_result(record)
+        else:
+            self._waiters[node.execution_id] = future
+        return future
+
+    async def _finish(self, run: DagRun, node: DagNode, record: Dict[str, Any]):
+        node.exit_code = record.get("exit_code")
+        node.started_at = record.get("started_at")
+        node.completed_at = record.get("completed_at")
+        node.cached = bool(record.get("cached"))
+        node.error = record.get("error")
+        if record.get("status") == "completed":
+            node.state = "succeeded"
+            if run.mark_done:
+                await self.set_task_status(node.task_id, "done", artifacts=record.get("artifacts"))
+            return
+
+        node.state = "failed"
+        if run.mark_done and node.execution_id:
+            await self.set_task_status(node.task_id, "review")
+        dependents = run.graph.dependents()
+        stack = list(dependents[node.task_id])
+        while stack:
+            dependent = run.nodes[stack.pop()]
+            if dependent.state == "pending":
+                dependent.state = "skipped"
+                dependent.error = f"Dependency {node.task_id} {record.get('status', 'failed')}"
+                stack.extend(dependents[dependent.task_id])
+
+    async def _drive(self, run: DagRun):
+        running: Dict[asyncio.Future, DagNode] = {}
+        try:
+            while True:
+                for node in run.ready()[:max(0, run.max_parallel - len(running))]:
+                    running[await self._launch(run, node)] = node
+                if not running:
+                    break
+                finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for future in finished:
+                    await self._finish(run, running.pop(future), future.result())
+            run.status = "failed" if any(n.state != "succeeded" for n in run.nodes.values()) else "completed"
+        except asyncio.CancelledError:
+            run.status = "cancelled"
+            raise
+        except Exception as e:
+            logger.error(f"DAG run {run.run_id} failed: {e}")
+            run.status = "failed"
+        finally:
+            for node in running.values():
+                self._waiters.pop(node.execution_id, None)
+            run.completed_at = datetime.utcnow().isoformat()
+            self._drivers.pop(run.run_id, None)
+            summary = run.summary()
+            await event_broadcaster.broadcast("dag_event", {
+                "run_id": run.run_id,
+                "status": run.status,
+                "counts": summary["counts"],
+                "makespan_seconds": summary["makespan_seconds"],
+                "critical_path": summary["critical_path"],
+                "critical_path_seconds": summary["critical_path_seconds"],
+            })
+
+    def get(self, run_id: str) -> Optional[DagRun]:
+        return self.runs.get(run_id)
+
+    async def cancel(self, run_id: str) -> bool:
+        """Stop launching tasks of a run. Executions already started keep running."""
+        driver = self._drivers.get(run_id)
+        if driver is None:
+            return False
+        driver.cancel()
+        await asyncio.gather(driver, return_exceptions=True)
+        return True
+
+    async def close(self):
+        for run_id in list(self._drivers):
+            await self.cancel(run_id)
@@ -1,15 +1,27 @@
 #!/usr/bin/env python3
-from tinydb import TinyDB
+"""View the TaskHub task database in the terminal.
+
+The database file is parsed as a stream, one task at a time, so printing
+starts right away and memory stays flat however many tasks it holds. Rows
+are printed in pages of ``--page-size``; ``--stats-only`` prints just the
+summary counts.
+"""
+from collections import Counter
 from datetime import datetime
+from json import JSONDecodeError, JSONDecoder
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
 from rich import box
+import argparse
 import sys
 from pathlib import Path
 
 console = Console()
 
+READ_CHUNK_SIZE = 1024 * 1024
+DEFAULT_TABLE = "_default"
+
 def format_datetime(dt_str):
     if dt_str:
         try:
@@ -22,86 +34,205 @@ def format_datetime(dt_str):
 def get_status_color(status):
     return {
         "todo": "red",
-        "in_progress": "yellow", 
+        "inprogress": "yellow",
+        "review": "blue",
         "done": "green"
     }.get(status, "white")
 
-def view_database(db_path="db/tasks_db.json"):
-    try:
-        db = TinyDB(db_path)
-        tasks = db.all()
-        
-        if not tasks:
-            console.print("[yellow]Database is empty[/yellow]")
+class _Stream:
+    """Incremental reader of JSON values from a file."""
+
+    def __init__(self, f, chunk_size=READ_CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = JSONDecoder()
+
+    def _fill(self):
+        # Drop what was consumed so the buffer only holds the current value
+        chunk = self.f.read(self.chunk_size)
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        self.eof = not chunk
+
+    def peek(self):
+        """Next non-whitespace character, without consuming it ("" at the end)."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer) or self.eof:
+                return self.buffer[self.pos:self.pos + 1]
+            self._fill()
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} in database file, found {self.peek()!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next JSON value, reading more of the file until it is complete."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except JSONDecodeError:
+                if self.eof:
+                    raise
+                self._fill()
+                continue
+            self.pos = end
+            return value
+
+def iter_tasks(db_path, table=DEFAULT_TABLE, chunk_size=READ_CHUNK_SIZE):
+    """Yield the documents of a TinyDB table one at a time, reading the file as a stream."""
+    with open(db_path, "r", encoding="utf-8") as f:
+        stream = _Stream(f, chunk_size)
+        if stream.peek() == "":
             return
-            
-        table = Table(
-            title=f"TaskHub Database ({len(tasks)} tasks)",
-            show_header=True,
-            header_style="bold magenta",
-            box=box.ROUNDED,
-            expand=False
-        )
-        
-        table.add_column("#", style="dim", width=3)
-        table.add_column("ID", style="cyan", width=8)
-        table.add_column("Status", width=12)
-        table.add_column("File", style="blue", width=40)
-        table.add_column("Updated", width=16)
-        table.add_column("Priority", width=8)
-        table.add_column("Assignee", width=12)
-        table.add_column("Artifacts", width=20)
-        
-        for idx, task in enumerate(tasks, 1):
-            status = task.get("status", "unknown")
-            status_colored = f"[{get_status_color(status)}]{status}[/{get_status_color(status)}]"
-            
-            artifacts = task.get("artifacts", [])
-            artifacts_str = ", ".join(artifacts) if artifacts else "-"
-            
-            table.add_row(
-                str(idx),
-                task.get("id", "-")[:8],
-                status_colored,
-                task.get("file_path", "-"),
-                format_datetime(task.get("updated_at")),
-                task.get("priority", "-") or "-",
-                task.get("assignee", "-") or "-",
-                artifacts_str
-            )
-        
-        console.print(table)
-        
-        stats = {
-            "todo": sum(1 for t in tasks if t.get("status") == "todo"),
-            "in_progress": sum(1 for t in tasks if t.get("status") == "in_progress"),
-            "done": sum(1 for t in tasks if t.get("status") == "done")
-        }
-        
-        stats_panel = Panel(
-            f"[red]Todo: {stats['todo']}[/red] | "
-            f"[yellow]In Progress: {stats['in_progress']}[/yellow] | "
-            f"[green]Done: {stats['done']}[/green]",
-            title="Summary",
-            border_style="blue"
-        )
-        console.print(stats_panel)
-        
-    except Exception as e:
+        stream.expect("{")
+        while stream.peek() != "}":
+            name = stream.value()
+            stream.expect(":")
+            stream.expect("{")
+            while stream.peek() != "}":
+                stream.value()  # document ID
+                stream.expect(":")
+                document = stream.value()
+                if name == table:
+                    yield document
+                if stream.peek() == ",":
+                    stream.expect(",")
+            stream.expect("}")
+            if stream.peek() == ",":
+                stream.expect(",")
+
+def _new_table(first_row):
+    table = Table(
+        title=f"TaskHub Database (from #{first_row})",
+        show_header=True,
+        header_style="bold magenta",
+        box=box.ROUNDED,
+        expand=False
+    )
+
+    table.add_column("#", style="dim", width=6)
+    table.add_column("ID", style="cyan", width=8)
+    table.add_column("Status", width=12)
+    table.add_column("File", style="blue", width=40)
+    table.add_column("Updated", width=16)
+    table.add_column("Priority", width=8)
+    table.add_column("Assignee", width=12)
+    table.add_column("Artifacts", width=20)
+    return table
+
+def _add_row(table, idx, task):
+    status = task.get("status", "unknown")
+    status_colored = f"[{get_status_color(status)}]{status}[/{get_status_color(status)}]"
+
+    artifacts = task.get("artifacts", [])
+    artifacts_str = ", ".join(artifacts) if artifacts else "-"
+
+    table.add_row(
+        str(idx),
+        task.get("id", "-")[:8],
+        status_colored,
+        task.get("file_path", "-"),
+        format_datetime(task.get("updated_at")),
+        task.get("priority", "-") or "-",
+        task.get("assignee", "-") or "-",
+        artifacts_str
+    )
+
+def _stats_panel(by_status, by_priority, by_assignee):
+    total = sum(by_status.values())
+    lines = [
+        f"Total: {total} | "
+        f"[red]Todo: {by_status['todo']}[/red] | "
+        f"[yellow]In Progress: {by_status['inprogress']}[/yellow] | "
+        f"[blue]Review: {by_status['review']}[/blue] | "
+        f"[green]Done: {by_status['done']}[/green]",
+        "Priority: " + " | ".join(f"{p or 'none'}: {by_priority[p]}" for p in ("high", "medium", "low", None)),
+        "Assignees: " + (", ".join(f"{a or 'unassigned'}: {n}" for a, n in by_assignee.most_common()) or "-"),
+    ]
+    return Panel("\n".join(lines), title="Summary", border_style="blue")
+
+def view_database(db_path="db/tasks_db.json", status=None, assignee=None, limit=None, page_size=100, stats_only=False):
+    """Print the tasks matching the filters page by page, then the summary.
+
+    Args:
+        db_path: Path of the TinyDB task database
+        status: Only show tasks with this status
+        assignee: Only show tasks of this assignee
+        limit: Stop after this many matching tasks
+        page_size: Rows per printed table
+        stats_only: Only print the summary counts
+    """
+    by_status, by_priority, by_assignee = Counter(), Counter(), Counter()
+    shown = 0
+    table = None
+    stopped = False
+
+    try:
+        for task in iter_tasks(db_path):
+            if status is not None and task.get("status") != status:
+                continue
+            if assignee is not None and task.get("assignee") != assignee:
+                continue
+            by_status[task.get("status")] += 1
+            by_priority[task.get("priority")] += 1
+            by_assignee[task.get("assignee")] += 1
+            if stats_only:
+                continue
+
+            if limit is not None and shown >= limit:
+                stopped = True
+                break
+            shown += 1
+            if table is None:
+                table = _new_table(shown)
+            _add_row(table, shown, task)
+            if table.row_count >= page_size:
+                console.print(table)
+                table = None
+    except (OSError, ValueError) as e:
         console.print(f"[red]Error reading database: {e}[/red]")
         sys.exit(1)
 
+    if table is not None:
+        console.print(table)
+
+    if not by_status:
+        console.print("[yellow]No tasks found[/yellow]" if status or assignee else "[yellow]Database is empty[/yellow]")
+        return
+    if stopped:
+        console.print(f"[dim]Stopped after {limit} tasks; use --stats-only for the totals[/dim]")
+        return
+    console.print(_stats_panel(by_status, by_priority, by_assignee))
+
 def main():
-    if len(sys.argv) > 1:
-        db_path = sys.argv[1]
-    else:
-        db_path = "db/tasks_db.json"
-    
-    if not Path(db_path).exists():
-        console.print(f"[red]Database file not found: {db_path}[/red]")
+    parser = argparse.ArgumentParser(description="View the TaskHub task database")
+    parser.add_argument("db_path", nargs="?", default="db/tasks_db.json", help="Path of the task database")
+    parser.add_argument("--status", choices=["todo", "inprogress", "review", "done"], help="Only show tasks with this status")
+    parser.add_argument("--assignee", help="Only show tasks of this assignee")
+    parser.add_argument("--limit", type=int, help="Stop after this many tasks")
+    parser.add_argument("--page-size", type=int, default=100, help="Rows per table (default: 100)")
+    parser.add_argument("--stats-only", action="store_true", help="Only print the summary counts")
+    args = parser.parse_args()
+
+    if not Path(args.db_path).exists():
+        console.print(f"[red]Database file not found: {args.db_path}[/red]")
         sys.exit(1)
-    
-    view_database(db_path)
+
+    view_database(
+        args.db_path,
+        status=args.status,
+        assignee=args.assignee,
+        limit=args.limit,
+        page_size=max(1, args.page_size),
+        stats_only=args.stats_only
+    )
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -3,19 +3,41 @@
 import asyncio
 import json
 import logging
-from datetime import datetime
-from typing import Any, Dict, List, Optional, Set
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
 from uuid import uuid4
 
+from .event_bus import EventBus, InProcessEventBus, create_event_bus
+from .event_history import EventHistory, create_event_history
+
 logger = logging.getLogger(__name__)
 
+EventListener = Callable[[Dict[str, Any]], Awaitable[None]]
+
 
 class EventBroadcaster:
     """Manages SSE event broadcasting to connected clients."""
     
-    def __init__(self):
+    def __init__(self, bus: Optional[EventBus] = None, history: Optional[EventHistory] = None):
         self._clients: Set[asyncio.Queue] = set()
+        self._filters: Dict[asyncio.Queue, Tuple[Optional[Set[str]], Optional[Set[str]]]] = {}
+        self._listeners: List[EventListener] = []
         self._lock = asyncio.Lock()
+        self._bus = bus or InProcessEventBus()
+        self._bus.bind(self._fan_out)
+        self.history = history
+    
+    async def start(self):
+        """Start receiving events published by other processes."""
+        await self._bus.start()
+        if self.history is not None:
+            self.history.start()
+    
+    async def stop(self):
+        """Stop receiving events and flush the event history."""
+        await self._bus.stop()
+        if self.history is not None:
+            self.history.stop()
     
     async def connect(self) -> asyncio.Queue:
         """Connect a new client and return their event queue."""
@@ -29,22 +51,74 @@ class EventBroadcaster:
         """Disconnect a client by removing their queue."""
         async with self._lock:
             self._clients.discard(queue)
+            self._filters.pop(queue, None)
         logger.info(f"SSE client disconnected. Total clients: {len(self._clients)}")
     
+    def add_listener(self, listener: EventListener):
+        """Call ``listener`` with every event delivered to this process, parsed."""
+        self._listeners.append(listener)
+    
+    def set_filter(
+        self,
+        queue: asyncio.Queue,
+        event_types: Optional[List[str]] = None,
+        task_ids: Optional[List[str]] = None
+    ):
+        """Restrict the events delivered to a client.
+        
+        Args:
+            queue: The client's event queue
+            event_types: Only deliver these event types (None for all)
+            task_ids: Only deliver events for these tasks (None for all)
+        """
+        if event_types is None and task_ids is None:
+            self._filters.pop(queue, None)
+        else:
+            self._filters[queue] = (
+                set(event_types) if event_types is not None else None,
+                set(task_ids) if task_ids is not None else None
+            )
+    
+    @staticmethod
+    def _matches(event: Dict[str, Any], event_filter: Tuple[Optional[Set[str]], Optional[Set[str]]]) -> bool:
+        event_types, task_ids = event_filter
+        if event_types is not None and event.get("event") not in event_types:
+            return False
+        if task_ids is not None:
+            data = event.get("data")
+            if not isinstance(data, dict) or data.get("task_id") not in task_ids:
+                return False
+        return True
+    
     async def broadcast(self, event_type: str, data: Dict[str, Any]):
         """Broadcast an event to all connected clients."""
+        now = datetime.utcnow()
         event = {
             "id": str(uuid4()),
             "event": event_type,
             "data": data,
-            "timestamp": datetime.utcnow().isoformat() + "Z"
+            "timestamp": now.isoformat() + "Z"
         }
         
         event_str = json.dumps(event)
+        if self.history is not None:
+            # Recorded by the publishing process only, so each event is stored once
+            self.history.append(event_str, now.replace(tzinfo=timezone.utc).timestamp())
+        await self._bus.publish(event_str)
+        
+        logger.info(f"Broadcasted {event_type} event to {len(self._clients)} clients")
+    
+    async def _fan_out(self, event_str: str):
+        """Deliver a serialized event to the clients connected to this process."""
         disconnected_clients = []
+        # Parse once for all filtered clients and listeners, and only if any exist
+        event = json.loads(event_str) if self._filters or self._listeners else None
         
         async with self._lock:
             for queue in self._clients:
+                event_filter = self._filters.get(queue)
+                if event_filter is not None and not self._matches(event, event_filter):
+                    continue
                 try:
                     # Non-blocking put with timeout
                     await asyncio.wait_for(queue.put(event_str), timeout=1.0)
@@ -58,7 +132,11 @@ class EventBroadcaster:
         for queue in disconnected_clients:
             await self.disconnect(queue)
         
-        logger.info(f"Broadcasted {event_type} event to {len(self._clients)} clients")
+        for listener in self._listeners:
+            try:
+                await listener(event)
+            except Exception as e:
+                logger.error(f"Error in event listener: {e}")
     
     async def broadcast_task_update(self, task_id: str, status: str, **kwargs):
         """Broadcast a task update event."""
@@ -85,4 +163,4 @@ class EventBroadcaster:
 
 
 # Global event broadcaster instance
-event_broadcaster = EventBroadcaster()
\ No newline at end of file
+event_broadcaster = EventBroadcaster(create_event_bus(), create_event_history())
\ No newline at end of file
@@ -0,0 +1,258 @@
+"""Event bus backends for sharing broadcasts between processes.
+
+The broadcaster publishes every serialized event to a bus. The bus hands
+each event - including those published by other processes - back to the
+local delivery callback, which fans it out to the clients connected to
+this process.
+"""
+
+import asyncio
+import fcntl
+import logging
+import os
+import queue
+import threading
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+from uuid import uuid4
+
+from .config import (
+    EVENT_BUS_BACKEND,
+    EVENT_BUS_MAX_BYTES,
+    EVENT_BUS_PATH,
+    EVENT_BUS_POLL_INTERVAL,
+)
+
+logger = logging.getLogger(__name__)
+
+DeliverCallback = Callable[[str], Awaitable[None]]
+
+
+class EventBus:
+    """Base class for event bus backends."""
+
+    def __init__(self):
+        self._deliver: Optional[DeliverCallback] = None
+
+    def bind(self, deliver: DeliverCallback):
+        """Register the callback that delivers events to local clients."""
+        self._deliver = deliver
+
+    async def start(self):
+        """Start receiving events published by other processes."""
+
+    async def stop(self):
+        """Stop receiving events published by other processes."""
+
+    async def publish(self, event_str: str):
+        """Publish a serialized event to every process on the bus."""
+        raise NotImplementedError
+
+
+class InProcessEventBus(EventBus):
+    """Default bus that only delivers events inside the current process."""
+
+    async def publish(self, event_str: str):
+        if self._deliver is not None:
+            await self._deliver(event_str)
+
+
+class FileEventBus(EventBus):
+    """Bus backed by a local append-only log tailed by every process.
+
+    Each event is written as a single ``<origin> <event json>`` line with
+    ``O_APPEND``, so concurrent writers never interleave. Events are
+    delivered locally right away and written by a background thread, in
+    publish order, so the event loop never waits on the file or its lock;
+    the tailer skips lines carrying this process's origin and delivers the
+    rest. The log is rotated to ``<path>.1`` once it grows past
+    ``max_bytes``. Writers hold a shared ``flock`` and rotation an exclusive
+    one, so no writer can append to a file after it has been rotated away.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_bytes: int = EVENT_BUS_MAX_BYTES,
+        poll_interval: float = EVENT_BUS_POLL_INTERVAL,
+    ):
+        super().__init__()
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.poll_interval = poll_interval
+        self._origin = uuid4().hex[:12]
+        self._write_fd: Optional[int] = None
+        self._lock_fd: Optional[int] = None
+        self._tail_task: Optional[asyncio.Task] = None
+        self._queue: "queue.SimpleQueue[Optional[bytes]]" = queue.SimpleQueue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+
+    def _open_for_append(self) -> int:
+        return os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def _ensure_files(self):
+        if self._lock_fd is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._lock_fd = os.open(
+                self.path.with_name(self.path.name + ".lock"), os.O_RDWR | os.O_CREAT, 0o644
+            )
+        if self._write_fd is None:
+            self._write_fd = self._open_for_append()
+
+    def _append(self, data: bytes):
+        self._ensure_files()
+        fcntl.flock(self._lock_fd, fcntl.LOCK_SH)
+        try:
+            # Another process may have rotated the log since our last write
+            try:
+                current_ino = os.stat(self.path).st_ino
+            except FileNotFoundError:
+                current_ino = None
+            if current_ino != os.fstat(self._write_fd).st_ino:
+                os.close(self._write_fd)
+                self._write_fd = self._open_for_append()
+            os.write(self._write_fd, data)
+            size = os.fstat(self._write_fd).st_size
+        finally:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+        if size > self.max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        try:
+            try:
+                if os.stat(self.path).st_size <= self.max_bytes:
+                    return  # Someone else rotated it first
+            except FileNotFoundError:
+                return
+            os.replace(self.path, self.path.with_name(self.path.name + ".1"))
+            os.close(self._write_fd)
+            self._write_fd = self._open_for_append()
+        finally:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _run_writer(self):
+        while True:
+            data = self._queue.get()
+            # Write everything queued meanwhile in one append
+            batch = [data]
+            while data is not None:
+                try:
+                    data = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(data)
+            lines = [item for item in batch if item is not None]
+            if lines:
+                try:
+                    self._append(b"".join(lines))
+                except Exception as e:
+                    logger.error(f"Failed to write to event bus log: {e}")
+            if data is None:
+                return
+
+    def _ensure_writer(self):
+        with self._writer_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._run_writer, name="taskhub-event-bus", daemon=True)
+                self._writer.start()
+
+    async def publish(self, event_str: str):
+        if self._writer is None:
+            self._ensure_writer()
+        self._queue.put(f"{self._origin} {event_str}\n".encode())
+        if self._deliver is not None:
+            await self._deliver(event_str)
+
+    async def start(self):
+        self._ensure_writer()
+        if self._tail_task is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Position the reader now so events published after start() are
+            # never skipped, even before the tail task first runs
+            read_fd = os.open(self.path, os.O_RDONLY | os.O_CREAT, 0o644)
+            os.lseek(read_fd, 0, os.SEEK_END)
+            self._tail_task = asyncio.create_task(self._tail(read_fd))
+            logger.info(f"File event bus tailing {self.path}")
+
+    async def stop(self):
+        if self._tail_task is not None:
+            self._tail_task.cancel()
+            try:
+                await self._tail_task
+            except asyncio.CancelledError:
+                pass
+            self._tail_task = None
+        with self._writer_lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            # Write what is still queued before closing the log
+            self._queue.put(None)
+            await asyncio.to_thread(writer.join, 5.0)
+        for fd in (self._write_fd, self._lock_fd):
+            if fd is not None:
+                os.close(fd)
+        self._write_fd = self._lock_fd = None
+
+    async def _tail(self, read_fd: int):
+        buffer = b""
+        try:
+            while True:
+                buffer = await self._drain(read_fd, buffer)
+
+                # Follow the log across rotations once the old file is drained
+                try:
+                    rotated = os.stat(self.path).st_ino != os.fstat(read_fd).st_ino
+                except FileNotFoundError:
+                    rotated = False
+                if rotated:
+                    buffer = await self._drain(read_fd, buffer)
+                    old_ino = os.fstat(read_fd).st_ino
+                    os.close(read_fd)
+                    buffer = b""
+                    # More than one rotation since the last poll: the file
+                    # now at <path>.1 was never read, so replay it in full
+                    rotated_path = self.path.with_name(self.path.name + ".1")
+                    try:
+                        skipped_fd = os.open(rotated_path, os.O_RDONLY)
+                    except FileNotFoundError:
+                        skipped_fd = None
+                    if skipped_fd is not None:
+                        if os.fstat(skipped_fd).st_ino != old_ino:
+                            await self._drain(skipped_fd, b"")
+                        os.close(skipped_fd)
+                    read_fd = os.open(self.path, os.O_RDONLY | os.O_CREAT, 0o644)
+                    continue
+
+                await asyncio.sleep(self.poll_interval)
+        finally:
+            os.close(read_fd)
+
+    async def _drain(self, read_fd: int, buffer: bytes) -> bytes:
+        """Deliver every complete line readable from ``read_fd``."""
+        while True:
+            chunk = os.read(read_fd, 65536)
+            if not chunk:
+                return buffer
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                origin, _, event_str = line.decode("utf-8", errors="replace").partition(" ")
+                if origin == self._origin or not event_str:
+                    continue
+                try:
+                    await self._deliver(event_str)
+                except Exception as e:
+                    logger.error(f"Error delivering bus event: {e}")
+
+
+def create_event_bus(backend: str = EVENT_BUS_BACKEND) -> EventBus:
+    """Create the event bus configured for this process."""
+    if backend == "file":
+        return FileEventBus(EVENT_BUS_PATH)
+    if backend != "memory":
+        logger.warning(f"Unknown event bus backend '{backend}', using in-process bus")
+    return InProcessEventBus()
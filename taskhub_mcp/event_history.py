@@ -0,0 +1,266 @@
+"""Durable, segmented history of broadcast events.
+
+Every broadcast is handed to a background writer thread that appends it to
+size-rotated segment files. Each line of a segment is
+``<timestamp_ms> <event json>``; a sparse ``.idx`` file next to each segment
+maps timestamps to byte offsets every ``index_interval`` bytes so range
+queries can seek instead of scanning whole segments.
+
+Segments are named ``<first_timestamp_ms>_<writer_id>.jsonl``. Every process
+writes its own chain of segments, and queries merge the chains by timestamp.
+"""
+
+import bisect
+import heapq
+import json
+import logging
+import os
+import queue
+import threading
+from pathlib import Path
+from typing import IO, Dict, Iterator, List, Optional, Tuple
+from uuid import uuid4
+
+from .config import (
+    EVENT_HISTORY_DIR,
+    EVENT_HISTORY_ENABLED,
+    EVENT_HISTORY_INDEX_INTERVAL,
+    EVENT_HISTORY_MAX_BYTES,
+    EVENT_HISTORY_SEGMENT_BYTES,
+)
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_SUFFIX = ".jsonl"
+INDEX_SUFFIX = ".idx"
+
+
+class EventHistory:
+    """Appends events to an on-disk log and answers time-range queries."""
+
+    def __init__(
+        self,
+        directory: Path,
+        segment_bytes: int = EVENT_HISTORY_SEGMENT_BYTES,
+        index_interval: int = EVENT_HISTORY_INDEX_INTERVAL,
+        max_bytes: int = EVENT_HISTORY_MAX_BYTES,
+    ):
+        self.directory = Path(directory)
+        self.segment_bytes = segment_bytes
+        self.index_interval = index_interval
+        self.max_bytes = max_bytes
+        self._writer_id = f"{os.getpid()}-{uuid4().hex[:6]}"
+        self._queue: "queue.SimpleQueue[Optional[Tuple[int, str]]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+
+        # Writer thread state
+        self._segment: Optional[IO[bytes]] = None
+        self._index: Optional[IO[bytes]] = None
+        self._segment_size = 0
+        self._last_indexed = 0
+
+    def start(self):
+        """Start the background writer thread if it is not running."""
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self.directory.mkdir(parents=True, exist_ok=True)
+                self._thread = threading.Thread(
+                    target=self._run, name="taskhub-event-history", daemon=True
+                )
+                self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Flush pending events and stop the writer thread."""
+        with self._thread_lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout)
+
+    def append(self, event_str: str, timestamp: float):
+        """Queue an event for writing. Never blocks on disk I/O."""
+        if self._thread is None:
+            self.start()
+        self._queue.put((int(timestamp * 1000), event_str))
+
+    # Writer thread
+
+    def _run(self):
+        try:
+            while True:
+                item = self._queue.get()
+                batch = [item]
+                while item is not None and len(batch) < 1024:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    batch.append(item)
+
+                for entry in batch:
+                    if entry is None:
+                        return
+                    try:
+                        self._write(*entry)
+                    except Exception as e:
+                        logger.error(f"Failed to write event history: {e}")
+                self._flush()
+        finally:
+            self._close_segment()
+
+    def _write(self, timestamp_ms: int, event_str: str):
+        if self._segment is None or self._segment_size >= self.segment_bytes:
+            self._open_segment(timestamp_ms)
+
+        line = f"{timestamp_ms} {event_str}\n".encode()
+        if self._segment_size == 0 or self._segment_size - self._last_indexed >= self.index_interval:
+            self._index.write(f"{timestamp_ms} {self._segment_size}\n".encode())
+            self._last_indexed = self._segment_size
+        self._segment.write(line)
+        self._segment_size += len(line)
+
+    def _flush(self):
+        if self._segment is not None:
+            self._segment.flush()
+            self._index.flush()
+
+    def _open_segment(self, timestamp_ms: int):
+        self._close_segment()
+        stem = f"{timestamp_ms:013d}_{self._writer_id}"
+        self._segment = open(self.directory / (stem + SEGMENT_SUFFIX), "ab")
+        self._index = open(self.directory / (stem + INDEX_SUFFIX), "ab")
+        self._segment_size = 0
+        self._last_indexed = 0
+        self._apply_retention()
+
+    def _close_segment(self):
+        for f in (self._segment, self._index):
+            if f is not None:
+                f.close()
+        self._segment = self._index = None
+
+    def _apply_retention(self):
+        """Delete the oldest segments once the history exceeds max_bytes."""
+        segments = sorted(self.directory.glob("*" + SEGMENT_SUFFIX))
+        sizes = {path: path.stat().st_size for path in segments}
+        total = sum(sizes.values())
+        for path in segments:
+            if total <= self.max_bytes:
+                break
+            if self._segment is not None and path.name == Path(self._segment.name).name:
+                continue
+            path.unlink(missing_ok=True)
+            path.with_suffix(INDEX_SUFFIX).unlink(missing_ok=True)
+            total -= sizes[path]
+
+    # Queries
+
+    def _segment_chains(self) -> Dict[str, List[Tuple[int, Path]]]:
+        """Group segment files by writer, each chain ordered by start time."""
+        chains: Dict[str, List[Tuple[int, Path]]] = {}
+        for path in self.directory.glob("*" + SEGMENT_SUFFIX):
+            start, _, writer_id = path.stem.partition("_")
+            try:
+                chains.setdefault(writer_id, []).append((int(start), path))
+            except ValueError:
+                continue
+        for chain in chains.values():
+            chain.sort()
+        return chains
+
+    @staticmethod
+    def _seek_offset(segment: Path, since_ms: int) -> int:
+        """Use the sparse index to find where to start reading for since_ms."""
+        try:
+            entries = [
+                tuple(map(int, line.split()))
+                for line in segment.with_suffix(INDEX_SUFFIX).read_bytes().splitlines()
+                if line
+            ]
+        except (OSError, ValueError):
+            return 0
+        timestamps = [ts for ts, _ in entries]
+        # Last index entry strictly before since_ms; events with equal
+        # timestamps may sit just before an entry with the same value
+        position = bisect.bisect_left(timestamps, since_ms) - 1
+        return entries[position][1] if position >= 0 else 0
+
+    def _read_chain(
+        self, chain: List[Tuple[int, Path]], since_ms: int, until_ms: int
+    ) -> Iterator[Tuple[int, str]]:
+        for i, (start, segment) in enumerate(chain):
+            next_start = chain[i + 1][0] if i + 1 < len(chain) else None
+            if next_start is not None and next_start < since_ms:
+                continue
+            if start > until_ms:
+                return
+            try:
+                f = open(segment, "rb")
+            except FileNotFoundError:
+                continue  # Removed by retention while we were reading
+            with f:
+                f.seek(self._seek_offset(segment, since_ms))
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # Partially written by the writer thread
+                    ts_bytes, _, event = line.partition(b" ")
+                    ts = int(ts_bytes)
+                    if ts < since_ms:
+                        continue
+                    if ts > until_ms:
+                        return
+                    yield ts, event.rstrip(b"\n").decode("utf-8", errors="replace")
+
+    @staticmethod
+    def _refers_to(event: str, task_marker: str, task_id: str) -> bool:
+        """Whether the task_id in an event's data is task_id."""
+        if task_marker not in event:
+            return False
+        try:
+            data = json.loads(event).get("data")
+        except (ValueError, AttributeError):
+            return False
+        return isinstance(data, dict) and data.get("task_id") == task_id
+
+    def query(
+        self,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        task_id: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[str]:
+        """Yield serialized events in timestamp order.
+
+        Args:
+            since: Inclusive lower bound as a UNIX timestamp
+            until: Inclusive upper bound as a UNIX timestamp
+            task_id: Only return events whose data refers to this task
+            limit: Maximum number of events to return
+        """
+        if not self.directory.exists():
+            return
+        since_ms = int(since * 1000) if since is not None else 0
+        until_ms = int(until * 1000) if until is not None else 2**63
+        # The ID as it is serialized, to skip most lines without decoding them
+        task_marker = json.dumps(task_id) if task_id else None
+
+        streams = [
+            self._read_chain(chain, since_ms, until_ms)
+            for chain in self._segment_chains().values()
+        ]
+        count = 0
+        for _, event in heapq.merge(*streams, key=lambda item: item[0]):
+            if task_marker is not None and not self._refers_to(event, task_marker, task_id):
+                continue
+            yield event
+            count += 1
+            if limit is not None and count >= limit:
+                return
+
+
+def create_event_history() -> Optional[EventHistory]:
+    """Create the event history configured for this process, if enabled."""
+    if not EVENT_HISTORY_ENABLED:
+        return None
+    return EventHistory(EVENT_HISTORY_DIR)
@@ -0,0 +1,255 @@
+"""Content-addressed cache of execution results.
+
+An execution that opts in is keyed by the SHA-256 of its script, its matrix
+parameters and the input files declared in the task's ``inputs`` frontmatter. When a completed
+execution with the same key is cached, the run is skipped, and its log, exit
+code and artifacts are returned right away. Each entry is a copy of the log
+plus a small JSON file. Entries are evicted least recently used first, once
+the cache holds more than ``max_entries`` entries or ``max_bytes`` bytes.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import (
+    EXECUTION_CACHE_DIR,
+    EXECUTION_CACHE_MAX_BYTES,
+    EXECUTION_CACHE_MAX_ENTRIES,
+    OUTPUT_PATTERNS,
+)
+from .log_segments import LogFile
+
+HASH_CHUNK_SIZE = 1024 * 1024
+# The same lines the output watcher broadcasts as artifact events
+ARTIFACT_PATTERN = re.compile(OUTPUT_PATTERNS["artifact"])
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    exit_code: Optional[int]
+    execution_id: str
+    task_id: str
+    created_at: float
+    log_bytes: int = 0
+    artifacts: List[str] = field(default_factory=list)
+
+
+class ExecutionCache:
+    """LRU cache of execution logs and exit codes, keyed by content hash."""
+
+    def __init__(
+        self,
+        cache_dir: Path = EXECUTION_CACHE_DIR,
+        max_bytes: int = EXECUTION_CACHE_MAX_BYTES,
+        max_entries: int = EXECUTION_CACHE_MAX_ENTRIES,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._total_bytes = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+        # Digest of each hashed file, reused while its size and mtime are unchanged
+        self._file_digests: Dict[str, Tuple[Tuple[int, int, int], str]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        metas = sorted(self.cache_dir.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        for meta_path in metas:
+            try:
+                entry = CacheEntry(**json.loads(meta_path.read_text()))
+            except (OSError, ValueError, TypeError):
+                continue
+            if self._log_path(entry.key).exists():
+                self._entries[entry.key] = entry
+                self._total_bytes += entry.log_bytes
+
+    def _log_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.log"
+
+    def _meta_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _hash_file(self, path: Path, st: os.stat_result) -> str:
+        signature = (st.st_size, st.st_mtime_ns, st.st_ino)
+        cached = self._file_digests.get(str(path))
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            while chunk := f.read(HASH_CHUNK_SIZE):
+                digest.update(chunk)
+        self._file_digests[str(path)] = (signature, digest.hexdigest())
+        return digest.hexdigest()
+
+    def _hash_input(self, path: Path) -> str:
+        """Digest of a file, or of every file under a directory."""
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return "missing"
+        if not path.is_dir():
+            return self._hash_file(path, st)
+        digest = hashlib.sha256()
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                file_path = Path(root) / name
+                try:
+                    file_digest = self._hash_file(file_path, file_path.stat())
+                except FileNotFoundError:
+                    continue
+                digest.update(f"{file_path.relative_to(path)}\0{file_digest}\n".encode())
+        return digest.hexdigest()
+
+    def compute_key(
+        self,
+        script_path: str,
+        inputs: List[str],
+        base_dir: Optional[Path] = None,
+        params: Optional[Dict[str, str]] = None,
+    ) -> str:
+        """Hash a script, its parameters and its declared input files.
+
+        Args:
+            script_path: Script the execution runs
+            inputs: Input files or directories, relative to ``base_dir``
+            base_dir: Directory the scripts run in (defaults to the current one)
+            params: Environment variables the script runs with
+        """
+        base_dir = Path(base_dir or os.getcwd())
+        digest = hashlib.sha256()
+        digest.update(b"script\0")
+        digest.update(Path(script_path).read_bytes())
+        for name, value in sorted((params or {}).items()):
+            digest.update(f"\0param\0{name}\0{value}".encode())
+        for name in sorted(set(inputs)):
+            digest.update(f"\0input\0{name}\0{self._hash_input(base_dir / name)}".encode())
+        return digest.hexdigest()
+
+    def lookup(self, key: str) -> Optional[CacheEntry]:
+        """Find an entry and mark it as recently used."""
+        with self._lock:
+            self._load()
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        try:
+            os.utime(self._meta_path(key))
+        except OSError:
+            pass
+        return entry
+
+    def restore(self, entry: CacheEntry, log_path: str):
+        """Write a cached log to a new execution's log file."""
+        shutil.copyfile(self._log_path(entry.key), log_path)
+
+    def store(self, key: str, record: Dict[str, Any]) -> Optional[CacheEntry]:
+        """Cache the log and exit code of a finished execution."""
+        with self._lock:
+            self._load()
+        with LogFile(record["log_file"]) as log:
+            if not log.exists:
+                return None
+            size = log.size()
+            if size > self.max_bytes:
+                return None
+            tmp_path = self._log_path(key).with_suffix(".tmp")
+            artifacts = []
+            with open(tmp_path, "wb") as out:
+                for line in _iter_lines(log, size):
+                    out.write(line)
+                    match = ARTIFACT_PATTERN.match(line.decode("utf-8", errors="replace").rstrip("\r\n"))
+                    if match:
+                        artifacts.append(match.groupdict().get("path") or match.group(0))
+
+        entry = CacheEntry(
+            key=key,
+            exit_code=record.get("exit_code"),
+            execution_id=record["execution_id"],
+            task_id=record["task_id"],
+            created_at=time.time(),
+            log_bytes=size,
+            artifacts=artifacts,
+        )
+        with self._lock:
+            self._load()
+            os.replace(tmp_path, self._log_path(key))
+            self._meta_path(key).write_text(json.dumps(asdict(entry)))
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= previous.log_bytes
+            self._entries[key] = entry
+            self._total_bytes += size
+            self.stores += 1
+            self._evict()
+        return entry
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes):
+            key, entry = self._entries.popitem(last=False)
+            self._total_bytes -= entry.log_bytes
+            self.evictions += 1
+            for path in (self._meta_path(key), self._log_path(key)):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            self._load()
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "stores": self.stores,
+                "evictions": self.evictions,
+            }
+
+
+def _iter_lines(log: LogFile, size: int):
+    """Yield the lines of a log, including their newlines."""
+    pending = b""
+    offset = 0
+    while offset < size:
+        chunk = log.pread(offset, min(HASH_CHUNK_SIZE, size - offset))
+        if not chunk:
+            break
+        offset += len(chunk)
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line + b"\n"
+    if pending:
+        yield pending
+
+
+# Global execution cache
+execution_cache = ExecutionCache()
@@ -0,0 +1,197 @@
+"""Durable registry of task executions.
+
+``TaskExecution`` records are stored in their own TinyDB file and cached in
+memory, indexed by ``execution_id``, ``task_id`` and ``matrix_id``, so
+status, history and latest-execution lookups never scan the table. Records survive restarts. If
+another process writes the file, the cache reloads it on the next lookup.
+Log retention removes the records of the executions whose logs it deletes,
+so the file does not grow without bound.
+"""
+
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from tinydb import TinyDB
+
+from .config import EXECUTIONS_DB_PATH
+from .models import TaskExecution
+
+# Statuses of executions that have not finished yet
+ACTIVE_STATUSES = ("queued", "running")
+
+
+def execution_to_record(execution: TaskExecution) -> Dict[str, Any]:
+    """Convert a TaskExecution to a TinyDB-friendly dict."""
+    record = execution.dict()
+    for key in ("started_at", "completed_at", "queued_at"):
+        if record.get(key) is not None:
+            record[key] = record[key].isoformat()
+    return record
+
+
+class ExecutionRegistry:
+    """TinyDB-backed execution records with in-memory indexes."""
+
+    def __init__(self, db_path: Path = EXECUTIONS_DB_PATH):
+        self.db_path = Path(db_path)
+        self._db: Optional[TinyDB] = None
+        self._lock = threading.RLock()
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._doc_ids: Dict[str, int] = {}
+        self._by_task: Dict[str, List[str]] = {}
+        self._by_matrix: Dict[str, List[str]] = {}
+        self._loaded_stamp: Optional[Tuple[int, int]] = None
+
+    @property
+    def db(self) -> TinyDB:
+        if self._db is None:
+            self._db = TinyDB(str(self.db_path))
+        return self._db
+
+    def _stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = self.db_path.stat()
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _refresh(self):
+        """Reload the cache if the file changed since it was last read."""
+        stamp = self._stamp()
+        if self._loaded_stamp is not None and stamp == self._loaded_stamp:
+            return
+        self._by_id.clear()
+        self._doc_ids.clear()
+        self._by_task.clear()
+        self._by_matrix.clear()
+        # Queued executions have no start time yet, so order by submission
+        for doc in sorted(self.db.all(), key=lambda d: d.get("queued_at") or d.get("started_at") or ""):
+            self._index(dict(doc), doc.doc_id)
+        self._loaded_stamp = self._stamp()
+
+    def _index(self, record: Dict[str, Any], doc_id: int):
+        execution_id = record["execution_id"]
+        self._by_id[execution_id] = record
+        self._doc_ids[execution_id] = doc_id
+        self._by_task.setdefault(record["task_id"], []).append(execution_id)
+        if record.get("matrix_id"):
+            self._by_matrix.setdefault(record["matrix_id"], []).append(execution_id)
+
+    def add(self, execution: TaskExecution, **extra: Any) -> Dict[str, Any]:
+        """Store a new execution record.
+
+        Args:
+            execution: The execution to record
+            **extra: Additional fields stored with the record
+
+        Returns:
+            The stored record
+        """
+        record = execution_to_record(execution)
+        record.update(extra)
+        with self._lock:
+            self._refresh()
+            doc_id = self.db.insert(record)
+            self._index(record, doc_id)
+            self._loaded_stamp = self._stamp()
+        return dict(record)
+
+    def update(self, execution_id: str, **fields: Any) -> Optional[Dict[str, Any]]:
+        """Update fields of an execution record.
+
+        Returns:
+            The updated record, or None if the execution is unknown
+        """
+        with self._lock:
+            self._refresh()
+            record = self._by_id.get(execution_id)
+            if record is None:
+                return None
+            self.db.update(fields, doc_ids=[self._doc_ids[execution_id]])
+            record.update(fields)
+            self._loaded_stamp = self._stamp()
+            return dict(record)
+
+    def remove(self, execution_ids: Iterable[str]) -> int:
+        """Remove the records of finished executions.
+
+        Records of executions that are still queued or running are kept.
+
+        Returns:
+            Number of records removed
+        """
+        with self._lock:
+            self._refresh()
+            removed = {
+                eid for eid in execution_ids
+                if eid in self._by_id and self._by_id[eid].get("status") not in ACTIVE_STATUSES
+            }
+            if not removed:
+                return 0
+            self.db.remove(doc_ids=[self._doc_ids[eid] for eid in removed])
+            records = [self._by_id.pop(eid) for eid in removed]
+            for eid in removed:
+                del self._doc_ids[eid]
+            for index, key in ((self._by_task, "task_id"), (self._by_matrix, "matrix_id")):
+                for value in {r.get(key) for r in records if r.get(key)}:
+                    remaining = [eid for eid in index[value] if eid not in removed]
+                    if remaining:
+                        index[value] = remaining
+                    else:
+                        del index[value]
+            self._loaded_stamp = self._stamp()
+            return len(removed)
+
+    def get(self, execution_id: str) -> Optional[Dict[str, Any]]:
+        """Get an execution record by its ID."""
+        with self._lock:
+            self._refresh()
+            record = self._by_id.get(execution_id)
+            return dict(record) if record is not None else None
+
+    def latest(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Get the most recent execution of a task."""
+        with self._lock:
+            self._refresh()
+            execution_ids = self._by_task.get(task_id)
+            if not execution_ids:
+                return None
+            return dict(self._by_id[execution_ids[-1]])
+
+    def history(self, task_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get the executions of a task, newest first."""
+        with self._lock:
+            self._refresh()
+            execution_ids = self._by_task.get(task_id, [])
+            if limit is not None:
+                execution_ids = execution_ids[-limit:] if limit > 0 else []
+            return [dict(self._by_id[eid]) for eid in reversed(execution_ids)]
+
+    def matrix(self, matrix_id: str) -> List[Dict[str, Any]]:
+        """Get the runs of a matrix execution, in submission order."""
+        with self._lock:
+            self._refresh()
+            return [dict(self._by_id[eid]) for eid in self._by_matrix.get(matrix_id, [])]
+
+    def all(self, task_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get every execution, optionally of one task, in submission order."""
+        with self._lock:
+            self._refresh()
+            if task_id is not None:
+                return [dict(self._by_id[eid]) for eid in self._by_task.get(task_id, [])]
+            return [dict(r) for r in self._by_id.values()]
+
+    def active(self, task_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get executions that have not finished, optionally for one task."""
+        with self._lock:
+            self._refresh()
+            if task_id is not None:
+                records = (self._by_id[eid] for eid in self._by_task.get(task_id, []))
+            else:
+                records = self._by_id.values()
+            return [dict(r) for r in records if r.get("status") in ACTIVE_STATUSES]
+
+
+# Global execution registry shared by all executors in this process
+execution_registry = ExecutionRegistry()
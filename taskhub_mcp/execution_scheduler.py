@@ -0,0 +1,320 @@
+"""Priority queue in front of the task executor.
+
+Execution requests are recorded as ``queued`` and return immediately. A
+single dispatcher task starts them while fewer than ``max_concurrent``
+executions are running. The queue is ordered by task priority (high, medium,
+low, then unset) and then by submission order. A slot is released when the
+runner reports that the execution has finished.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+
+from .config import MATRIX_MAX_RUNS, MAX_CONCURRENT_EXECUTIONS
+from .event_broadcaster import event_broadcaster
+from .task_executor import TaskExecutor, matrix_params
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_RANKS = {"high": 0, "medium": 1, "low": 2}
+UNSET_PRIORITY_RANK = len(PRIORITY_RANKS)
+# Number of recent queue wait times kept for metrics
+WAIT_SAMPLE_SIZE = 1000
+
+
+@dataclass(order=True)
+class _QueuedExecution:
+    rank: int
+    seq: int
+    execution_id: str = field(compare=False)
+    task_id: str = field(compare=False)
+    priority: Optional[str] = field(compare=False)
+    enqueued_at: float = field(compare=False)
+
+
+class ExecutionScheduler:
+    """Starts queued executions without exceeding a concurrency limit."""
+
+    def __init__(self, executor: TaskExecutor, max_concurrent: int = MAX_CONCURRENT_EXECUTIONS):
+        self.executor = executor
+        self.max_concurrent = max(1, max_concurrent)
+        self._heap: List[_QueuedExecution] = []
+        self._queued: Dict[str, _QueuedExecution] = {}
+        self._running: Dict[str, asyncio.Task] = {}
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._waits: Deque[float] = deque(maxlen=WAIT_SAMPLE_SIZE)
+        self._submitted = 0
+        self._started = 0
+        self._failed_to_start = 0
+
+    def _ensure_dispatcher(self):
+        if self._dispatcher is None or self._dispatcher.done():
+            self._wakeup = asyncio.Event()
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def start(self):
+        """Start the dispatcher and re-queue executions left over from a restart."""
+        self._ensure_dispatcher()
+        leftover = sorted(
+            (r for r in self.executor.registry.active() if r["status"] == "queued"),
+            key=lambda r: r.get("queued_at") or ""
+        )
+        for record in leftover:
+            if record["execution_id"] not in self._queued:
+                self._enqueue(record["execution_id"], record["task_id"], record.get("priority"))
+
+    async def stop(self):
+        """Stop dispatching. Running executions keep running."""
+        tasks = [t for t in (self._dispatcher, *self._running.values()) if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._dispatcher = None
+        self._running.clear()
+
+    def _enqueue(self, execution_id: str, task_id: str, priority: Optional[str]):
+        item = _QueuedExecution(
+            rank=PRIORITY_RANKS.get(priority, UNSET_PRIORITY_RANK),
+            seq=next(self._seq),
+            execution_id=execution_id,
+            task_id=task_id,
+            priority=priority,
+            enqueued_at=time.monotonic()
+        )
+        heapq.heappush(self._heap, item)
+        self._queued[execution_id] = item
+        self._ensure_dispatcher()
+        self._wakeup.set()
+
+    async def submit(
+        self,
+        task_id: str,
+        priority: Optional[str] = None,
+        script_content: Optional[str] = None,
+        runner: Optional[str] = None,
+        use_cache: bool = False,
+        inputs: Optional[List[str]] = None,
+        **extra: Any
+    ) -> Dict[str, Any]:
+        """Queue an execution of a task.
+
+        Args:
+            task_id: The task ID to execute
+            priority: The task's priority, used to order the queue
+            script_content: Optional script content to execute
+            runner: Runner backend, defaults to the executor's default
+            use_cache: Return a cached result if the script and inputs are unchanged
+            inputs: Input files the result depends on, for the cache key
+            **extra: Additional fields stored with the execution record
+
+        Returns:
+            The queued execution record, or the completed record on a cache
+            hit. Add its queue position with ``annotate``.
+        """
+        record = await self.executor.prepare_execution(
+            task_id, script_content, runner, priority=priority, **extra
+        )
+        return await self._queue(record, priority, use_cache, inputs)
+
+    async def _queue(
+        self,
+        record: Dict[str, Any],
+        priority: Optional[str],
+        use_cache: bool,
+        inputs: Optional[List[str]],
+    ) -> Dict[str, Any]:
+        """Finish a prepared execution from the cache or put it in the queue."""
+        self._submitted += 1
+        if use_cache:
+            try:
+                cached = await self.executor.complete_from_cache(record, inputs or [])
+            except OSError as e:
+                logger.warning(f"Execution cache unavailable for task {record['task_id']}: {e}")
+                cached = None
+            if cached is not None:
+                return cached
+        self._enqueue(record["execution_id"], record["task_id"], priority)
+        return record
+
+    async def submit_matrix(
+        self,
+        task_id: str,
+        param_sets: List[Dict[str, Any]],
+        priority: Optional[str] = None,
+        script_content: Optional[str] = None,
+        runner: Optional[str] = None,
+        use_cache: bool = False,
+        inputs: Optional[List[str]] = None,
+        **extra: Any
+    ) -> Dict[str, Any]:
+        """Queue one run of a task per parameter set.
+        
+        The runs share a ``matrix_id`` and may run at the same time, each with
+        its own log, execution ID and session. Each run's parameters are
+        exported to the script as environment variables, together with
+        ``TASKHUB_MATRIX_ID`` and ``TASKHUB_MATRIX_INDEX``.
+        
+        Args:
+            task_id: The task ID to execute
+            param_sets: One dict of parameters per run
+            priority, script_content, runner, use_cache, inputs, extra: As for ``submit``
+        
+        Returns:
+            The matrix ID and the queued (or cached) execution records,
+            without queue positions (see ``positions``)
+        """
+        if not param_sets:
+            raise ValueError("A matrix needs at least one parameter set")
+        if len(param_sets) > MATRIX_MAX_RUNS:
+            raise ValueError(f"A matrix may have at most {MATRIX_MAX_RUNS} parameter sets")
+        # Check every set before queueing any run
+        params = [matrix_params(param_set) for param_set in param_sets]
+        
+        matrix_id = str(uuid.uuid4())
+        # Record every run before any can finish from the cache, so the matrix
+        # only counts as finished once its last run is
+        records = []
+        try:
+            for index, param_set in enumerate(params):
+                records.append(await self.executor.prepare_execution(
+                    task_id,
+                    script_content,
+                    runner,
+                    priority=priority,
+                    matrix_id=matrix_id,
+                    matrix_index=index,
+                    params=param_set,
+                    **extra
+                ))
+        except Exception as e:
+            for record in records:
+                await self.executor.record_start_failure(record["execution_id"], e)
+            raise
+        executions = [await self._queue(record, priority, use_cache, inputs) for record in records]
+        return {"matrix_id": matrix_id, "task_id": task_id, "executions": executions}
+    
+    def cancel(self, task_id: str) -> bool:
+        """Remove a task's queued executions. Returns True if any were removed."""
+        removed = [eid for eid, item in self._queued.items() if item.task_id == task_id]
+        if not removed:
+            return False
+        for execution_id in removed:
+            del self._queued[execution_id]
+        self._heap = list(self._queued.values())
+        heapq.heapify(self._heap)
+        return True
+
+    def positions(self) -> Dict[str, int]:
+        """1-based queue position of every queued execution.
+
+        Sorts the queue; to place several executions, call it once and pass
+        the result to ``annotate``.
+        """
+        return {item.execution_id: i for i, item in enumerate(sorted(self._heap), start=1)}
+
+    def position(self, execution_id: str) -> Optional[int]:
+        """1-based queue position of one queued execution, in one pass over the queue."""
+        item = self._queued.get(execution_id)
+        if item is None:
+            return None
+        return 1 + sum(1 for other in self._queued.values() if other < item)
+
+    def annotate(self, status: Dict[str, Any], positions: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+        """Add the queue position to a queued execution status."""
+        if status.get("status") == "queued":
+            execution_id = status.get("execution_id")
+            status["queue_position"] = (
+                self.position(execution_id) if positions is None else positions.get(execution_id)
+            )
+        return status
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth, running count and wait time statistics."""
+        now = time.monotonic()
+        depth_by_priority: Dict[str, int] = {}
+        for item in self._heap:
+            key = item.priority or "none"
+            depth_by_priority[key] = depth_by_priority.get(key, 0) + 1
+
+        waits = sorted(self._waits)
+
+        def percentile(p: float) -> Optional[float]:
+            if not waits:
+                return None
+            return round(waits[min(len(waits) - 1, int(p * len(waits)))], 3)
+
+        return {
+            "max_concurrent": self.max_concurrent,
+            "running": len(self._running),
+            "queue_depth": len(self._heap),
+            "queue_depth_by_priority": depth_by_priority,
+            "oldest_queued_seconds": round(now - min(i.enqueued_at for i in self._heap), 3) if self._heap else None,
+            "submitted_total": self._submitted,
+            "started_total": self._started,
+            "failed_to_start_total": self._failed_to_start,
+            "wait_seconds": {
+                "samples": len(waits),
+                "avg": round(sum(waits) / len(waits), 3) if waits else None,
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+                "max": round(waits[-1], 3) if waits else None,
+            },
+        }
+
+    async def _dispatch(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._heap and len(self._running) < self.max_concurrent:
+                item = heapq.heappop(self._heap)
+                if self._queued.pop(item.execution_id, None) is None:
+                    continue
+                task = asyncio.create_task(self._run(item))
+                self._running[item.execution_id] = task
+                task.add_done_callback(lambda _, eid=item.execution_id: self._release(eid))
+
+    def _release(self, execution_id: str):
+        self._running.pop(execution_id, None)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self, item: _QueuedExecution):
+        record = self.executor.registry.get(item.execution_id)
+        if record is None or record["status"] != "queued":
+            # Stopped while waiting
+            return
+
+        self._waits.append(time.monotonic() - item.enqueued_at)
+        try:
+            execution_info = await self.executor.start_execution(item.execution_id)
+        except Exception as e:
+            logger.error(f"Failed to start execution {item.execution_id} of task {item.task_id}: {e}")
+            self._failed_to_start += 1
+            await self.executor.record_start_failure(item.execution_id, e)
+            return
+
+        self._started += 1
+        await event_broadcaster.broadcast_execution_event(
+            task_id=item.task_id,
+            event_type="started",
+            execution_id=item.execution_id,
+            session_name=execution_info["session_name"],
+            log_file=execution_info["log_file"],
+            **({"matrix_id": execution_info["matrix_id"]} if execution_info.get("matrix_id") else {})
+        )
+
+        try:
+            await self.executor.wait_for_completion(item.execution_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error waiting for execution {item.execution_id}: {e}")
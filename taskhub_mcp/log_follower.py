@@ -0,0 +1,276 @@
+"""Follow growing log files and fan appended bytes out to subscribers.
+
+Each followed file has one reader task and one file descriptor, however many
+subscribers it has. Subscribers have their own byte cursor, so they can
+start from any offset. Subscribers at the same cursor share each read. The
+reader is woken by inotify where available (loaded through ctypes, no extra
+dependency) and falls back to polling the file size otherwise. Reads go
+through ``LogFile``, so subscribers that start behind a rotation are served
+from the compressed segments.
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import logging
+import os
+import struct
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from .config import LOG_FOLLOW_POLL_INTERVAL
+from .log_segments import LogFile
+
+logger = logging.getLogger(__name__)
+
+# How often to ask whether the writer of a quiet log is still running
+LIVENESS_CHECK_INTERVAL = 5.0
+MAX_READ_BYTES = 256 * 1024
+# Chunks buffered per subscriber; a full queue pauses that subscriber's cursor
+SUBSCRIBER_QUEUE_SIZE = 64
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class _Inotify:
+    """Minimal inotify binding that maps watch descriptors to callbacks."""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._callbacks: Dict[int, Callable[[], None]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def add_watch(self, path: str, callback: Callable[[], None]) -> Optional[int]:
+        """Watch a file for writes. Returns None if it cannot be watched yet."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            if self._loop is not None and not self._loop.is_closed():
+                self._loop.remove_reader(self.fd)
+            loop.add_reader(self.fd, self._read_events)
+            self._loop = loop
+        wd = self._add_watch(self.fd, os.fsencode(path), IN_MODIFY | IN_CLOSE_WRITE)
+        if wd < 0:
+            return None
+        self._callbacks[wd] = callback
+        return wd
+
+    def rm_watch(self, wd: int):
+        if self._callbacks.pop(wd, None) is not None:
+            self._rm_watch(self.fd, wd)
+
+    def _read_events(self):
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        pos = 0
+        while pos + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, name_len = _EVENT_HEADER.unpack_from(data, pos)
+            pos += _EVENT_HEADER.size + name_len
+            if mask & IN_IGNORED:
+                self._callbacks.pop(wd, None)
+                continue
+            callback = self._callbacks.get(wd)
+            if callback is not None:
+                callback()
+
+
+def _create_inotify() -> Optional[_Inotify]:
+    try:
+        return _Inotify()
+    except (OSError, AttributeError, TypeError) as e:
+        logger.info(f"inotify unavailable, polling log files instead: {e}")
+        return None
+
+
+class _FileReader:
+    """State shared by all subscribers of one file."""
+
+    def __init__(self, path: str, is_running: Optional[Callable[[], Awaitable[bool]]]):
+        self.path = path
+        self.is_running = is_running
+        self.cursors: Dict[asyncio.Queue, int] = {}
+        self.wake = asyncio.Event()
+        self.log: Optional[LogFile] = None
+        self.wd: Optional[int] = None
+        self.task: Optional[asyncio.Task] = None
+        self.writer_done = False
+
+
+class LogFollower:
+    """Shares one reader per log file among any number of subscribers.
+
+    Subscribers receive ``(offset, data)`` tuples, where ``offset`` is the byte
+    position of ``data`` in the file, and ``None`` once the writer has stopped
+    and everything has been delivered.
+    """
+
+    def __init__(self, poll_interval: float = LOG_FOLLOW_POLL_INTERVAL, use_inotify: bool = True):
+        self.poll_interval = poll_interval
+        self._inotify = _create_inotify() if use_inotify else None
+        self._readers: Dict[str, _FileReader] = {}
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._inotify is not None
+
+    def subscribe(
+        self,
+        path: str,
+        offset: int = 0,
+        is_running: Optional[Callable[[], Awaitable[bool]]] = None,
+    ) -> asyncio.Queue:
+        """Start receiving a file's bytes from an offset.
+
+        Args:
+            path: Log file to follow; it may not exist yet
+            offset: Byte offset to start from
+            is_running: Whether the log's writer is still running. Without
+                it the file is followed until the subscriber leaves.
+
+        Returns:
+            Queue of ``(offset, data)`` chunks, ended by ``None``
+        """
+        path = os.path.abspath(path)
+        reader = self._readers.get(path)
+        if reader is None:
+            reader = _FileReader(path, is_running)
+            self._readers[path] = reader
+            reader.task = asyncio.create_task(self._run(reader))
+        elif reader.is_running is None:
+            reader.is_running = is_running
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        if reader.log is not None:
+            reader.log.refresh()
+        reader.cursors[queue] = max(0, offset)
+        reader.wake.set()
+        return queue
+
+    def unsubscribe(self, path: str, queue: asyncio.Queue):
+        """Stop delivering to a subscriber."""
+        reader = self._readers.get(os.path.abspath(path))
+        if reader is not None and reader.cursors.pop(queue, None) is not None:
+            reader.wake.set()
+
+    def writer_exited(self, path: str):
+        """Tell the reader of a file that its writer has finished.
+
+        Subscribers then end as soon as they have caught up, instead of at
+        the next liveness check.
+        """
+        reader = self._readers.get(os.path.abspath(path))
+        if reader is not None:
+            reader.writer_done = True
+            reader.wake.set()
+
+    @property
+    def followed_files(self) -> int:
+        return len(self._readers)
+
+    def _deliver(self, reader: _FileReader, size: int) -> bool:
+        """Read once per distinct cursor and hand the bytes to its subscribers.
+
+        Returns:
+            True if any data was delivered
+        """
+        delivered = False
+        by_cursor: Dict[int, list] = {}
+        for queue, cursor in reader.cursors.items():
+            if cursor > size:
+                # The file was truncated, so start over from its beginning
+                cursor = reader.cursors[queue] = 0
+            if cursor < size and not queue.full():
+                by_cursor.setdefault(cursor, []).append(queue)
+
+        for cursor, queues in by_cursor.items():
+            data = reader.log.pread(cursor, min(size - cursor, MAX_READ_BYTES))
+            if not data:
+                continue
+            chunk: Tuple[int, bytes] = (cursor, data)
+            for queue in queues:
+                queue.put_nowait(chunk)
+                reader.cursors[queue] = cursor + len(data)
+            delivered = True
+        return delivered
+
+    def _open(self, reader: _FileReader):
+        log = LogFile(reader.path)
+        if not log.exists:
+            log.close()
+            return
+        reader.log = log
+        if self._inotify is not None and os.path.exists(reader.path):
+            reader.wd = self._inotify.add_watch(reader.path, reader.wake.set)
+
+    def _finish(self, reader: _FileReader, size: int) -> bool:
+        """End the subscribers that have caught up. Returns True when none are left."""
+        for queue, cursor in list(reader.cursors.items()):
+            if cursor >= size and not queue.full():
+                queue.put_nowait(None)
+                del reader.cursors[queue]
+        return not reader.cursors
+
+    async def _run(self, reader: _FileReader):
+        # Checked as soon as the reader first catches up, so logs of finished
+        # executions end right away
+        last_liveness_check = 0.0
+        try:
+            while reader.cursors:
+                reader.wake.clear()
+                if reader.log is None:
+                    self._open(reader)
+                size = reader.log.size() if reader.log is not None else 0
+
+                if reader.log is not None and self._deliver(reader, size):
+                    # Let subscribers drain before reading the next chunk
+                    await asyncio.sleep(0)
+                    continue
+
+                if reader.writer_done:
+                    if self._finish(reader, size):
+                        break
+                elif reader.is_running is not None and time.monotonic() - last_liveness_check >= LIVENESS_CHECK_INTERVAL:
+                    last_liveness_check = time.monotonic()
+                    # Read whatever was written before the writer exited, then end
+                    reader.writer_done = not await reader.is_running()
+                    if reader.writer_done:
+                        continue
+
+                timeout = LIVENESS_CHECK_INTERVAL if reader.wd is not None else self.poll_interval
+                if reader.writer_done or any(q.full() for q in reader.cursors):
+                    timeout = self.poll_interval
+                try:
+                    await asyncio.wait_for(reader.wake.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error following log file {reader.path}: {e}")
+            for queue in reader.cursors:
+                if not queue.full():
+                    queue.put_nowait(None)
+        finally:
+            if reader.wd is not None and self._inotify is not None:
+                self._inotify.rm_watch(reader.wd)
+            if reader.log is not None:
+                reader.log.close()
+            if self._readers.get(reader.path) is reader:
+                del self._readers[reader.path]
+
+
+# Global log follower shared by log streams and the output watcher
+log_follower = LogFollower()
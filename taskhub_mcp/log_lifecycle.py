@@ -0,0 +1,333 @@
+"""Background rotation, compression and retention of execution logs.
+
+Every ``interval`` seconds the logs directory is scanned once:
+
+- A running execution's log that has grown by ``rotate_bytes`` since its
+  last rotation has that range compressed into a segment, then punched out
+  of the live file.
+- A finished execution's log that has not been written for
+  ``compress_after`` seconds is compressed into a final segment, and the
+  live file is removed.
+- Finished executions whose files are older than ``retention_days``, or the
+  oldest ones while the directory uses more than ``retention_bytes``, are
+  deleted together with their segments and scripts, and their execution
+  records are removed from the registry.
+
+Logs of running executions are never deleted.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .config import (
+    LOG_COMPRESS_AFTER,
+    LOG_COMPRESSION,
+    LOG_LIFECYCLE_INTERVAL,
+    LOG_RETENTION_BYTES,
+    LOG_RETENTION_DAYS,
+    LOG_ROTATE_BYTES,
+    LOGS_DIR,
+)
+from .execution_registry import ACTIVE_STATUSES, ExecutionRegistry, execution_registry
+from .log_segments import (
+    Segment,
+    get_codec,
+    is_hole,
+    parse_segment,
+    punch_hole,
+    remove_segment,
+    write_segment,
+)
+
+logger = logging.getLogger(__name__)
+
+LOG_NAME_PATTERN = re.compile(r"^(?P<task_id>.+)_(?P<execution_id>[0-9a-f-]{36})\.log$")
+# Rotated ranges stay in the live file this long, so readers that listed the
+# segments just before a rotation can still finish reading them
+PUNCH_GRACE_SECONDS = 60.0
+# Files next to a log that runs write for the server to pick up
+RUN_STATE_SUFFIXES = (".log.exit", ".log.fifo", ".log.rusage")
+# Search index next to a finished log (see log_search)
+SEARCH_INDEX_SUFFIX = ".log.tri"
+
+
+@dataclass
+class _LogGroup:
+    """All files that belong to one execution log."""
+
+    log_path: Path
+    live: Optional[os.stat_result] = None
+    segments: List[Segment] = field(default_factory=list)
+    extra_files: List[Path] = field(default_factory=list)
+    disk_bytes: int = 0
+    mtime: float = 0.0
+
+    def add_file(self, st: os.stat_result):
+        self.disk_bytes += st.st_blocks * 512
+        self.mtime = max(self.mtime, st.st_mtime)
+
+    @property
+    def rotated_end(self) -> int:
+        return self.segments[-1].end if self.segments else 0
+
+
+class LogLifecycleManager:
+    """Keeps the logs directory bounded in size."""
+
+    def __init__(
+        self,
+        logs_dir: Path = LOGS_DIR,
+        registry: ExecutionRegistry = execution_registry,
+        compression: str = LOG_COMPRESSION,
+        rotate_bytes: int = LOG_ROTATE_BYTES,
+        compress_after: float = LOG_COMPRESS_AFTER,
+        retention_bytes: int = LOG_RETENTION_BYTES,
+        retention_days: float = LOG_RETENTION_DAYS,
+        interval: float = LOG_LIFECYCLE_INTERVAL,
+    ):
+        self.logs_dir = Path(logs_dir)
+        self.registry = registry
+        self.codec = get_codec(compression)
+        self.rotate_bytes = rotate_bytes
+        self.compress_after = compress_after
+        self.retention_bytes = retention_bytes
+        self.retention_days = retention_days
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self.last_run: Dict[str, Any] = {}
+
+    async def start(self):
+        """Start the background loop."""
+        if self.interval > 0 and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            try:
+                await asyncio.to_thread(self.run_once)
+            except Exception as e:
+                logger.error(f"Log lifecycle pass failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def _scan(self) -> Dict[str, _LogGroup]:
+        groups: Dict[str, _LogGroup] = {}
+
+        def group(log_name: str) -> _LogGroup:
+            if log_name not in groups:
+                groups[log_name] = _LogGroup(self.logs_dir / log_name)
+            return groups[log_name]
+
+        try:
+            entries = list(os.scandir(self.logs_dir))
+        except FileNotFoundError:
+            return groups
+
+        for entry in entries:
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            name = entry.name
+            if name.endswith(".log"):
+                g = group(name)
+                g.live = st
+                g.add_file(st)
+            elif name.endswith(RUN_STATE_SUFFIXES):
+                # Exit code and usage files runs leave behind if the server was down
+                g = group(name[:name.rindex(".")])
+                g.extra_files.append(Path(entry.path))
+                g.add_file(st)
+            elif name.endswith(SEARCH_INDEX_SUFFIX):
+                g = group(name[:-len(".tri")])
+                g.extra_files.append(Path(entry.path))
+                # Built on a later search, so it does not count towards the log's age
+                g.disk_bytes += st.st_blocks * 512
+            elif name.endswith(".idx") or name.endswith(".sh"):
+                log_name = name[:-len(".idx")] if name.endswith(".idx") else name[:-len(".sh")] + ".log"
+                parsed = parse_segment(Path(log_name)) if name.endswith(".idx") else None
+                g = group(parsed[0] if parsed else log_name)
+                g.extra_files.append(Path(entry.path))
+                g.add_file(st)
+            else:
+                parsed = parse_segment(Path(entry.path))
+                if parsed is not None:
+                    g = group(parsed[0])
+                    g.segments.append(parsed[1])
+                    g.add_file(st)
+
+        for g in groups.values():
+            g.segments.sort()
+        return groups
+
+    def _is_active(self, group: _LogGroup, now: float) -> bool:
+        match = LOG_NAME_PATTERN.match(group.log_path.name)
+        record = self.registry.get(match["execution_id"]) if match else None
+        if record is not None:
+            return record.get("status") in ACTIVE_STATUSES
+        # Without a record, a recently written log may still have a writer
+        return now - group.mtime < self.compress_after
+
+    def _rotate(self, group: _LogGroup, finished: bool) -> int:
+        """Compress the unrotated part of a live log.
+
+        Returns:
+            Bytes moved into the new segment
+        """
+        fd = os.open(group.log_path, os.O_RDONLY | os.O_CLOEXEC)
+        try:
+            size = os.fstat(fd).st_size
+            start = group.rotated_end
+            if size > start:
+                segment = write_segment(fd, group.log_path, start, size, self.codec)
+                group.segments.append(segment)
+                if finished:
+                    # Keep the log's age for retention
+                    mtime = os.fstat(fd).st_mtime
+                    for path in (segment.path, segment.index_path):
+                        os.utime(path, (mtime, mtime))
+            if finished:
+                os.unlink(group.log_path)
+                group.live = None
+            return max(0, size - start)
+        finally:
+            os.close(fd)
+
+    def _restat(self, group: _LogGroup):
+        """Recount a group's disk usage after its files changed."""
+        group.disk_bytes = 0
+        paths = [group.log_path, *group.extra_files]
+        for segment in group.segments:
+            paths += [segment.path, segment.index_path]
+        for path in set(paths):
+            try:
+                group.add_file(path.stat())
+            except FileNotFoundError:
+                pass
+
+    def _punch(self, group: _LogGroup, now: float) -> int:
+        """Free the rotated ranges of a live log once readers have moved on."""
+        freed = 0
+        fd = os.open(group.log_path, os.O_RDWR | os.O_CLOEXEC)
+        try:
+            block = os.fstat(fd).st_blksize or 4096
+            for segment in group.segments:
+                # Only whole blocks can be freed; partial ones stay as they are
+                start = -(-segment.start // block) * block
+                end = segment.end // block * block
+                if start >= end:
+                    continue
+                try:
+                    old_enough = now - segment.path.stat().st_mtime >= PUNCH_GRACE_SECONDS
+                except FileNotFoundError:
+                    continue
+                if old_enough and not is_hole(fd, start, end):
+                    if not punch_hole(fd, start, end):
+                        break
+                    freed += end - start
+        finally:
+            os.close(fd)
+        return freed
+
+    def _delete(self, group: _LogGroup):
+        for segment in group.segments:
+            remove_segment(segment)
+        for path in [group.log_path, *group.extra_files]:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _forget(self, deleted: List[_LogGroup]):
+        """Remove the execution records of deleted logs in a single write."""
+        matches = (LOG_NAME_PATTERN.match(g.log_path.name) for g in deleted)
+        execution_ids = [m["execution_id"] for m in matches if m]
+        if execution_ids:
+            self.registry.remove(execution_ids)
+
+    def run_once(self) -> Dict[str, Any]:
+        """Run one rotation, compression and retention pass."""
+        now = time.time()
+        stats = {"rotated": 0, "compressed": 0, "punched_bytes": 0, "deleted": 0}
+        groups = self._scan()
+        finished: List[_LogGroup] = []
+
+        for group in groups.values():
+            active = self._is_active(group, now)
+            if not active:
+                finished.append(group)
+            if group.live is None or self.codec is None:
+                continue
+            try:
+                if active:
+                    if group.live.st_size - group.rotated_end >= self.rotate_bytes:
+                        self._rotate(group, finished=False)
+                        stats["rotated"] += 1
+                    stats["punched_bytes"] += self._punch(group, now)
+                    self._restat(group)
+                elif now - group.live.st_mtime >= self.compress_after:
+                    self._rotate(group, finished=True)
+                    self._restat(group)
+                    stats["compressed"] += 1
+            except OSError as e:
+                logger.warning(f"Could not rotate {group.log_path}: {e}")
+
+        stats["deleted"] = self._apply_retention(finished, now, groups)
+        stats["total_bytes"] = sum(g.disk_bytes for g in groups.values())
+        stats["finished_at"] = now
+        self.last_run = stats
+        return stats
+
+    def _apply_retention(self, finished: List[_LogGroup], now: float, groups: Dict[str, _LogGroup]) -> int:
+        deleted: List[_LogGroup] = []
+        if self.retention_days > 0:
+            cutoff = now - self.retention_days * 24 * 60 * 60
+            for group in [g for g in finished if g.mtime < cutoff]:
+                self._delete(group)
+                finished.remove(group)
+                groups.pop(group.log_path.name, None)
+                deleted.append(group)
+
+        if self.retention_bytes > 0:
+            # Sizes from the scan; rotations in this pass only shrink them
+            total = sum(g.disk_bytes for g in groups.values())
+            for group in sorted(finished, key=lambda g: g.mtime):
+                if total <= self.retention_bytes:
+                    break
+                self._delete(group)
+                total -= group.disk_bytes
+                deleted.append(group)
+        self._forget(deleted)
+        return len(deleted)
+
+    def cleanup_older_than(self, days: float) -> int:
+        """Delete finished execution logs older than ``days``.
+
+        Returns:
+            Number of execution logs deleted
+        """
+        now = time.time()
+        groups = self._scan()
+        cutoff = now - days * 24 * 60 * 60
+        deleted: List[_LogGroup] = []
+        for group in groups.values():
+            if group.mtime < cutoff and not self._is_active(group, now):
+                self._delete(group)
+                deleted.append(group)
+        self._forget(deleted)
+        return len(deleted)
+
+
+# Global log lifecycle manager for the configured logs directory
+log_lifecycle = LogLifecycleManager()
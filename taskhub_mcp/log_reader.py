@@ -0,0 +1,162 @@
+"""Bounded-memory reads of execution logs.
+
+Tails are found by seeking backwards from the end of the file in fixed-size
+blocks, so the cost depends on the number of lines requested, not on the
+size of the log. Pages are addressed by byte offsets that always fall on line
+boundaries, so clients can move through multi-gigabyte logs with
+``after`` / ``before`` cursors without the server reading the whole file.
+Rotated and compressed parts of a log are read through ``LogFile``, so
+offsets stay the same after rotation.
+"""
+
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from .log_segments import LogFile
+
+BLOCK_SIZE = 64 * 1024
+# Upper bound on the bytes returned by one read, whatever the line count
+MAX_PAGE_BYTES = 4 * 1024 * 1024
+
+
+@dataclass
+class LogPage:
+    """A run of whole lines and the byte range they came from."""
+
+    lines: List[str] = field(default_factory=list)
+    start_offset: int = 0
+    end_offset: int = 0
+    file_size: int = 0
+
+    @property
+    def prev_cursor(self) -> Optional[int]:
+        """Cursor for the page before this one, or None at the start of the file."""
+        return self.start_offset if self.start_offset > 0 else None
+
+    @property
+    def next_cursor(self) -> int:
+        """Cursor for the page after this one."""
+        return self.end_offset
+
+
+def _decode(data: bytes) -> List[str]:
+    if not data:
+        return []
+    if data.endswith(b"\n"):
+        data = data[:-1]
+    return [line.rstrip("\r") for line in data.decode("utf-8", errors="replace").split("\n")]
+
+
+def _read_backward(f: LogFile, end: int, count: int, max_bytes: int) -> int:
+    """Find where the last ``count`` lines before ``end`` begin.
+
+    Args:
+        f: File opened in binary mode
+        end: Byte offset the lines end at; must be a line boundary
+        count: Number of lines wanted
+        max_bytes: Never go back further than this
+
+    Returns:
+        Byte offset of the first wanted line
+    """
+    floor = max(0, end - max_bytes)
+    pos = end
+    needed = count
+    while pos > floor:
+        read_start = max(floor, pos - BLOCK_SIZE)
+        f.seek(read_start)
+        block = f.read(pos - read_start)
+        idx = len(block)
+        while True:
+            idx = block.rfind(b"\n", 0, idx)
+            if idx < 0:
+                break
+            if read_start + idx == end - 1:
+                # The newline right before ``end`` terminates the last line
+                continue
+            needed -= 1
+            if needed == 0:
+                return read_start + idx + 1
+        pos = read_start
+    return floor
+
+
+def _read_forward(f: LogFile, start: int, size: int, count: int, max_bytes: int) -> int:
+    """Find where ``count`` lines starting at ``start`` end.
+
+    Returns:
+        Byte offset just past the last line, or of the cut if the page
+        reached ``max_bytes`` first
+    """
+    limit = min(size, start + max_bytes)
+    pos = start
+    f.seek(start)
+    while pos < limit:
+        block = f.read(min(BLOCK_SIZE, limit - pos))
+        if not block:
+            break
+        idx = -1
+        while True:
+            idx = block.find(b"\n", idx + 1)
+            if idx < 0:
+                break
+            count -= 1
+            if count == 0:
+                return pos + idx + 1
+        pos += len(block)
+    return pos
+
+
+def _align_forward(f: LogFile, offset: int, size: int) -> int:
+    """Move an arbitrary byte offset to the start of the next line."""
+    if offset <= 0:
+        return 0
+    if offset >= size:
+        return size
+    f.seek(offset - 1)
+    if f.read(1) == b"\n":
+        return offset
+    end = _read_forward(f, offset, size, 1, MAX_PAGE_BYTES)
+    return end
+
+
+def _page(f: LogFile, start: int, end: int, size: int) -> LogPage:
+    f.seek(start)
+    return LogPage(_decode(f.read(end - start)), start, end, size)
+
+
+def tail(path: str, count: int, max_bytes: int = MAX_PAGE_BYTES) -> LogPage:
+    """Read the last ``count`` lines of a file."""
+    with LogFile(path) as f:
+        size = f.size()
+        if count <= 0:
+            return LogPage([], size, size, size)
+        start = _read_backward(f, size, count, max_bytes)
+        return _page(f, start, size, size)
+
+
+def read_after(path: str, cursor: int, count: int, max_bytes: int = MAX_PAGE_BYTES) -> LogPage:
+    """Read up to ``count`` lines starting at a line-boundary cursor."""
+    with LogFile(path) as f:
+        size = f.size()
+        start = min(max(0, cursor), size)
+        end = _read_forward(f, start, size, count, max_bytes) if count > 0 else start
+        return _page(f, start, end, size)
+
+
+def read_before(path: str, cursor: int, count: int, max_bytes: int = MAX_PAGE_BYTES) -> LogPage:
+    """Read up to ``count`` lines ending at a line-boundary cursor."""
+    with LogFile(path) as f:
+        size = f.size()
+        end = min(max(0, cursor), size)
+        start = _read_backward(f, end, count, max_bytes) if count > 0 else end
+        return _page(f, start, end, size)
+
+
+def read_from_offset(path: str, offset: int, count: int, max_bytes: int = MAX_PAGE_BYTES) -> LogPage:
+    """Read up to ``count`` lines from the first line that starts at or after ``offset``."""
+    with LogFile(path) as f:
+        size = f.size()
+        start = _align_forward(f, offset, size)
+        end = _read_forward(f, start, size, count, max_bytes) if count > 0 else start
+        return _page(f, start, end, size)
@@ -0,0 +1,278 @@
+"""Search across the logs of many executions.
+
+Each log is scanned by a worker thread, block by block, through ``LogFile``,
+so rotated and compressed parts are searched too. A block without the query
+costs a single ``bytes.find``; only blocks with a hit are split into lines.
+
+Finished logs no longer change. The first full scan of one that is at most
+``index_max_bytes`` long also collects the trigrams (3-byte substrings) of
+its words, and stores them sorted in a ``<log>.tri`` file next to the log.
+Later searches read that file and skip the log without scanning it when
+one of the trigrams of the query's words is missing. Words are split on
+whitespace and deduplicated before their trigrams are taken, which keeps
+building the index cheap. Trigrams come from ASCII-lowercased text, so the
+index serves case-insensitive searches too. An index whose recorded log
+size no longer matches is rebuilt.
+"""
+
+import asyncio
+import bisect
+import logging
+import os
+import struct
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from .config import LOG_SEARCH_INDEX_MAX_BYTES, LOG_SEARCH_WORKERS
+from .execution_registry import ACTIVE_STATUSES
+from .log_segments import LogFile
+
+logger = logging.getLogger(__name__)
+
+SCAN_BLOCK_SIZE = 1024 * 1024
+# Longest line text returned with a hit
+MAX_LINE_CHARS = 1000
+INDEX_SUFFIX = ".tri"
+# Index file layout: magic, logical log size, then sorted 24-bit trigrams
+INDEX_HEADER = struct.Struct("<4sQ")
+INDEX_MAGIC = b"TRI1"
+
+
+def index_path(log_file: str) -> Path:
+    return Path(log_file + INDEX_SUFFIX)
+
+
+def trigrams(text: bytes) -> Set[bytes]:
+    """Trigrams of the whitespace-separated words of a text."""
+    grams: Set[bytes] = set()
+    for word in set(text.split()):
+        grams.update(word[i:i + 3] for i in range(len(word) - 2))
+    return grams
+
+
+def read_index(path: Path, log_size: int) -> Optional[array]:
+    """Load a log's trigram index, or None if it is missing or stale."""
+    try:
+        data = path.read_bytes()
+    except OSError:
+        return None
+    if len(data) < INDEX_HEADER.size:
+        return None
+    magic, size = INDEX_HEADER.unpack_from(data)
+    if magic != INDEX_MAGIC or size != log_size:
+        return None
+    index = array("I")
+    index.frombytes(data[INDEX_HEADER.size:])
+    return index
+
+
+def write_index(path: Path, log_size: int, grams: Set[bytes]):
+    index = array("I", sorted(int.from_bytes(gram, "big") for gram in grams))
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(INDEX_HEADER.pack(INDEX_MAGIC, log_size))
+        f.write(index.tobytes())
+    os.replace(tmp_path, path)
+
+
+def may_contain(index: array, needle: bytes) -> bool:
+    """Whether every word trigram of the (lowercased) needle is in the index."""
+    for gram in trigrams(needle):
+        value = int.from_bytes(gram, "big")
+        i = bisect.bisect_left(index, value)
+        if i == len(index) or index[i] != value:
+            return False
+    return True
+
+
+@dataclass
+class LogHit:
+    offset: int
+    line_number: int
+    line: str
+
+
+@dataclass
+class LogScan:
+    """Result of searching one log."""
+
+    hits: List[LogHit] = field(default_factory=list)
+    bytes_scanned: int = 0
+    # Skipped because its index lacks a trigram of the query
+    skipped: bool = False
+    indexed: bool = False
+    truncated: bool = False
+
+
+def search_log(
+    log_file: str,
+    query: str,
+    ignore_case: bool = False,
+    max_hits: int = 100,
+    finished: bool = False,
+    index_max_bytes: int = LOG_SEARCH_INDEX_MAX_BYTES,
+) -> LogScan:
+    """Find the lines of a log that contain ``query``.
+
+    Args:
+        log_file: Path of the execution log
+        query: Literal text to look for
+        ignore_case: Match ASCII letters regardless of case
+        max_hits: Stop after this many matching lines
+        finished: The execution has finished, so the log may be indexed
+        index_max_bytes: Largest log to index (0 disables the index)
+
+    Returns:
+        The matching lines with their byte offsets and line numbers
+    """
+    result = LogScan()
+    needle = query.encode()
+    lowered = needle.lower()
+    if ignore_case:
+        needle = lowered
+    with LogFile(log_file) as f:
+        if not f.exists:
+            return result
+        size = f.size()
+        use_index = finished and 0 < size <= index_max_bytes
+        if use_index:
+            index = read_index(index_path(log_file), size)
+            if index is not None:
+                if not may_contain(index, lowered):
+                    result.skipped = True
+                    return result
+                # The index is current; no need to build it again
+                use_index = False
+        grams: Optional[Set[bytes]] = set() if use_index else None
+
+        pos = 0
+        line_number = 0
+        carry = b""
+        while pos < size:
+            block = f.pread(pos, min(SCAN_BLOCK_SIZE, size - pos))
+            if not block:
+                break
+            start = pos - len(carry)
+            pos += len(block)
+            data = carry + block
+            # Search whole lines only; the rest waits for the next block
+            cut = len(data) if pos >= size else data.rfind(b"\n") + 1
+            data, carry = data[:cut], data[cut:]
+            if not data:
+                continue
+
+            haystack = data.lower() if ignore_case else data
+            if grams is not None:
+                grams |= trigrams(haystack if ignore_case else data.lower())
+
+            counted_to = 0
+            i = haystack.find(needle)
+            while i != -1:
+                if len(result.hits) >= max_hits:
+                    result.truncated = True
+                    break
+                line_start = haystack.rfind(b"\n", 0, i) + 1
+                line_end = haystack.find(b"\n", i)
+                if line_end == -1:
+                    line_end = len(haystack)
+                line_number += haystack.count(b"\n", counted_to, line_start)
+                counted_to = line_start
+                text = data[line_start:line_end].decode("utf-8", errors="replace").rstrip("\r")
+                result.hits.append(LogHit(start + line_start, line_number + 1, text[:MAX_LINE_CHARS]))
+                i = haystack.find(needle, line_end)
+            result.bytes_scanned += len(data)
+            if result.truncated:
+                return result
+            line_number += haystack.count(b"\n", counted_to)
+
+    if grams is not None:
+        try:
+            write_index(index_path(log_file), size, grams)
+            result.indexed = True
+        except OSError as e:
+            logger.warning(f"Could not write search index for {log_file}: {e}")
+    return result
+
+
+class LogSearcher:
+    """Searches execution logs on a pool of worker threads."""
+
+    def __init__(self, workers: int = LOG_SEARCH_WORKERS, index_max_bytes: int = LOG_SEARCH_INDEX_MAX_BYTES):
+        self.workers = workers
+        self.index_max_bytes = index_max_bytes
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="log-search")
+        return self._pool
+
+    async def search(
+        self,
+        executions: List[Dict[str, Any]],
+        query: str,
+        ignore_case: bool = False,
+        limit: int = 100,
+    ) -> Dict[str, Any]:
+        """Search the logs of several executions in parallel.
+
+        Returns:
+            Matching lines, newest execution first, and scan statistics
+        """
+        loop = asyncio.get_running_loop()
+        scans = await asyncio.gather(*(
+            loop.run_in_executor(
+                self.pool,
+                search_log,
+                record["log_file"],
+                query,
+                ignore_case,
+                limit,
+                record.get("status") not in ACTIVE_STATUSES,
+                self.index_max_bytes,
+            )
+            for record in executions
+        ), return_exceptions=True)
+
+        hits: List[Dict[str, Any]] = []
+        stats = {"searched": 0, "skipped_by_index": 0, "indexed": 0, "bytes_scanned": 0, "errors": 0}
+        truncated = False
+        for record, scan in sorted(
+            zip(executions, scans),
+            key=lambda item: item[0].get("queued_at") or item[0].get("started_at") or "",
+            reverse=True,
+        ):
+            if isinstance(scan, Exception):
+                logger.warning(f"Could not search {record['log_file']}: {scan}")
+                stats["errors"] += 1
+                continue
+            stats["searched"] += 1
+            stats["skipped_by_index"] += scan.skipped
+            stats["indexed"] += scan.indexed
+            stats["bytes_scanned"] += scan.bytes_scanned
+            truncated = truncated or scan.truncated
+            for hit in scan.hits:
+                hits.append({
+                    "task_id": record["task_id"],
+                    "execution_id": record["execution_id"],
+                    "offset": hit.offset,
+                    "line_number": hit.line_number,
+                    "line": hit.line,
+                })
+        if len(hits) > limit:
+            hits = hits[:limit]
+            truncated = True
+        return {"hits": hits, "truncated": truncated, **stats}
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+# Shared by all requests
+log_searcher = LogSearcher()
@@ -0,0 +1,292 @@
+"""Compressed log segments and a reader that spans them.
+
+A rotated byte range ``[start, end)`` of ``name.log`` is stored as
+``name.log.<start>-<end>.gz`` (or ``.zst``). The segment is a series of
+independently compressed members of up to ``MEMBER_SIZE`` bytes. Its
+``.idx`` sidecar lists where each member starts, so a read only decompresses
+the members it touches. While the execution is still writing, the rotated
+range is punched out of the live file. The live file keeps its size, so byte
+offsets never change. ``LogFile`` reads by logical offset, from the segments
+for rotated ranges and from the live file for the rest.
+"""
+
+import bisect
+import ctypes
+import ctypes.util
+import gzip
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Uncompressed bytes per independently decompressible member
+MEMBER_SIZE = 1024 * 1024
+
+SEGMENT_PATTERN = re.compile(r"^(?P<log>.+\.log)\.(?P<start>\d{12})-(?P<end>\d{12})\.(?P<ext>gz|zst)$")
+
+FALLOC_FL_KEEP_SIZE = 0x01
+FALLOC_FL_PUNCH_HOLE = 0x02
+
+
+class Codec(NamedTuple):
+    extension: str
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes], bytes]
+
+
+def _load_codecs() -> Dict[str, Codec]:
+    codecs = {
+        "gzip": Codec("gz", lambda data: gzip.compress(data, compresslevel=6), gzip.decompress),
+    }
+    try:
+        import zstandard
+    except ImportError:
+        return codecs
+    compressor = zstandard.ZstdCompressor(level=3)
+    decompressor = zstandard.ZstdDecompressor()
+    codecs["zstd"] = Codec("zst", compressor.compress, decompressor.decompress)
+    return codecs
+
+
+CODECS = _load_codecs()
+CODECS_BY_EXTENSION = {codec.extension: codec for codec in CODECS.values()}
+
+
+def get_codec(name: str) -> Optional[Codec]:
+    """Look up a codec by name; "none" disables compression.
+
+    Falls back to gzip when zstd is requested but ``zstandard`` is not installed.
+    """
+    if name == "none":
+        return None
+    if name == "zstd" and name not in CODECS:
+        logger.warning("zstandard is not installed, compressing logs with gzip instead")
+        return CODECS["gzip"]
+    if name not in CODECS:
+        raise ValueError(f"Unknown log compression '{name}', expected one of: none, {', '.join(CODECS)}")
+    return CODECS[name]
+
+
+class Segment(NamedTuple):
+    start: int
+    end: int
+    path: Path
+    extension: str
+
+    @property
+    def index_path(self) -> Path:
+        return self.path.with_name(self.path.name + ".idx")
+
+
+def segment_path(log_path: Path, start: int, end: int, codec: Codec) -> Path:
+    return log_path.with_name(f"{log_path.name}.{start:012d}-{end:012d}.{codec.extension}")
+
+
+def parse_segment(path: Path) -> Optional[Tuple[str, Segment]]:
+    """Split a segment file name into its log name and segment."""
+    match = SEGMENT_PATTERN.match(path.name)
+    if match is None:
+        return None
+    return match["log"], Segment(int(match["start"]), int(match["end"]), path, match["ext"])
+
+
+def list_segments(log_path: Path) -> List[Segment]:
+    """Segments of a log, ordered by offset."""
+    segments = []
+    for path in log_path.parent.glob(f"{glob_escape(log_path.name)}.*-*.*"):
+        parsed = parse_segment(path)
+        if parsed is not None and parsed[0] == log_path.name and parsed[1].index_path.exists():
+            segments.append(parsed[1])
+    return sorted(segments)
+
+
+def glob_escape(name: str) -> str:
+    return re.sub(r"([*?\[])", r"[\1]", name)
+
+
+def log_exists(log_path: Path) -> bool:
+    """Whether a log has a live file or any segments."""
+    return log_path.exists() or bool(list_segments(log_path))
+
+
+def write_segment(fd: int, log_path: Path, start: int, end: int, codec: Codec) -> Segment:
+    """Compress ``[start, end)`` of an open log into a new segment.
+
+    The index is written before the segment is renamed into place, so
+    readers never see a segment without its index.
+    """
+    path = segment_path(log_path, start, end, codec)
+    tmp_path = path.with_name(path.name + ".tmp")
+    index_lines = []
+    with open(tmp_path, "wb") as out:
+        offset = start
+        while offset < end:
+            data = os.pread(fd, min(MEMBER_SIZE, end - offset), offset)
+            if not data:
+                raise OSError(f"{log_path} ended at {offset} before {end}")
+            index_lines.append(f"{offset - start} {out.tell()}\n")
+            out.write(codec.compress(data))
+            offset += len(data)
+    segment = Segment(start, end, path, codec.extension)
+    segment.index_path.write_text("".join(index_lines))
+    os.replace(tmp_path, path)
+    return segment
+
+
+def remove_segment(segment: Segment):
+    for path in (segment.path, segment.index_path):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _load_fallocate():
+    try:
+        fallocate = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True).fallocate
+    except (OSError, AttributeError):
+        return None
+    fallocate.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_longlong, ctypes.c_longlong]
+    return fallocate
+
+
+_fallocate = _load_fallocate()
+
+
+def punch_hole(fd: int, start: int, end: int) -> bool:
+    """Free the disk blocks of ``[start, end)`` without changing the file size.
+
+    Returns:
+        False if the file system does not support it
+    """
+    if _fallocate is None or end <= start:
+        return False
+    if _fallocate(fd, FALLOC_FL_PUNCH_HOLE | FALLOC_FL_KEEP_SIZE, start, end - start) != 0:
+        return False
+    return True
+
+
+def is_hole(fd: int, start: int, end: int) -> bool:
+    """Whether ``[start, end)`` of a file holds no data."""
+    try:
+        return os.lseek(fd, start, os.SEEK_DATA) >= end
+    except OSError:
+        # ENXIO: no data after start; other errors: SEEK_DATA unsupported
+        return os.fstat(fd).st_size <= start
+
+
+class LogFile:
+    """Read a log by logical offset across its segments and live file.
+
+    Supports the ``seek`` / ``read`` subset of the file API plus ``pread``.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._pos = 0
+        self._member: Optional[Tuple[Path, int, bytes]] = None
+        self._indexes: Dict[Path, Tuple[List[int], List[int], int]] = {}
+        try:
+            self._fd: Optional[int] = os.open(self.path, os.O_RDONLY | os.O_CLOEXEC)
+        except FileNotFoundError:
+            self._fd = None
+        self.refresh()
+
+    def refresh(self):
+        """Pick up segments written since the log was opened."""
+        self._segments = list_segments(self.path)
+        self._starts = [s.start for s in self._segments]
+
+    @property
+    def exists(self) -> bool:
+        return self._fd is not None or bool(self._segments)
+
+    @property
+    def live_start(self) -> int:
+        """Offset from which the live file holds the data."""
+        return self._segments[-1].end if self._segments else 0
+
+    def size(self) -> int:
+        live_size = os.fstat(self._fd).st_size if self._fd is not None else 0
+        return max(live_size, self.live_start)
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self) -> "LogFile":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def seek(self, pos: int):
+        self._pos = pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def read(self, n: int) -> bytes:
+        data = self.pread(self._pos, n)
+        self._pos += len(data)
+        return data
+
+    def pread(self, offset: int, n: int) -> bytes:
+        """Read up to ``n`` bytes at a logical offset."""
+        parts = []
+        while n > 0:
+            chunk = self._read_once(offset, n)
+            if not chunk:
+                break
+            parts.append(chunk)
+            offset += len(chunk)
+            n -= len(chunk)
+        return b"".join(parts)
+
+    def _read_once(self, offset: int, n: int) -> bytes:
+        i = bisect.bisect_right(self._starts, offset) - 1
+        if i >= 0 and offset < self._segments[i].end:
+            return self._read_segment(self._segments[i], offset, n)
+        if self._fd is None:
+            return b""
+        if offset < os.fstat(self._fd).st_size and is_hole(self._fd, offset, offset + 1):
+            # Rotated after this reader listed the segments
+            self.refresh()
+            if offset < self.live_start:
+                return self._read_once(offset, n)
+        return os.pread(self._fd, n, offset)
+
+    def _index(self, segment: Segment) -> Tuple[List[int], List[int], int]:
+        index = self._indexes.get(segment.path)
+        if index is None:
+            offsets, positions = [], []
+            for line in segment.index_path.read_text().splitlines():
+                offset, position = line.split()
+                offsets.append(int(offset))
+                positions.append(int(position))
+            index = (offsets, positions, segment.path.stat().st_size)
+            self._indexes[segment.path] = index
+        return index
+
+    def _read_segment(self, segment: Segment, offset: int, n: int) -> bytes:
+        offsets, positions, file_size = self._index(segment)
+        relative = offset - segment.start
+        member = bisect.bisect_right(offsets, relative) - 1
+        if self._member is not None and self._member[:2] == (segment.path, member):
+            data = self._member[2]
+        else:
+            end = positions[member + 1] if member + 1 < len(positions) else file_size
+            with open(segment.path, "rb") as f:
+                f.seek(positions[member])
+                compressed = f.read(end - positions[member])
+            codec = CODECS_BY_EXTENSION.get(segment.extension)
+            if codec is None:
+                raise OSError(f"Cannot read {segment.path}: zstandard is not installed")
+            data = codec.decompress(compressed)
+            self._member = (segment.path, member, data)
+        start = relative - offsets[member]
+        return data[start:start + n]
@@ -26,7 +26,14 @@ def run_server():
     print(f"Starting TaskHub MCP server with auto-reload {reload_status}")
     
     # Run the server on the available port
-    uvicorn.run("taskhub_mcp.api:app", host=SERVER_HOST, port=port, reload=AUTO_RELOAD)
+    # permessage-deflate compresses /events/ws frames when clients offer it
+    uvicorn.run(
+        "taskhub_mcp.api:app",
+        host=SERVER_HOST,
+        port=port,
+        reload=AUTO_RELOAD,
+        ws_per_message_deflate=True,
+    )
 
 
 if __name__ == "__main__":
@@ -34,9 +34,17 @@ class MarkdownTaskParser:
                 "created_at": metadata.get("created_at", datetime.now()),
                 "updated_at": metadata.get("updated_at", datetime.now()),
                 "artifacts": metadata.get("artifacts", []),
+                "inputs": metadata.get("inputs", []),
+                "cache": metadata.get("cache", False),
+                "depends_on": metadata.get("depends_on", []),
                 "content": content
             }
             
+            # A single dependency or tag may be given without a list
+            for key in ("depends_on", "tags"):
+                if isinstance(task_info[key], str):
+                    task_info[key] = [task_info[key]]
+            
             # Try to extract status from content if not in frontmatter
             if "status" not in metadata:
                 status_pattern = r'Status:\s*(todo|inprogress|review|done)'
@@ -100,6 +108,9 @@ class MarkdownTaskWriter:
             
             if task_data.get("assignee"):
                 post.metadata["assignee"] = task_data["assignee"]
+            elif "assignee" in task_data:
+                # Unassigned, e.g. after its lease expired
+                post.metadata.pop("assignee", None)
             
             if task_data.get("artifacts"):
                 post.metadata["artifacts"] = task_data["artifacts"]
@@ -114,7 +125,7 @@ class MarkdownTaskWriter:
             print(f"Error updating {file_path}: {e}")
             return False
     
-    def create_task_file(self, file_path: str, title: str, content: str = "", priority: Optional[str] = None, assignee: Optional[str] = None) -> bool:
+    def create_task_file(self, file_path: str, title: str, content: str = "", priority: Optional[str] = None, assignee: Optional[str] = None, depends_on: Optional[List[str]] = None, tags: Optional[List[str]] = None) -> bool:
         """Create a new task Markdown file"""
         full_path = self.base_path / file_path
         
@@ -135,6 +146,12 @@ class MarkdownTaskWriter:
             if assignee:
                 post.metadata["assignee"] = assignee
             
+            if depends_on:
+                post.metadata["depends_on"] = depends_on
+            
+            if tags:
+                post.metadata["tags"] = tags
+            
             # Write file
             with open(full_path, 'w', encoding='utf-8') as f:
                 f.write(frontmatter.dumps(post))
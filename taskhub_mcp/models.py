@@ -11,6 +11,9 @@ class TaskIndex(BaseModel):
     priority: Optional[Literal["low", "medium", "high"]] = None
     assignee: Optional[str] = None
     artifacts: Optional[List[str]] = None  # List of file paths to deliverables
+    depends_on: Optional[List[str]] = None  # IDs or file paths of prerequisite tasks
+    tags: Optional[List[str]] = None
+    lease_ttl: Optional[int] = None  # Seconds an agent may go without a heartbeat
     
     class Config:
         json_encoders = {
@@ -23,10 +26,20 @@ class TaskExecution(BaseModel):
     task_id: str
     session_name: str
     log_file: str
-    started_at: datetime = Field(default_factory=datetime.now)
+    started_at: Optional[datetime] = Field(default_factory=datetime.now)
     completed_at: Optional[datetime] = None
-    status: Literal["running", "completed", "failed", "stopped"] = "running"
+    queued_at: Optional[datetime] = None
+    status: Literal["queued", "running", "completed", "failed", "stopped"] = "running"
     exit_code: Optional[int] = None
+    script_path: Optional[str] = None
+    runner: Literal["tmux", "native"] = "tmux"
+    pid: Optional[int] = None
+    cpu_limit: Optional[float] = None
+    memory_limit_mb: Optional[int] = None
+    resources: Optional[Dict[str, Any]] = None
+    matrix_id: Optional[str] = None
+    matrix_index: Optional[int] = None
+    params: Optional[Dict[str, str]] = None  # Exported to the script as environment variables
     
     class Config:
         json_encoders = {
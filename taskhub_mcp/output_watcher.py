@@ -0,0 +1,185 @@
+"""Turn execution output into structured, rate-limited execution events.
+
+Each running execution's log file is followed through the shared log
+follower, so it is read once however many viewers stream it. Lines matching
+the configured output patterns (``PROGRESS: 42%``, ``ARTIFACT: path``,
+``ERROR: ...`` by default) are broadcast as ``execution_event`` messages whose
+``execution_event`` field is the pattern name and whose named groups become
+event fields.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Pattern, Tuple
+
+from .config import (
+    OUTPUT_EVENT_BURST,
+    OUTPUT_EVENT_RATE,
+    OUTPUT_PATTERNS,
+    OUTPUT_WATCH_INTERVAL,
+)
+from .event_broadcaster import event_broadcaster
+from .log_follower import LogFollower, log_follower
+
+logger = logging.getLogger(__name__)
+
+MAX_PENDING_EVENTS = 100
+
+
+class _TokenBucket:
+    """Simple token bucket used to rate-limit events per execution."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class OutputWatcher:
+    """Follows execution logs and broadcasts structured events."""
+
+    def __init__(
+        self,
+        patterns: Dict[str, str] = OUTPUT_PATTERNS,
+        poll_interval: float = OUTPUT_WATCH_INTERVAL,
+        rate: float = OUTPUT_EVENT_RATE,
+        burst: int = OUTPUT_EVENT_BURST,
+        follower: LogFollower = log_follower,
+    ):
+        self.patterns: Dict[str, Pattern[str]] = {}
+        for name, pattern in patterns.items():
+            try:
+                self.patterns[name] = re.compile(pattern)
+            except re.error as e:
+                logger.warning(f"Ignoring invalid output pattern '{name}': {e}")
+        self.poll_interval = poll_interval
+        self.rate = rate
+        self.burst = burst
+        self.follower = follower
+        self._watches: Dict[str, asyncio.Task] = {}
+
+    def parse_line(self, line: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Match a log line against the output patterns.
+
+        Returns:
+            The event name and its fields, or None if no pattern matches
+        """
+        for name, pattern in self.patterns.items():
+            match = pattern.search(line)
+            if match:
+                fields: Dict[str, Any] = {
+                    key: value for key, value in match.groupdict().items() if value is not None
+                }
+                if "percent" in fields:
+                    try:
+                        fields["percent"] = float(fields["percent"])
+                    except ValueError:
+                        pass
+                return name, fields
+        return None
+
+    def watch(
+        self,
+        execution_id: str,
+        task_id: str,
+        log_file: str,
+        is_running: Callable[[], Awaitable[bool]],
+    ):
+        """Start following an execution's log file."""
+        if not self.patterns or execution_id in self._watches:
+            return
+        task = asyncio.create_task(self._follow(execution_id, task_id, log_file, is_running))
+        self._watches[execution_id] = task
+        task.add_done_callback(lambda _: self._watches.pop(execution_id, None))
+
+    def unwatch(self, execution_id: str):
+        """Stop following an execution's log file."""
+        task = self._watches.pop(execution_id, None)
+        if task is not None:
+            task.cancel()
+
+    async def _follow(
+        self,
+        execution_id: str,
+        task_id: str,
+        log_file: str,
+        is_running: Callable[[], Awaitable[bool]],
+    ):
+        partial = b""
+        bucket = _TokenBucket(self.rate, self.burst)
+        pending: Deque[Tuple[str, Dict[str, Any]]] = deque(maxlen=MAX_PENDING_EVENTS)
+        pending_progress: Optional[Dict[str, Any]] = None
+        chunks = self.follower.subscribe(log_file, 0, is_running)
+
+        async def emit(name: str, fields: Dict[str, Any]):
+            await event_broadcaster.broadcast_execution_event(
+                task_id=task_id,
+                event_type=name,
+                execution_id=execution_id,
+                **fields
+            )
+
+        async def flush(final: bool = False):
+            nonlocal pending_progress
+            while pending and (final or bucket.take()):
+                await emit(*pending.popleft())
+            if pending_progress is not None and (final or bucket.take()):
+                await emit("progress", pending_progress)
+                pending_progress = None
+
+        try:
+            while True:
+                # Wake up periodically only while rate-limited events are held back
+                held_back = bool(pending) or pending_progress is not None
+                try:
+                    item = await asyncio.wait_for(
+                        chunks.get(), timeout=self.poll_interval if held_back else None
+                    )
+                except asyncio.TimeoutError:
+                    await flush()
+                    continue
+
+                if item is None:
+                    if partial:
+                        parsed = self.parse_line(partial.decode("utf-8", errors="replace"))
+                        if parsed is not None:
+                            pending.append(parsed)
+                    await flush(final=True)
+                    return
+
+                _, data = item
+                *lines, partial = (partial + data).split(b"\n")
+                for raw in lines:
+                    parsed = self.parse_line(raw.decode("utf-8", errors="replace").rstrip("\r"))
+                    if parsed is None:
+                        continue
+                    name, fields = parsed
+                    if name == "progress":
+                        # Only the most recent progress value is worth sending
+                        pending_progress = fields
+                    else:
+                        pending.append((name, fields))
+                await flush()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error watching output of execution {execution_id}: {e}")
+        finally:
+            self.follower.unsubscribe(log_file, chunks)
+
+
+# Global output watcher instance
+output_watcher = OutputWatcher()
@@ -0,0 +1,256 @@
+"""Per-execution resource accounting and limits.
+
+Every script is started through ``resource_wrapper.py``, which waits for it
+with ``wait4`` and writes its rusage (CPU time, peak RSS, block I/O and wall
+time) to ``<log>.rusage``. Where a cgroup v2 hierarchy is writable, each
+execution also gets a cgroup of its own. The wrapper joins it before starting
+the script, so usage is counted for every process the script starts, and
+CPU and memory limits are enforced by the kernel. Without cgroups, memory
+limits fall back to ``RLIMIT_AS`` and CPU limits are not enforced.
+"""
+
+import json
+import logging
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from .config import CGROUP_ROOT, RESOURCE_ACCOUNTING
+
+logger = logging.getLogger(__name__)
+
+WRAPPER_PATH = str(Path(__file__).with_name("resource_wrapper.py"))
+# Isolated and without site, so the wrapper starts quickly
+WRAPPER_COMMAND = [sys.executable, "-I", "-S", WRAPPER_PATH]
+CGROUP_CONTROLLERS = ("cpu", "memory", "io", "pids")
+# cpu.max period; a limit of 1.5 CPUs becomes a quota of 150000 per 100000
+CPU_PERIOD_USEC = 100000
+# Mounts checked by "auto": pure cgroup v2, then the unified half of a hybrid setup
+CGROUP_MOUNTS = (Path("/sys/fs/cgroup"), Path("/sys/fs/cgroup/unified"))
+
+
+def _find_cgroup_root() -> Optional[Path]:
+    for mount in CGROUP_MOUNTS:
+        if (mount / "cgroup.controllers").exists():
+            return mount / "taskhub"
+    return None
+
+
+def _read_keyed(path: Path) -> Dict[str, int]:
+    """Parse a flat "key value" cgroup file such as cpu.stat."""
+    values = {}
+    for line in path.read_text().splitlines():
+        key, _, value = line.partition(" ")
+        if value.strip().isdigit():
+            values[key] = int(value)
+    return values
+
+
+class ResourceAccountant:
+    """Creates execution cgroups and collects resource usage."""
+
+    def __init__(self, cgroup_root: str = CGROUP_ROOT, enabled: bool = RESOURCE_ACCOUNTING):
+        self.enabled = enabled
+        self._configured_root = cgroup_root
+        self._setup_done = False
+        self.cgroup_root: Optional[Path] = None
+        self.controllers: Set[str] = set()
+
+    def _setup(self):
+        """Find and prepare the cgroup root on first use."""
+        if self._setup_done:
+            return
+        self._setup_done = True
+        if self._configured_root == "none":
+            return
+        root = _find_cgroup_root() if self._configured_root == "auto" else Path(self._configured_root)
+        if root is None:
+            logger.info("No cgroup v2 hierarchy found, collecting rusage only")
+            return
+        try:
+            root.mkdir(exist_ok=True)
+            available = (root / "cgroup.controllers").read_text().split()
+        except OSError as e:
+            logger.warning(f"cgroups under {root} are not writable, collecting rusage only: {e}")
+            return
+
+        # Controllers the parent does not delegate stay off; cpu.stat works regardless
+        for controller in CGROUP_CONTROLLERS:
+            if controller in available:
+                try:
+                    (root / "cgroup.subtree_control").write_text(f"+{controller}")
+                except OSError as e:
+                    logger.info(f"Could not enable the {controller} cgroup controller: {e}")
+        self.controllers = set((root / "cgroup.subtree_control").read_text().split())
+        self.cgroup_root = root
+        self._remove_stale_cgroups()
+
+    def _remove_stale_cgroups(self):
+        """Remove empty execution cgroups left over from earlier runs."""
+        for path in self.cgroup_root.glob("exec-*"):
+            try:
+                path.rmdir()
+            except OSError:
+                pass
+
+    @staticmethod
+    def stats_path(record: Dict[str, Any]) -> Path:
+        return Path(record["log_file"] + ".rusage")
+
+    def prepare(self, record: Dict[str, Any]) -> List[str]:
+        """Set up accounting and limits for an execution about to start.
+
+        Stores the applied limits and the cgroup, if any, in
+        ``record["resources"]``.
+
+        Returns:
+            Command prefix that runs the script under the wrapper, or an
+            empty list when accounting is disabled
+        """
+        if not self.enabled:
+            return []
+        self._setup()
+
+        cpu_limit = record.get("cpu_limit")
+        memory_limit = record["memory_limit_mb"] * 1024 * 1024 if record.get("memory_limit_mb") else None
+        cgroup = self._create_cgroup(record["execution_id"], cpu_limit, memory_limit)
+        controllers = self.controllers if cgroup is not None else set()
+
+        prefix = [*WRAPPER_COMMAND, "--stats", str(self.stats_path(record))]
+        limits: Dict[str, Any] = {}
+        if cpu_limit:
+            if "cpu" not in controllers:
+                logger.warning(f"CPU limit of execution {record['execution_id']} not enforced: no cgroup cpu controller")
+            limits["cpu"] = {"cpus": cpu_limit, "enforced_by": "cgroup" if "cpu" in controllers else None}
+        if memory_limit:
+            if "memory" in controllers:
+                limits["memory"] = {"bytes": memory_limit, "enforced_by": "cgroup"}
+            else:
+                prefix += ["--memory-limit", str(memory_limit)]
+                limits["memory"] = {"bytes": memory_limit, "enforced_by": "rlimit"}
+        if cgroup is not None:
+            prefix += ["--cgroup", str(cgroup)]
+
+        record["resources"] = {"cgroup": str(cgroup) if cgroup else None, "limits": limits}
+        return prefix + ["--"]
+
+    def _create_cgroup(self, execution_id: str, cpu_limit: Optional[float], memory_limit: Optional[int]) -> Optional[Path]:
+        if self.cgroup_root is None:
+            return None
+        path = self.cgroup_root / f"exec-{execution_id}"
+        try:
+            path.mkdir(exist_ok=True)
+            if cpu_limit and "cpu" in self.controllers:
+                (path / "cpu.max").write_text(f"{int(cpu_limit * CPU_PERIOD_USEC)} {CPU_PERIOD_USEC}")
+            if memory_limit and "memory" in self.controllers:
+                (path / "memory.max").write_text(str(memory_limit))
+        except OSError as e:
+            logger.warning(f"Could not create cgroup for execution {execution_id}: {e}")
+            self._remove_cgroup(path)
+            return None
+        return path
+
+    @staticmethod
+    def _remove_cgroup(path: Path):
+        try:
+            path.rmdir()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            # Processes the script left behind keep the cgroup busy
+            logger.info(f"Could not remove cgroup {path}: {e}")
+
+    def discard(self, record: Dict[str, Any]):
+        """Undo ``prepare`` for an execution that failed to start."""
+        cgroup = (record.get("resources") or {}).get("cgroup")
+        if cgroup:
+            self._remove_cgroup(Path(cgroup))
+
+    def _read_cgroup(self, path: Path) -> Dict[str, Any]:
+        usage: Dict[str, Any] = {}
+        try:
+            cpu = _read_keyed(path / "cpu.stat")
+        except OSError:
+            return usage
+        usage["cpu_user_seconds"] = round(cpu.get("user_usec", 0) / 1e6, 3)
+        usage["cpu_system_seconds"] = round(cpu.get("system_usec", 0) / 1e6, 3)
+        if cpu.get("nr_throttled"):
+            usage["cpu_throttled_seconds"] = round(cpu.get("throttled_usec", 0) / 1e6, 3)
+
+        peak = path / "memory.peak"
+        if peak.exists():
+            usage["peak_memory_bytes"] = int(peak.read_text())
+        events = path / "memory.events"
+        if events.exists():
+            usage["oom_kills"] = _read_keyed(events).get("oom_kill", 0)
+
+        io_stat = path / "io.stat"
+        if io_stat.exists():
+            read_bytes = write_bytes = 0
+            for line in io_stat.read_text().splitlines():
+                for field in line.split()[1:]:
+                    key, _, value = field.partition("=")
+                    if key == "rbytes":
+                        read_bytes += int(value)
+                    elif key == "wbytes":
+                        write_bytes += int(value)
+            usage["io_read_bytes"] = read_bytes
+            usage["io_write_bytes"] = write_bytes
+        return usage
+
+    def snapshot(self, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Usage so far of a running execution, when it has a cgroup."""
+        resources = record.get("resources") or {}
+        if not resources.get("cgroup"):
+            return None
+        usage = self._read_cgroup(Path(resources["cgroup"]))
+        if "cpu_user_seconds" in usage:
+            usage["cpu_seconds"] = round(usage["cpu_user_seconds"] + usage["cpu_system_seconds"], 3)
+        return {**resources, **usage}
+
+    def collect(self, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Final usage of a finished execution; removes its cgroup and stats file.
+
+        cgroup counters cover every process the script started, so they take
+        precedence over the wrapper's rusage, which only covers the processes
+        it waited for.
+        """
+        resources = dict(record.get("resources") or {})
+        sources = []
+
+        stats_path = self.stats_path(record)
+        try:
+            stats = json.loads(stats_path.read_text())
+            stats_path.unlink()
+        except (OSError, ValueError):
+            stats = None
+        if stats is not None:
+            cgroup_joined = stats.pop("cgroup_joined", False)
+            resources.update(stats)
+            sources.append("rusage")
+        else:
+            cgroup_joined = False
+
+        cgroup = resources.get("cgroup")
+        if cgroup:
+            if cgroup_joined:
+                resources.update(self._read_cgroup(Path(cgroup)))
+                sources.append("cgroup")
+            self._remove_cgroup(Path(cgroup))
+            resources["cgroup"] = None
+
+        if not sources and not record.get("resources"):
+            # Started without accounting
+            return None
+        if "wall_seconds" not in resources and record.get("started_at"):
+            started = datetime.fromisoformat(record["started_at"])
+            resources["wall_seconds"] = round((datetime.utcnow() - started).total_seconds(), 3)
+        if "cpu_user_seconds" in resources:
+            resources["cpu_seconds"] = round(resources["cpu_user_seconds"] + resources["cpu_system_seconds"], 3)
+        resources["sources"] = sources
+        return resources
+
+
+# Global resource accountant for all executions
+resource_accountant = ResourceAccountant()
@@ -0,0 +1,120 @@
+"""Run a command and record its resource usage.
+
+Usage::
+
+    python -I -S resource_wrapper.py [--stats FILE] [--cgroup DIR] [--memory-limit BYTES] -- COMMAND...
+    python -I -S resource_wrapper.py --worker
+
+Execution runners start every script through this wrapper. It moves itself
+into the execution's cgroup when one is given, waits for the command with
+``wait4`` and writes the command's rusage as JSON to ``FILE``. It then exits
+the way the command did, so the runners see the command's own exit code or
+signal. Only the standard library is used, because the wrapper is started
+without ``site``.
+
+With ``--worker`` the wrapper is started ahead of time by a worker pool and
+waits for its arguments, sent as one JSON list on stdin, before going on as
+above.
+"""
+
+import argparse
+import json
+import os
+import resource
+import signal
+import sys
+import time
+
+# Delivered to the whole process group; the command decides how to handle them
+IGNORED_SIGNALS = (signal.SIGINT, signal.SIGTERM, signal.SIGHUP, signal.SIGQUIT)
+
+
+def join_cgroup(path: str) -> bool:
+    try:
+        with open(os.path.join(path, "cgroup.procs"), "w") as f:
+            f.write(str(os.getpid()))
+    except OSError:
+        return False
+    return True
+
+
+def read_job():
+    """Wait for a pooled worker's arguments; None if the pool retired it."""
+    line = sys.stdin.buffer.readline()
+    if not line.strip():
+        return None
+    # The command gets no input, as when it is started directly
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.close(devnull)
+    return json.loads(line)
+
+
+def write_stats(path: str, stats: dict):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(stats, f)
+    os.replace(tmp_path, path)
+
+
+def main(argv=None) -> int:
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv == ["--worker"]:
+        argv = read_job()
+        if argv is None:
+            return 0
+
+    parser = argparse.ArgumentParser(description="Run a command and record its resource usage")
+    parser.add_argument("--stats", help="File to write the usage to")
+    parser.add_argument("--cgroup", help="cgroup v2 directory to run the command in")
+    parser.add_argument("--memory-limit", type=int, help="Address space limit in bytes")
+    parser.add_argument("command", nargs=argparse.REMAINDER)
+    args = parser.parse_args(argv)
+    command = args.command[1:] if args.command[:1] == ["--"] else args.command
+    if not command:
+        parser.error("no command given")
+
+    cgroup_joined = join_cgroup(args.cgroup) if args.cgroup else False
+    for sig in IGNORED_SIGNALS:
+        signal.signal(sig, signal.SIG_IGN)
+
+    started = time.monotonic()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            for sig in IGNORED_SIGNALS:
+                signal.signal(sig, signal.SIG_DFL)
+            if args.memory_limit:
+                resource.setrlimit(resource.RLIMIT_AS, (args.memory_limit, args.memory_limit))
+            os.execvp(command[0], command)
+        except OSError as e:
+            os.write(2, f"{command[0]}: {e}\n".encode())
+        os._exit(127)
+
+    _, status, usage = os.wait4(pid, 0)
+    stats = {
+        "wall_seconds": round(time.monotonic() - started, 3),
+        "cpu_user_seconds": round(usage.ru_utime, 3),
+        "cpu_system_seconds": round(usage.ru_stime, 3),
+        # ru_maxrss is in KiB on Linux; block counts are 512-byte units
+        "peak_rss_bytes": usage.ru_maxrss * 1024,
+        "io_read_bytes": usage.ru_inblock * 512,
+        "io_write_bytes": usage.ru_oublock * 512,
+        "cgroup_joined": cgroup_joined,
+    }
+    try:
+        if args.stats:
+            write_stats(args.stats, stats)
+    except OSError as e:
+        print(f"Could not write resource usage to {args.stats}: {e}", file=sys.stderr)
+
+    if os.WIFSIGNALED(status):
+        sig = os.WTERMSIG(status)
+        signal.signal(sig, signal.SIG_DFL)
+        os.kill(os.getpid(), sig)
+    return os.WEXITSTATUS(status) if os.WIFEXITED(status) else 128 + os.WTERMSIG(status)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,545 @@
+"""Execution runner backends.
+
+``TmuxRunner`` runs a script inside a detached tmux session, which users can
+attach to. ``NativeRunner`` starts the script directly as an asyncio
+subprocess in its own process group and pipes stdout/stderr into the log
+file. Both report the script's exact exit code as soon as it ends, through
+``wait_for_exit``; the executor records it.
+
+With ``TASKHUB_WORKER_POOL_SIZE`` set, each runner keeps a pool of idle
+workers spawned ahead of time (see ``worker_pool``): a tmux session whose
+shell waits for its script on a FIFO, or a resource wrapper process waiting
+for its command on stdin. Starting an execution hands the job to one of
+them and only spawns a new one when the pool is empty.
+"""
+
+import asyncio
+import errno
+import json
+import logging
+import os
+import re
+import shlex
+import signal
+import uuid
+from typing import Any, Dict, List, Optional
+
+from .config import WORKER_POOL_DIR, WORKER_POOL_SIZE
+from .execution_registry import ExecutionRegistry
+from .resource_accounting import WRAPPER_COMMAND
+from .tmux_client import TmuxError, tmux_client
+from .worker_pool import PoolWorker, WorkerPool
+
+logger = logging.getLogger(__name__)
+
+# Seconds between SIGTERM and SIGKILL when stopping a native execution
+STOP_GRACE_PERIOD = 5.0
+# Seconds between checks while waiting for an execution to finish
+COMPLETION_POLL_INTERVAL = 1.0
+# Seconds between checks that a tmux session waiting on its FIFO still exists
+SESSION_CHECK_INTERVAL = 5.0
+# Longest wait for the log to catch up with an exit code reported on the FIFO
+LOG_FLUSH_TIMEOUT = 2.0
+# Longest wait for a new pooled tmux worker's shell to wait on its FIFO
+WORKER_READY_TIMEOUT = 5.0
+# Seconds a retired native worker gets to exit before it is killed
+WORKER_RETIRE_TIMEOUT = 2.0
+# Idle pooled tmux sessions; unlike task sessions they do not start with "taskhub_"
+POOL_SESSION_PREFIX = "taskhubpool_"
+
+# tmux sessions also echo the "Press enter" prompt into the log
+EXIT_CODE_PATTERN = re.compile(rb"Exit code: (-?\d+)\s*(?:Press enter to close\.\.\.)?\s*$")
+
+
+def read_exit_code(log_file: str) -> Optional[int]:
+    """Read the exit code from the trailing "Exit code: N" line of a log."""
+    try:
+        with open(log_file, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - 256))
+            tail = f.read()
+    except OSError:
+        return None
+    match = EXIT_CODE_PATTERN.search(tail)
+    return int(match.group(1)) if match else None
+
+
+def completion_status(exit_code: Optional[int]) -> str:
+    """Map an exit code to a final execution status.
+
+    An unknown exit code (the session was killed before the script could
+    record it) counts as a failure.
+    """
+    return "completed" if exit_code == 0 else "failed"
+
+
+def tmux_session_name(task_id: str, execution_id: Optional[str] = None) -> str:
+    """Generate a tmux session name for a task, or for one of its matrix runs."""
+    if execution_id is not None:
+        return f"taskhub_{task_id[:8]}_{execution_id[:8]}"
+    return f"taskhub_{task_id[:8]}"
+
+
+class Runner:
+    """Base class for execution runners."""
+
+    name = ""
+
+    def __init__(self, registry: ExecutionRegistry, pool_size: int = WORKER_POOL_SIZE):
+        self.registry = registry
+        self.pool = WorkerPool(self.name, self._spawn_worker, pool_size)
+
+    async def _spawn_worker(self) -> PoolWorker:
+        """Spawn an idle worker for the pool."""
+        raise NotImplementedError
+
+    def session_name(self, task_id: str, execution_id: str, matrix_id: Optional[str] = None) -> str:
+        """Name under which the execution is reported.
+
+        Runs of a matrix execute side by side, so each needs a name of its own.
+        """
+        raise NotImplementedError
+
+    async def start(self, record: Dict[str, Any]):
+        """Start an execution.
+
+        The registry record is marked running right after this returns, so
+        runners may add fields to it (such as a pid) but must not update the
+        registry themselves until a later event loop iteration. The script is
+        run behind ``record["command_prefix"]``, if set.
+        """
+        raise NotImplementedError
+
+    async def is_alive(self, record: Dict[str, Any]) -> bool:
+        """Check whether the execution is still running."""
+        raise NotImplementedError
+
+    async def stop(self, record: Dict[str, Any]) -> bool:
+        """Stop the execution. Returns False if it was not running."""
+        raise NotImplementedError
+
+    async def wait_for_exit(self, record: Dict[str, Any]) -> Optional[int]:
+        """Wait until the execution's script exits.
+
+        Returns:
+            The script's exit code, or None if it could not be determined
+        """
+        raise NotImplementedError
+
+    def recorded_exit_code(self, record: Dict[str, Any]) -> Optional[int]:
+        """Exit code a finished execution left behind, or None if it recorded none."""
+        return read_exit_code(record["log_file"])
+
+    def cleanup(self, record: Dict[str, Any]):
+        """Remove files the runner kept for an execution once it is recorded."""
+
+    async def attach_command(self, record: Dict[str, Any]) -> str:
+        """Get a shell command that attaches to the execution."""
+        raise ValueError(f"Executions using the {self.name} runner cannot be attached to")
+
+
+class TmuxWorker(PoolWorker):
+    """A tmux session whose shell waits for a script on a FIFO.
+
+    The runner holds the FIFO open for writing from the moment the shell is
+    waiting on it, writes the script and closes it; the shell then runs the
+    script with ``eval``.
+    """
+
+    def __init__(self, name: str, fifo_path: str, fd: Optional[int]):
+        self.name = name
+        self.fifo_path = fifo_path
+        self.fd: Optional[int] = fd
+
+    def send(self, script: str):
+        fd, self.fd = self.fd, None
+        try:
+            os.set_blocking(fd, True)
+            data = script.encode()
+            while data:
+                data = data[os.write(fd, data):]
+        finally:
+            os.close(fd)
+
+    async def retire(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+        await tmux_client.kill_session(self.name)
+        try:
+            os.unlink(self.fifo_path)
+        except FileNotFoundError:
+            pass
+
+
+class TmuxRunner(Runner):
+    """Runs scripts in detached tmux sessions.
+
+    The session stays open at a "Press enter" prompt after the script ends,
+    so the end of the script is not the end of the session. The shell
+    writes the exit code to ``<log>.exit`` and then to the ``<log>.fifo``
+    pipe, which the runner reads from the event loop, so completion is
+    noticed without polling.
+    """
+
+    name = "tmux"
+
+    def __init__(self, registry: ExecutionRegistry, pool_size: int = WORKER_POOL_SIZE):
+        super().__init__(registry, pool_size)
+        self._exits: Dict[str, asyncio.Future] = {}
+
+    async def _spawn_worker(self) -> TmuxWorker:
+        WORKER_POOL_DIR.mkdir(exist_ok=True)
+        name = f"{POOL_SESSION_PREFIX}{uuid.uuid4().hex[:8]}"
+        fifo_path = str(WORKER_POOL_DIR / f"{name}.job")
+        os.mkfifo(fifo_path, 0o600)
+        fifo = shlex.quote(fifo_path)
+        script = f"IFS= read -r -d '' job < {fifo}; rm -f {fifo}; [ -n \"$job\" ] && eval \"$job\""
+        try:
+            await tmux_client.new_session(name, f"bash -c {shlex.quote(script)}")
+        except TmuxError:
+            os.unlink(fifo_path)
+            raise
+
+        # Opening the FIFO without blocking only succeeds once the shell reads it
+        deadline = asyncio.get_running_loop().time() + WORKER_READY_TIMEOUT
+        while True:
+            try:
+                fd = os.open(fifo_path, os.O_WRONLY | os.O_NONBLOCK | os.O_CLOEXEC)
+                return TmuxWorker(name, fifo_path, fd)
+            except OSError as e:
+                if e.errno != errno.ENXIO or asyncio.get_running_loop().time() >= deadline:
+                    await TmuxWorker(name, fifo_path, None).retire()
+                    raise RuntimeError(f"Pooled tmux session {name} did not start: {e}")
+            await asyncio.sleep(0.01)
+
+    async def _start_in_worker(self, session_name: str, script: str) -> bool:
+        """Run the script in a pooled session renamed for the execution."""
+        worker = self.pool.acquire()
+        if worker is None:
+            self.pool.refill()
+            return False
+        try:
+            ok, lines = await tmux_client.run("rename-session", "-t", f"={worker.name}", session_name)
+            if not ok:
+                raise TmuxError("; ".join(lines))
+            worker.name = session_name
+            worker.send(script)
+        except (OSError, TmuxError) as e:
+            logger.warning(f"Pooled tmux session {worker.name} failed, starting a new one: {e}")
+            await worker.retire()
+            return False
+        finally:
+            self.pool.refill()
+        return True
+
+    def session_name(self, task_id: str, execution_id: str, matrix_id: Optional[str] = None) -> str:
+        return tmux_session_name(task_id, execution_id if matrix_id else None)
+
+    @staticmethod
+    def _fifo_path(record: Dict[str, Any]) -> str:
+        return record["log_file"] + ".fifo"
+
+    @staticmethod
+    def _exit_path(record: Dict[str, Any]) -> str:
+        return record["log_file"] + ".exit"
+
+    def _read_exit_file(self, record: Dict[str, Any]) -> Optional[int]:
+        try:
+            with open(self._exit_path(record)) as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            return None
+
+    def recorded_exit_code(self, record: Dict[str, Any]) -> Optional[int]:
+        exit_code = self._read_exit_file(record)
+        return exit_code if exit_code is not None else super().recorded_exit_code(record)
+
+    def _listen(self, record: Dict[str, Any]) -> asyncio.Future:
+        """Wait for the exit code on the execution's FIFO."""
+        execution_id = record["execution_id"]
+        future = self._exits.get(execution_id)
+        if future is not None:
+            return future
+
+        fifo_path = self._fifo_path(record)
+        if not os.path.exists(fifo_path):
+            os.mkfifo(fifo_path, 0o600)
+        # Opened read-write so the pipe never reports EOF before the shell writes
+        fd = os.open(fifo_path, os.O_RDWR | os.O_NONBLOCK | os.O_CLOEXEC)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._exits[execution_id] = future
+
+        def on_readable():
+            try:
+                data = os.read(fd, 64)
+            except BlockingIOError:
+                return
+            try:
+                exit_code: Optional[int] = int(data.split()[0])
+            except (IndexError, ValueError):
+                exit_code = None
+            if not future.done():
+                future.set_result(exit_code)
+
+        def close(_):
+            loop.remove_reader(fd)
+            os.close(fd)
+            self._exits.pop(execution_id, None)
+
+        loop.add_reader(fd, on_readable)
+        future.add_done_callback(close)
+        return future
+
+    async def start(self, record: Dict[str, Any]):
+        session_name = record["session_name"]
+        if await tmux_client.has_session(session_name):
+            raise ValueError(f"Task {record['task_id']} is already running in session {session_name}")
+
+        log_file = shlex.quote(record["log_file"])
+        # The prefix may carry matrix parameters, so every word is quoted
+        command = shlex.join([*record.get("command_prefix", []), record["script_path"]])
+        future = self._listen(record)
+        script = (
+            f"exec > >(tee -a {log_file}) 2>&1; {command}; code=$?; "
+            f"echo \"Exit code: $code\"; echo $code > {shlex.quote(self._exit_path(record))}; "
+            f"echo $code 1<> {shlex.quote(self._fifo_path(record))}; read -p \"Press enter to close...\""
+        )
+        if await self._start_in_worker(session_name, script):
+            return
+        shell_cmd = f"bash -c {shlex.quote(script)}"
+
+        try:
+            await tmux_client.new_session(session_name, shell_cmd)
+        except TmuxError as e:
+            future.cancel()
+            self.cleanup(record)
+            raise RuntimeError(f"Failed to create tmux session: {e}")
+
+    async def is_alive(self, record: Dict[str, Any]) -> bool:
+        return await tmux_client.has_session(record["session_name"])
+
+    async def stop(self, record: Dict[str, Any]) -> bool:
+        stopped = await tmux_client.kill_session(record["session_name"])
+        future = self._exits.get(record["execution_id"])
+        if stopped and future is not None and not future.done():
+            # Killed before the script wrote its exit code
+            future.set_result(self._read_exit_file(record))
+        return stopped
+
+    async def wait_for_exit(self, record: Dict[str, Any]) -> Optional[int]:
+        future = self._exits.get(record["execution_id"])
+        if future is None and os.path.exists(self._fifo_path(record)):
+            # Started before a restart: listen again in case the script is
+            # still running, and read the exit file in case it is not
+            future = self._listen(record)
+
+        try:
+            while True:
+                exit_code = self._read_exit_file(record)
+                if exit_code is not None:
+                    break
+                if future is not None:
+                    done, _ = await asyncio.wait({future}, timeout=SESSION_CHECK_INTERVAL)
+                    if done:
+                        exit_code = future.result()
+                        break
+                else:
+                    await asyncio.sleep(COMPLETION_POLL_INTERVAL)
+                if not await self.is_alive(record):
+                    # The session was killed before the script finished
+                    exit_code = self._read_exit_file(record)
+                    break
+        finally:
+            if future is not None and not future.done():
+                future.cancel()
+        if exit_code is not None:
+            await self._wait_for_log_flush(record)
+        return exit_code
+
+    async def _wait_for_log_flush(self, record: Dict[str, Any]):
+        """Give ``tee`` a moment to write the trailing exit code line."""
+        deadline = asyncio.get_running_loop().time() + LOG_FLUSH_TIMEOUT
+        while read_exit_code(record["log_file"]) is None:
+            if asyncio.get_running_loop().time() >= deadline:
+                break
+            await asyncio.sleep(0.05)
+
+    def cleanup(self, record: Dict[str, Any]):
+        for path in (self._fifo_path(record), self._exit_path(record)):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+    async def attach_command(self, record: Dict[str, Any]) -> str:
+        session_name = record["session_name"]
+        if not await tmux_client.has_session(session_name):
+            raise ValueError(f"No active session found for task {record['task_id']}")
+        return f"tmux attach-session -t {session_name}"
+
+
+class NativeWorker(PoolWorker):
+    """A resource wrapper process waiting for its command on stdin."""
+
+    def __init__(self, process: asyncio.subprocess.Process):
+        self.process = process
+
+    def usable(self) -> bool:
+        return self.process.returncode is None
+
+    async def send(self, command: List[str]):
+        # The wrapper takes the same arguments as on its command line
+        if command[:len(WRAPPER_COMMAND)] == WRAPPER_COMMAND:
+            args = command[len(WRAPPER_COMMAND):]
+        else:
+            args = ["--", *command]
+        self.process.stdin.write(json.dumps(args).encode() + b"\n")
+        await self.process.stdin.drain()
+        self.process.stdin.close()
+
+    async def retire(self):
+        # An empty job makes the wrapper exit
+        self.process.stdin.close()
+        try:
+            await asyncio.wait_for(self.process.wait(), timeout=WORKER_RETIRE_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.process.kill()
+            await self.process.wait()
+
+
+class NativeRunner(Runner):
+    """Runs scripts as subprocesses in their own process groups."""
+
+    name = "native"
+
+    def __init__(self, registry: ExecutionRegistry, pool_size: int = WORKER_POOL_SIZE):
+        super().__init__(registry, pool_size)
+        self._processes: Dict[str, asyncio.subprocess.Process] = {}
+        self._pumps: Dict[str, asyncio.Task] = {}
+
+    def session_name(self, task_id: str, execution_id: str, matrix_id: Optional[str] = None) -> str:
+        return f"native_{execution_id[:8]}"
+
+    async def _spawn_worker(self) -> NativeWorker:
+        process = await asyncio.create_subprocess_exec(
+            *WRAPPER_COMMAND, "--worker",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            start_new_session=True,
+        )
+        return NativeWorker(process)
+
+    async def _start_in_worker(self, command: List[str]) -> Optional[asyncio.subprocess.Process]:
+        """Hand the command to a pooled wrapper process."""
+        worker = self.pool.acquire()
+        if worker is None:
+            self.pool.refill()
+            return None
+        try:
+            await worker.send(command)
+        except (ConnectionError, OSError) as e:
+            logger.warning(f"Pooled worker {worker.process.pid} failed, starting a new process: {e}")
+            await worker.retire()
+            return None
+        finally:
+            self.pool.refill()
+        return worker.process
+
+    async def start(self, record: Dict[str, Any]):
+        command = [*record.get("command_prefix", []), "bash", record["script_path"]]
+        log_file = open(record["log_file"], "ab")
+        process = await self._start_in_worker(command)
+        try:
+            if process is None:
+                process = await asyncio.create_subprocess_exec(
+                    *command,
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.STDOUT,
+                    start_new_session=True,
+                )
+        except OSError as e:
+            log_file.close()
+            raise RuntimeError(f"Failed to start process: {e}")
+
+        execution_id = record["execution_id"]
+        self._processes[execution_id] = process
+        record["pid"] = process.pid
+        pump = asyncio.create_task(self._pump(execution_id, process, log_file))
+        self._pumps[execution_id] = pump
+        pump.add_done_callback(lambda _: self._pumps.pop(execution_id, None))
+
+    async def _pump(self, execution_id: str, process: asyncio.subprocess.Process, log_file) -> int:
+        """Copy process output into the log file and return the exit code."""
+        try:
+            with log_file:
+                while True:
+                    chunk = await process.stdout.read(65536)
+                    if not chunk:
+                        break
+                    log_file.write(chunk)
+                    log_file.flush()
+                exit_code = await process.wait()
+                log_file.write(f"Exit code: {exit_code}\n".encode())
+        except Exception as e:
+            logger.error(f"Error collecting output of execution {execution_id}: {e}")
+            exit_code = await process.wait()
+        finally:
+            self._processes.pop(execution_id, None)
+        return exit_code
+
+    async def is_alive(self, record: Dict[str, Any]) -> bool:
+        if record["execution_id"] in self._processes:
+            return True
+        # Started by another server process: fall back to checking the pid
+        pid = record.get("pid")
+        if record.get("status") != "running" or not pid:
+            return False
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    async def stop(self, record: Dict[str, Any]) -> bool:
+        execution_id = record["execution_id"]
+        process = self._processes.get(execution_id)
+        pid = process.pid if process is not None else record.get("pid")
+        if not pid or not await self.is_alive(record):
+            return False
+
+        try:
+            os.killpg(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            return False
+
+        if process is not None:
+            try:
+                await asyncio.wait_for(process.wait(), timeout=STOP_GRACE_PERIOD)
+            except asyncio.TimeoutError:
+                try:
+                    os.killpg(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+        return True
+
+    async def wait_for_exit(self, record: Dict[str, Any]) -> Optional[int]:
+        pump = self._pumps.get(record["execution_id"])
+        if pump is not None:
+            return await asyncio.shield(pump)
+        # Started by another server process, which was the only one able to
+        # collect the exit status; fall back to the log's trailing line
+        while await self.is_alive(record):
+            await asyncio.sleep(COMPLETION_POLL_INTERVAL)
+        return read_exit_code(record["log_file"])
+
+
+def create_runners(registry: ExecutionRegistry, pool_size: int = WORKER_POOL_SIZE) -> Dict[str, Runner]:
+    """Create one instance of every runner backend."""
+    runners = (TmuxRunner(registry, pool_size), NativeRunner(registry, pool_size))
+    return {runner.name: runner for runner in runners}
@@ -0,0 +1,126 @@
+"""Versioned feed of task changes for clients that long-poll.
+
+MCP tool calls cannot hold an event stream open, so agents that wait for
+work would otherwise call list_tasks in a loop. ``TaskChangeFeed`` numbers
+every task event this process delivers (including those published by other
+processes through the event bus) and keeps the latest ones in a ring
+buffer. ``wait`` returns the changes after a version the client already
+saw, or parks on an ``asyncio.Condition`` until a matching one arrives.
+
+Versions count from 1 in each server process. A client whose version is
+older than the buffer, or newer than the feed (the server restarted), gets
+``reset`` and should list the tasks again. A sync rebuilds the whole index,
+so it resets every waiter too.
+"""
+
+import asyncio
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from .config import TASK_CHANGE_BUFFER
+
+# Events that change tasks; the sync event replaces them all
+TASK_EVENTS = ("task_updated",)
+SYNC_EVENT = "tasks_synced"
+
+
+class TaskChangeFeed:
+    """Numbers task changes and wakes the requests waiting for them."""
+
+    def __init__(self, buffer_size: int = TASK_CHANGE_BUFFER):
+        self.version = 0
+        self._changes: Deque[Dict[str, Any]] = deque(maxlen=buffer_size)
+        self._condition = asyncio.Condition()
+        self.waiting = 0
+
+    async def on_event(self, event: Dict[str, Any]):
+        """Event broadcaster listener."""
+        name = event.get("event")
+        if name in TASK_EVENTS:
+            data = event.get("data") or {}
+            await self.publish({**data, "timestamp": event.get("timestamp")})
+        elif name == SYNC_EVENT:
+            await self.publish(None)
+
+    async def publish(self, change: Optional[Dict[str, Any]]):
+        """Record a change (None for a full resync) and wake the waiters."""
+        async with self._condition:
+            self.version += 1
+            if change is None:
+                # Waiters from before the sync must reload
+                self._changes.clear()
+            else:
+                self._changes.append({"version": self.version, **change})
+            self._condition.notify_all()
+
+    def _oldest(self) -> int:
+        """Oldest version a client may hold and still get every later change."""
+        # A sync clears the buffer, so its oldest entry always follows the last sync
+        return self._changes[0]["version"] - 1 if self._changes else self.version
+
+    def changes_since(
+        self,
+        since: int,
+        status: Optional[str] = None,
+        task_id: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """Changes after ``since`` that match the filters, and whether the client must reload."""
+        if since > self.version or since < self._oldest():
+            return [], True
+        matches = []
+        # The buffer is in version order; walk back from the newest
+        for change in reversed(self._changes):
+            if change["version"] <= since:
+                break
+            if status is not None and change.get("status") != status:
+                continue
+            if task_id is not None and change.get("task_id") != task_id:
+                continue
+            matches.append(change)
+        matches.reverse()
+        return matches, False
+
+    async def wait(
+        self,
+        since: Optional[int] = None,
+        status: Optional[str] = None,
+        task_id: Optional[str] = None,
+        timeout: float = 30.0,
+    ) -> Dict[str, Any]:
+        """Wait up to ``timeout`` seconds for a matching change after ``since``.
+
+        Args:
+            since: Last version the client saw (None waits for the next change)
+            status: Only changes to this status
+            task_id: Only changes of this task
+            timeout: Seconds to wait before returning no changes
+
+        Returns:
+            The matching changes, the version to pass next time, and whether
+            the wait timed out or the client must reload the tasks
+        """
+        result: Dict[str, Any] = {}
+
+        def ready() -> bool:
+            changes, reset = self.changes_since(start, status, task_id)
+            result.update(changes=changes, reset=reset)
+            return bool(changes) or reset
+
+        self.waiting += 1
+        try:
+            async with self._condition:
+                start = self.version if since is None else since
+                timed_out = False
+                if not ready():
+                    try:
+                        await asyncio.wait_for(self._condition.wait_for(ready), timeout)
+                    except asyncio.TimeoutError:
+                        timed_out = True
+                return {
+                    "version": self.version,
+                    "changes": [] if timed_out else result["changes"],
+                    "timed_out": timed_out,
+                    "reset": not timed_out and result["reset"],
+                }
+        finally:
+            self.waiting -= 1
@@ -1,55 +1,127 @@
 """
 Task execution module for TaskHub MCP.
-Manages task execution in tmux sessions with real-time logging.
+Manages task execution in tmux sessions or native processes with real-time logging.
 """
 
 import asyncio
-import subprocess
 import json
+import logging
 import os
+import re
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Callable, Awaitable
+import sys
 import uuid
 import shlex
 
+from . import log_reader, log_segments
+from .config import DEFAULT_RUNNER, WORKER_POOL_SIZE
+from .event_broadcaster import event_broadcaster
+from .execution_cache import ExecutionCache, execution_cache
+from .execution_registry import ExecutionRegistry, execution_registry
+from .log_follower import log_follower
+from .log_lifecycle import LogLifecycleManager
+from .models import TaskExecution
+from .output_watcher import output_watcher
+from .resource_accounting import ResourceAccountant, resource_accountant
+from .runners import Runner, completion_status, create_runners, tmux_session_name
+from .tmux_client import tmux_client
+
+logger = logging.getLogger(__name__)
+
+CompletionListener = Callable[[Dict[str, Any]], Awaitable[None]]
+# Matrix parameters are exported to the script, so they must be variable names
+PARAM_NAME_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+def matrix_params(params: Dict[str, Any]) -> Dict[str, str]:
+    """Check one parameter set of a matrix run and convert its values to strings."""
+    result = {}
+    for name, value in params.items():
+        if not PARAM_NAME_PATTERN.match(name):
+            raise ValueError(f"Invalid matrix parameter name '{name}'")
+        if isinstance(value, bool):
+            value = "true" if value else "false"
+        elif value is None:
+            value = ""
+        elif not isinstance(value, (str, int, float)):
+            raise ValueError(f"Matrix parameter '{name}' must be a string, number or boolean")
+        result[name] = str(value)
+    return result
+
 class TaskExecutor:
     """Manages task execution in isolated environments."""
     
-    def __init__(self, tasks_dir: Path = Path("tasks"), logs_dir: Path = Path("logs")):
+    def __init__(
+        self,
+        tasks_dir: Path = Path("tasks"),
+        logs_dir: Path = Path("logs"),
+        registry: ExecutionRegistry = execution_registry,
+        default_runner: str = DEFAULT_RUNNER,
+        accountant: ResourceAccountant = resource_accountant,
+        cache: ExecutionCache = execution_cache,
+        pool_size: int = WORKER_POOL_SIZE
+    ):
         self.tasks_dir = tasks_dir
         self.logs_dir = logs_dir
         self.logs_dir.mkdir(exist_ok=True)
-        self.executions: Dict[str, Dict[str, Any]] = {}
+        self.registry = registry
+        self.runners: Dict[str, Runner] = create_runners(registry, pool_size)
+        if default_runner not in self.runners:
+            raise ValueError(f"Unknown runner '{default_runner}', expected one of: {', '.join(self.runners)}")
+        self.default_runner = default_runner
+        self.accountant = accountant
+        self.cache = cache
+        self._completions: Dict[str, asyncio.Task] = {}
+        self._stopping: set = set()
+        self._completion_listeners: List[CompletionListener] = [self._store_in_cache]
     
     def get_tmux_session_name(self, task_id: str) -> str:
         """Generate a tmux session name for a task."""
-        return f"taskhub_{task_id[:8]}"
+        return tmux_session_name(task_id)
     
-    async def execute_task(self, task_id: str, script_content: Optional[str] = None) -> Dict[str, Any]:
+    def _runner_for(self, record: Dict[str, Any]) -> Runner:
+        return self.runners[record.get("runner", "tmux")]
+    
+    async def prepare_execution(
+        self,
+        task_id: str,
+        script_content: Optional[str] = None,
+        runner: Optional[str] = None,
+        **extra: Any
+    ) -> Dict[str, Any]:
         """
-        Execute a task in a tmux session.
+        Record a queued execution of a task without starting it.
         
         Args:
             task_id: The task ID to execute
             script_content: Optional script content to execute. If not provided,
                           will look for an execute.sh script in the task directory.
+            runner: Runner backend ("tmux" or "native"). Defaults to the
+                    configured TASKHUB_RUNNER.
+            **extra: Additional fields stored with the execution record
         
         Returns:
-            Execution information including session name and log file path
+            The queued execution record
         """
-        session_name = self.get_tmux_session_name(task_id)
+        runner_name = runner or self.default_runner
+        if runner_name not in self.runners:
+            raise ValueError(f"Unknown runner '{runner_name}', expected one of: {', '.join(self.runners)}")
+        selected_runner = self.runners[runner_name]
+        
         execution_id = str(uuid.uuid4())
         log_file = self.logs_dir / f"{task_id}_{execution_id}.log"
+        matrix_id = extra.get("matrix_id")
         
-        # Check if session already exists
-        check_session = subprocess.run(
-            ["tmux", "has-session", "-t", session_name],
-            capture_output=True
-        )
-        
-        if check_session.returncode == 0:
-            raise ValueError(f"Task {task_id} is already running in session {session_name}")
+        # Refuse to queue a second run while one is waiting or still alive;
+        # only runs of the same matrix execute side by side
+        for record in self.registry.active(task_id):
+            if matrix_id is not None and record.get("matrix_id") == matrix_id:
+                continue
+            if record["status"] == "queued":
+                raise ValueError(f"Task {task_id} is already queued for execution")
+            if await self._runner_for(record).is_alive(record):
+                raise ValueError(f"Task {task_id} is already running in session {record['session_name']}")
         
         # Prepare script
         if script_content is None:
@@ -80,55 +152,302 @@ echo "Task completed: $(date)"
             script_path.write_text(script_content)
             script_path.chmod(0o755)
         
-        # Create tmux session and execute script
-        tmux_cmd = [
-            "tmux", "new-session", "-d", "-s", session_name,
-            f"bash -c 'exec > >(tee -a {log_file}) 2>&1; {script_path}; echo \"Exit code: $?\"; read -p \"Press enter to close...\"'"
-        ]
+        execution = TaskExecution(
+            execution_id=execution_id,
+            task_id=task_id,
+            session_name=selected_runner.session_name(task_id, execution_id, matrix_id),
+            log_file=str(log_file),
+            script_path=str(script_path),
+            runner=runner_name,
+            status="queued",
+            queued_at=datetime.utcnow(),
+            started_at=None
+        )
+        return self.registry.add(execution, **extra)
+    
+    async def start_execution(self, execution_id: str) -> Dict[str, Any]:
+        """
+        Start a queued execution.
+        
+        Returns:
+            The updated execution record
+        """
+        record = self.registry.get(execution_id)
+        if record is None:
+            raise ValueError(f"Execution {execution_id} not found")
+        if record["status"] != "queued":
+            raise ValueError(f"Execution {execution_id} is {record['status']}, not queued")
         
+        selected_runner = self._runner_for(record)
+        record["command_prefix"] = self.accountant.prepare(record) + self._env_prefix(record)
         try:
-            subprocess.run(tmux_cmd, check=True)
-        except subprocess.CalledProcessError as e:
-            raise RuntimeError(f"Failed to create tmux session: {e}")
-        
-        # Store execution info
-        execution_info = {
-            "execution_id": execution_id,
-            "task_id": task_id,
-            "session_name": session_name,
-            "log_file": str(log_file),
-            "started_at": datetime.utcnow().isoformat(),
-            "status": "running",
-            "script_path": str(script_path)
-        }
+            await selected_runner.start(record)
+        except Exception:
+            self.accountant.discard(record)
+            raise
         
-        self.executions[execution_id] = execution_info
+        execution_info = self.registry.update(
+            execution_id,
+            status="running",
+            started_at=datetime.utcnow().isoformat(),
+            pid=record.get("pid"),
+            resources=record.get("resources")
+        )
+        
+        # Broadcast progress, artifact and error lines as they are written
+        output_watcher.watch(
+            execution_id, record["task_id"], record["log_file"],
+            lambda: selected_runner.is_alive(self.registry.get(execution_id) or execution_info)
+        )
+        self._watch_completion(execution_info)
         
         return execution_info
     
-    async def get_execution_status(self, task_id: str) -> Dict[str, Any]:
-        """Get the current execution status of a task."""
-        session_name = self.get_tmux_session_name(task_id)
+    @staticmethod
+    def _env_prefix(record: Dict[str, Any]) -> List[str]:
+        """``env`` command that passes a matrix run its parameters."""
+        if not record.get("matrix_id"):
+            return []
+        env = {
+            **(record.get("params") or {}),
+            "TASKHUB_MATRIX_ID": record["matrix_id"],
+            "TASKHUB_MATRIX_INDEX": str(record.get("matrix_index")),
+        }
+        return ["env", *(f"{name}={value}" for name, value in env.items())]
+    
+    async def execute_task(
+        self,
+        task_id: str,
+        script_content: Optional[str] = None,
+        runner: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Execute a task immediately with the selected runner, bypassing the queue.
         
-        # Check if session exists
-        check_session = subprocess.run(
-            ["tmux", "has-session", "-t", session_name],
-            capture_output=True
+        Returns:
+            Execution information including session name and log file path
+        """
+        record = await self.prepare_execution(task_id, script_content, runner)
+        try:
+            return await self.start_execution(record["execution_id"])
+        except Exception as e:
+            await self.record_start_failure(record["execution_id"], e)
+            raise
+    
+    def add_completion_listener(self, listener: CompletionListener):
+        """Call ``listener`` with the final record of every execution that finishes."""
+        self._completion_listeners.append(listener)
+    
+    def _watch_completion(self, record: Dict[str, Any]) -> asyncio.Task:
+        task = self._completions.get(record["execution_id"])
+        if task is None:
+            task = self._track_completion(record["execution_id"], self._await_exit(record))
+        return task
+    
+    def _track_completion(self, execution_id: str, finish: Awaitable[Optional[Dict[str, Any]]]) -> asyncio.Task:
+        task = asyncio.create_task(finish)
+        self._completions[execution_id] = task
+        task.add_done_callback(lambda _: self._completions.pop(execution_id, None))
+        return task
+    
+    async def _await_exit(self, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        try:
+            exit_code = await self._runner_for(record).wait_for_exit(record)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error waiting for execution {record['execution_id']} to exit: {e}")
+            exit_code = None
+        return await self._record_completion(record, exit_code)
+    
+    async def _record_vanished(self, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Record an execution whose process ended while nothing was watching it."""
+        exit_code = self._runner_for(record).recorded_exit_code(record)
+        return await self._record_completion(record, exit_code)
+    
+    async def _record_completion(
+        self,
+        record: Dict[str, Any],
+        exit_code: Optional[int],
+        status: Optional[str] = None,
+        **event_fields: Any
+    ) -> Optional[Dict[str, Any]]:
+        """Store the outcome of a finished execution and announce it.
+        
+        The status follows from the exit code unless given explicitly.
+        """
+        execution_id = record["execution_id"]
+        current = self.registry.get(execution_id) or record
+        if status is None:
+            stopping = execution_id in self._stopping or current["status"] == "stopped"
+            status = "stopped" if stopping else completion_status(exit_code)
+        self._stopping.discard(execution_id)
+        
+        fields: Dict[str, Any] = {
+            "status": status,
+            "exit_code": exit_code,
+            "resources": self.accountant.collect(current)
+        }
+        if current.get("completed_at") is None:
+            fields["completed_at"] = datetime.utcnow().isoformat()
+        updated = self.registry.update(execution_id, **fields)
+        self._runner_for(record).cleanup(record)
+        
+        # End live log streams without waiting for their liveness check
+        log_follower.writer_exited(record["log_file"])
+        if current.get("matrix_id"):
+            event_fields.setdefault("matrix_id", current["matrix_id"])
+        await event_broadcaster.broadcast_execution_event(
+            task_id=record["task_id"],
+            event_type=status,
+            execution_id=execution_id,
+            exit_code=exit_code,
+            **event_fields
         )
+        for listener in self._completion_listeners:
+            try:
+                await listener(updated)
+            except Exception as e:
+                logger.error(f"Completion listener failed for execution {execution_id}: {e}")
+        return updated
+    
+    async def record_start_failure(self, execution_id: str, error: Exception) -> Optional[Dict[str, Any]]:
+        """Record an execution whose runner failed to start it."""
+        record = self.registry.get(execution_id)
+        if record is None:
+            return None
+        return await self._record_completion(record, None, status="failed", error=str(error))
+    
+    async def complete_from_cache(self, record: Dict[str, Any], inputs: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        Finish a queued execution from the result cache if its script and
+        inputs match a cached run.
         
-        is_running = check_session.returncode == 0
+        Otherwise the cache key is stored with the record, so the result is
+        cached when the execution completes.
         
-        # Find execution info
-        execution_info = None
-        for exec_id, info in self.executions.items():
-            if info["task_id"] == task_id:
-                execution_info = info.copy()
-                execution_info["is_running"] = is_running
-                if not is_running and info["status"] == "running":
-                    execution_info["status"] = "completed"
-                    execution_info["completed_at"] = datetime.utcnow().isoformat()
-                break
+        Args:
+            record: A queued execution record
+            inputs: Input files and directories declared by the task
+        
+        Returns:
+            The completed execution record, or None on a cache miss
+        """
+        key = await asyncio.to_thread(
+            self.cache.compute_key, record["script_path"], inputs, params=record.get("params")
+        )
+        entry = self.cache.lookup(key)
+        if entry is None:
+            self.registry.update(record["execution_id"], cache_key=key)
+            return None
         
+        await asyncio.to_thread(self.cache.restore, entry, record["log_file"])
+        now = datetime.utcnow().isoformat()
+        record = self.registry.update(
+            record["execution_id"],
+            cache_key=key,
+            cached=True,
+            cached_from=entry.execution_id,
+            artifacts=entry.artifacts,
+            started_at=now,
+            completed_at=now
+        )
+        return await self._record_completion(
+            record, entry.exit_code, cached=True, artifacts=entry.artifacts
+        )
+    
+    async def _store_in_cache(self, execution: Dict[str, Any]):
+        """Cache the result of a successful execution that opted in."""
+        if (
+            execution.get("cache_key")
+            and execution["status"] == "completed"
+            and execution.get("exit_code") == 0
+            and not execution.get("cached")
+        ):
+            await asyncio.to_thread(self.cache.store, execution["cache_key"], execution)
+    
+    async def wait_for_completion(self, execution_id: str) -> Optional[Dict[str, Any]]:
+        """Wait until a started execution finishes and return its final record."""
+        task = self._completions.get(execution_id)
+        if task is None:
+            record = self.registry.get(execution_id)
+            if record is None or record["status"] != "running":
+                return record
+            task = self._watch_completion(record)
+        return await asyncio.shield(task)
+    
+    def recover(self):
+        """Watch executions that were left running by a previous server process."""
+        for record in self.registry.active():
+            if record["status"] == "running":
+                self._watch_completion(record)
+    
+    def warm_up(self):
+        """Start filling the default runner's worker pool.
+
+        The other runners' pools fill once they are first used.
+        """
+        self.runners[self.default_runner].pool.start()
+    
+    def pool_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Size and hit ratio of each runner's worker pool."""
+        return {name: runner.pool.metrics() for name, runner in self.runners.items()}
+    
+    async def close(self):
+        """Stop watching for completions and shut down idle pooled workers.
+        Running executions keep running."""
+        tasks = list(self._completions.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for runner in self.runners.values():
+            await runner.pool.close()
+    
+    def get_execution_record(self, task_id: str, execution_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Get a specific execution of a task, or its latest one."""
+        if execution_id is None:
+            return self.registry.latest(task_id)
+        record = self.registry.get(execution_id)
+        if record is None or record["task_id"] != task_id:
+            return None
+        return record
+    
+    async def is_execution_active(self, execution_id: str) -> bool:
+        """Whether an execution is queued or its process is still running."""
+        record = self.registry.get(execution_id)
+        if record is None:
+            return False
+        if record["status"] == "queued":
+            return True
+        return record["status"] == "running" and await self._runner_for(record).is_alive(record)
+    
+    async def get_execution_status(self, task_id: str) -> Dict[str, Any]:
+        """Get the current execution status of a task."""
+        record = self.registry.latest(task_id)
+        if record is None:
+            is_running = await tmux_client.has_session(self.get_tmux_session_name(task_id))
+        else:
+            is_running = await self._runner_for(record).is_alive(record)
+        return await self._build_status(task_id, record, is_running)
+    
+    async def get_execution_statuses(self, task_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get the execution status of many tasks with a single tmux round trip."""
+        records = {task_id: self.registry.latest(task_id) for task_id in task_ids}
+        sessions = await tmux_client.list_sessions()
+        
+        statuses = {}
+        for task_id, record in records.items():
+            if record is None:
+                is_running = self.get_tmux_session_name(task_id) in sessions
+            elif record.get("runner", "tmux") == "tmux":
+                is_running = record["session_name"] in sessions
+            else:
+                is_running = await self._runner_for(record).is_alive(record)
+            statuses[task_id] = await self._build_status(task_id, record, is_running)
+        return statuses
+    
+    async def _build_status(self, task_id: str, execution_info: Optional[Dict[str, Any]], is_running: bool) -> Dict[str, Any]:
+        """Combine runner liveness with the stored execution record."""
         if execution_info is None:
             return {
                 "task_id": task_id,
@@ -137,71 +456,173 @@ echo "Task completed: $(date)"
                 "message": "No execution record found"
             }
         
+        if (not is_running and execution_info["status"] == "running"
+                and execution_info["execution_id"] not in self._completions):
+            # The session is gone and nothing is waiting for it, so record
+            # the execution as finished with the exit code it left behind
+            execution_info = await asyncio.shield(self._track_completion(
+                execution_info["execution_id"], self._record_vanished(execution_info)
+            ))
+        
+        if is_running and execution_info["status"] == "running":
+            resources = self.accountant.snapshot(execution_info)
+            if resources is not None:
+                execution_info["resources"] = resources
+        
+        execution_info["is_running"] = is_running
         return execution_info
     
-    async def get_execution_logs(self, task_id: str, tail: int = 100) -> List[str]:
-        """Get the execution logs for a task."""
-        # Find the latest log file for this task
+    def get_matrix_status(self, matrix_id: str) -> Optional[Dict[str, Any]]:
+        """Aggregate the runs of a matrix execution.
+        
+        Returns:
+            The matrix status with every run's record, or None if unknown
+        """
+        runs = self.registry.matrix(matrix_id)
+        if not runs:
+            return None
+        
+        counts: Dict[str, int] = {}
+        for run in runs:
+            counts[run["status"]] = counts.get(run["status"], 0) + 1
+        if counts.get("running") or counts.get("queued"):
+            status = "running" if counts.get("running") or len(counts) > 1 else "queued"
+        elif counts.get("failed"):
+            status = "failed"
+        elif counts.get("stopped"):
+            status = "stopped"
+        else:
+            status = "completed"
+        
+        started = [run["started_at"] for run in runs if run.get("started_at")]
+        completed = [run["completed_at"] for run in runs if run.get("completed_at")]
+        finished = status not in ("queued", "running")
+        wall_seconds = None
+        if finished and started and completed:
+            wall_seconds = round(
+                (datetime.fromisoformat(max(completed)) - datetime.fromisoformat(min(started))).total_seconds(), 3
+            )
+        return {
+            "matrix_id": matrix_id,
+            "task_id": runs[0]["task_id"],
+            "status": status,
+            "runs": len(runs),
+            "counts": counts,
+            "started_at": min(started) if started else None,
+            "completed_at": max(completed) if finished and completed else None,
+            "wall_seconds": wall_seconds,
+            "failed_params": [run.get("params") for run in runs if run["status"] == "failed"],
+            "executions": sorted(runs, key=lambda run: run.get("matrix_index") or 0)
+        }
+    
+    def get_execution_history(self, task_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get past executions of a task, newest first."""
+        return self.registry.history(task_id, limit)
+    
+    def _log_path(self, task_id: str, execution_id: Optional[str] = None) -> Optional[Path]:
+        """Find the log file of an execution, or of the latest one."""
+        record = self.get_execution_record(task_id, execution_id)
+        if record is not None:
+            return Path(record["log_file"])
+        if execution_id is not None:
+            return None
+        # Logs written before executions were recorded
         log_files = list(self.logs_dir.glob(f"{task_id}_*.log"))
+        return max(log_files, key=lambda p: p.stat().st_mtime) if log_files else None
+    
+    async def read_execution_log(
+        self,
+        task_id: str,
+        tail: int = 100,
+        offset: Optional[int] = None,
+        limit: Optional[int] = None,
+        before: Optional[int] = None,
+        after: Optional[int] = None,
+        execution_id: Optional[str] = None
+    ) -> Optional[log_reader.LogPage]:
+        """
+        Read part of an execution log with bounded memory.
         
-        if not log_files:
-            return ["No logs found for this task"]
+        Without a cursor the last ``tail`` lines are returned. ``after`` and
+        ``before`` are byte cursors from a previous page, and ``offset`` is any
+        byte offset, moved forward to the next line start.
+        
+        Args:
+            task_id: The task whose log to read
+            tail: Number of lines from the end when no cursor is given
+            offset: Byte offset to read forward from
+            limit: Number of lines per page (defaults to ``tail``)
+            before: Read the lines that end at this cursor
+            after: Read the lines that start at this cursor
+            execution_id: Read this execution's log instead of the latest one
         
-        # Get the most recent log file
-        latest_log = max(log_files, key=lambda p: p.stat().st_mtime)
+        Returns:
+            The page that was read, or None if there is no log
+        """
+        log_path = self._log_path(task_id, execution_id)
+        if log_path is None or not log_segments.log_exists(log_path):
+            return None
         
-        # Read the log file
+        count = limit if limit is not None else tail
+        if after is not None:
+            return await asyncio.to_thread(log_reader.read_after, str(log_path), after, count)
+        if before is not None:
+            return await asyncio.to_thread(log_reader.read_before, str(log_path), before, count)
+        if offset is not None:
+            return await asyncio.to_thread(log_reader.read_from_offset, str(log_path), offset, count)
+        if count <= 0:
+            # Everything from the start, up to the page size cap
+            return await asyncio.to_thread(log_reader.read_after, str(log_path), 0, sys.maxsize)
+        return await asyncio.to_thread(log_reader.tail, str(log_path), count)
+    
+    async def get_execution_logs(self, task_id: str, tail: int = 100) -> List[str]:
+        """Get the last lines of the latest execution log for a task."""
         try:
-            with open(latest_log, 'r') as f:
-                lines = f.readlines()
-                if tail > 0:
-                    lines = lines[-tail:]
-                return [line.rstrip() for line in lines]
+            page = await self.read_execution_log(task_id, tail)
         except Exception as e:
             return [f"Error reading log file: {e}"]
+        if page is None:
+            return ["No logs found for this task"]
+        return page.lines
     
     async def stop_task_execution(self, task_id: str) -> bool:
         """Stop the execution of a task."""
-        session_name = self.get_tmux_session_name(task_id)
+        stopped = False
+        for record in self.registry.active(task_id):
+            if record["status"] == "queued":
+                # Never started; the scheduler drops it when it comes up
+                stopped = True
+                await self._record_completion(record, None, status="stopped")
+            else:
+                self._stopping.add(record["execution_id"])
+                if not await self._runner_for(record).stop(record):
+                    self._stopping.discard(record["execution_id"])
+                    continue
+                if record["execution_id"] not in self._completions:
+                    self._stopping.discard(record["execution_id"])
+                stopped = True
+                self.registry.update(
+                    record["execution_id"],
+                    status="stopped",
+                    completed_at=datetime.utcnow().isoformat()
+                )
         
-        # Kill the tmux session
-        result = subprocess.run(
-            ["tmux", "kill-session", "-t", session_name],
-            capture_output=True
-        )
-        
-        if result.returncode == 0:
-            # Update execution status
-            for exec_id, info in self.executions.items():
-                if info["task_id"] == task_id and info["status"] == "running":
-                    info["status"] = "stopped"
-                    info["stopped_at"] = datetime.utcnow().isoformat()
-            return True
+        # Finished tmux runs linger at the "Press enter" prompt, and sessions
+        # started before executions were recorded have no record at all
+        latest = self.registry.latest(task_id)
+        if not stopped and (latest is None or latest.get("runner", "tmux") == "tmux"):
+            session_name = latest["session_name"] if latest else self.get_tmux_session_name(task_id)
+            stopped = await tmux_client.kill_session(session_name)
         
-        return False
+        return stopped
     
     async def attach_to_task(self, task_id: str) -> str:
         """Get the command to attach to a task's tmux session."""
-        session_name = self.get_tmux_session_name(task_id)
-        
-        # Check if session exists
-        check_session = subprocess.run(
-            ["tmux", "has-session", "-t", session_name],
-            capture_output=True
-        )
-        
-        if check_session.returncode != 0:
-            raise ValueError(f"No active session found for task {task_id}")
-        
-        return f"tmux attach-session -t {session_name}"
+        record = self.registry.latest(task_id)
+        if record is None:
+            record = {"task_id": task_id, "session_name": self.get_tmux_session_name(task_id)}
+        return await self._runner_for(record).attach_command(record)
     
-    def cleanup_old_logs(self, days: int = 7):
-        """Clean up log files older than specified days."""
-        import time
-        
-        current_time = time.time()
-        cutoff_time = current_time - (days * 24 * 60 * 60)
-        
-        for log_file in self.logs_dir.glob("*.log"):
-            if log_file.stat().st_mtime < cutoff_time:
-                log_file.unlink()
\ No newline at end of file
+    def cleanup_old_logs(self, days: int = 7) -> int:
+        """Delete logs of finished executions older than specified days."""
+        return LogLifecycleManager(self.logs_dir, self.registry).cleanup_older_than(days)
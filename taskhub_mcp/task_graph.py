@@ -0,0 +1,139 @@
+"""Dependency graph of tasks.
+
+Tasks list their prerequisites under ``depends_on`` in their frontmatter. A
+reference is a task ID, or the task's file path relative to the tasks
+directory, with or without the ``.md`` extension.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+
+class TaskGraph:
+    """Resolved ``depends_on`` edges between indexed tasks."""
+
+    def __init__(self, tasks: Iterable[Dict[str, Any]]):
+        self.tasks: Dict[str, Dict[str, Any]] = {task["id"]: task for task in tasks}
+        aliases: Dict[str, str] = {}
+        for task_id, task in self.tasks.items():
+            file_path = task.get("file_path") or ""
+            aliases[file_path] = task_id
+            if file_path.endswith(".md"):
+                aliases[file_path[:-len(".md")]] = task_id
+        aliases.update({task_id: task_id for task_id in self.tasks})
+
+        self.dependencies: Dict[str, List[str]] = {}
+        self.unknown: Dict[str, List[str]] = {}
+        for task_id, task in self.tasks.items():
+            resolved = []
+            for ref in task.get("depends_on") or []:
+                dependency = aliases.get(str(ref))
+                if dependency is None:
+                    self.unknown.setdefault(task_id, []).append(str(ref))
+                elif dependency not in resolved:
+                    resolved.append(dependency)
+            self.dependencies[task_id] = resolved
+
+    def dependents(self) -> Dict[str, List[str]]:
+        """Tasks that depend on each task."""
+        result: Dict[str, List[str]] = {task_id: [] for task_id in self.tasks}
+        for task_id, dependencies in self.dependencies.items():
+            for dependency in dependencies:
+                result[dependency].append(task_id)
+        return result
+
+    def find_cycle(self) -> Optional[List[str]]:
+        """Return one dependency cycle as a list of task IDs, or None."""
+        state: Dict[str, int] = {}  # 1: on the current path, 2: finished
+        for root in self.tasks:
+            if root in state:
+                continue
+            path: List[str] = [root]
+            stack: List[Tuple[str, int]] = [(root, 0)]
+            state[root] = 1
+            while stack:
+                node, index = stack[-1]
+                dependencies = self.dependencies[node]
+                if index == len(dependencies):
+                    stack.pop()
+                    path.pop()
+                    state[node] = 2
+                    continue
+                stack[-1] = (node, index + 1)
+                dependency = dependencies[index]
+                if state.get(dependency) == 1:
+                    return path[path.index(dependency):] + [dependency]
+                if dependency not in state:
+                    state[dependency] = 1
+                    path.append(dependency)
+                    stack.append((dependency, 0))
+        return None
+
+    def validate(self):
+        """Raise ValueError for unknown references or a dependency cycle."""
+        if self.unknown:
+            details = "; ".join(f"{task_id}: {', '.join(refs)}" for task_id, refs in self.unknown.items())
+            raise ValueError(f"Unknown task dependencies: {details}")
+        cycle = self.find_cycle()
+        if cycle is not None:
+            raise ValueError(f"Dependency cycle: {' -> '.join(cycle)}")
+
+    def closure(self, task_ids: Iterable[str], skip: Optional[Set[str]] = None) -> Set[str]:
+        """The given tasks plus everything they transitively depend on.
+
+        Args:
+            task_ids: Tasks to start from
+            skip: Tasks not to include or descend into (such as finished ones)
+        """
+        skip = skip or set()
+        result: Set[str] = set()
+        stack = [task_id for task_id in task_ids if task_id not in skip]
+        while stack:
+            task_id = stack.pop()
+            if task_id in result:
+                continue
+            result.add(task_id)
+            stack.extend(d for d in self.dependencies.get(task_id, []) if d not in skip and d not in result)
+        return result
+
+    def topological_order(self, task_ids: Iterable[str]) -> List[str]:
+        """Order a cycle-free subset of tasks so dependencies come first."""
+        subset = set(task_ids)
+        order: List[str] = []
+        remaining = {t: sum(1 for d in self.dependencies[t] if d in subset) for t in subset}
+        dependents = self.dependents()
+        ready = sorted(t for t, count in remaining.items() if count == 0)
+        while ready:
+            task_id = ready.pop(0)
+            order.append(task_id)
+            for dependent in dependents[task_id]:
+                if dependent in remaining:
+                    remaining[dependent] -= 1
+                    if remaining[dependent] == 0:
+                        ready.append(dependent)
+        return order
+
+    def critical_path(self, durations: Dict[str, float]) -> Tuple[List[str], float]:
+        """Longest chain of dependent tasks by duration.
+
+        Args:
+            durations: Seconds per task; only these tasks are considered
+
+        Returns:
+            The chain's task IDs, first to last, and its total duration
+        """
+        finish: Dict[str, float] = {}
+        previous: Dict[str, Optional[str]] = {}
+        for task_id in self.topological_order(durations):
+            before = [d for d in self.dependencies[task_id] if d in finish]
+            longest = max(before, key=lambda d: finish[d], default=None)
+            previous[task_id] = longest
+            finish[task_id] = durations[task_id] + (finish[longest] if longest else 0.0)
+        if not finish:
+            return [], 0.0
+        last: Optional[str] = max(finish, key=lambda t: finish[t])
+        total = finish[last]
+        path = []
+        while last is not None:
+            path.append(last)
+            last = previous[last]
+        return path[::-1], total
@@ -0,0 +1,133 @@
+"""Leases on claimed tasks.
+
+A task claimed with a lease stays with its agent only while the agent sends
+heartbeats. When a lease runs out, the task goes back to todo so another
+agent can claim it, instead of staying inprogress after its agent died.
+
+Leases live in memory, in a ``TimerWheel`` ticked once per
+``LEASE_TICK`` seconds, so a heartbeat only moves one timer and a tick
+only touches the leases that expire in it. The task record keeps the lease
+TTL, so after a restart every leased inprogress task gets a fresh lease of
+that length and its agent has the usual time to send its next heartbeat.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+from .timer_wheel import TimerWheel
+
+logger = logging.getLogger(__name__)
+
+# Seconds per wheel tick; leases expire at most this late
+LEASE_TICK = 1.0
+
+
+@dataclass
+class Lease:
+    task_id: str
+    assignee: str
+    ttl: int
+    # time.monotonic() deadline
+    expires: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        remaining = max(0.0, self.expires - time.monotonic())
+        return {
+            "task_id": self.task_id,
+            "assignee": self.assignee,
+            "lease_ttl": self.ttl,
+            "lease_expires_at": (datetime.now() + timedelta(seconds=remaining)).isoformat(),
+        }
+
+
+class LeaseManager:
+    """Tracks task leases and returns expired tasks to todo."""
+
+    def __init__(self, on_expire: Callable[[str, str], Awaitable[Any]], tick: float = LEASE_TICK):
+        self.on_expire = on_expire
+        self.tick = tick
+        self._leases: Dict[str, Lease] = {}
+        self._wheel = TimerWheel(time.monotonic(), tick=tick)
+        self._task: Optional[asyncio.Task] = None
+        self.granted = 0
+        self.renewed = 0
+        self.expired = 0
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def recover(self, tasks: Iterable[Dict[str, Any]]) -> int:
+        """Give a fresh lease to every leased task still in progress."""
+        count = 0
+        for task in tasks:
+            if task.get("status") == "inprogress" and task.get("lease_ttl") and task.get("assignee"):
+                self.grant(task["id"], task["assignee"], task["lease_ttl"])
+                count += 1
+        if count:
+            logger.info(f"Restored {count} task leases")
+        return count
+
+    def get(self, task_id: str) -> Optional[Lease]:
+        return self._leases.get(task_id)
+
+    def grant(self, task_id: str, assignee: str, ttl: int) -> Lease:
+        """Lease a task to ``assignee`` for ``ttl`` seconds, replacing any lease it had."""
+        lease = Lease(task_id, assignee, ttl, time.monotonic() + ttl)
+        self._leases[task_id] = lease
+        self._wheel.schedule(task_id, lease.expires)
+        self.granted += 1
+        return lease
+
+    def renew(self, task_id: str, assignee: str, ttl: Optional[int] = None) -> Lease:
+        """Extend the lease of ``assignee`` on a task by its TTL (or a new one).
+
+        Raises:
+            KeyError: If the task has no lease
+            ValueError: If the lease belongs to another assignee
+        """
+        lease = self._leases[task_id]
+        if lease.assignee != assignee:
+            raise ValueError(f"Task is leased to {lease.assignee}")
+        if ttl is not None:
+            lease.ttl = ttl
+        lease.expires = time.monotonic() + lease.ttl
+        self._wheel.schedule(task_id, lease.expires)
+        self.renewed += 1
+        return lease
+
+    def release(self, task_id: str) -> Optional[Lease]:
+        """Drop a task's lease, e.g. once its status moved on from inprogress."""
+        self._wheel.cancel(task_id)
+        return self._leases.pop(task_id, None)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.tick)
+            for task_id in self._wheel.advance(time.monotonic()):
+                lease = self._leases.pop(task_id, None)
+                if lease is None:
+                    continue
+                self.expired += 1
+                try:
+                    await self.on_expire(task_id, lease.assignee)
+                except Exception as e:
+                    logger.warning(f"Could not expire lease on task {task_id}: {e}")
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "active": len(self._leases),
+            "granted": self.granted,
+            "renewed": self.renewed,
+            "expired": self.expired,
+        }
@@ -0,0 +1,174 @@
+"""Work queue of todo tasks for agents that claim their next task.
+
+Listing the todo tasks and then setting one to inprogress races when many
+agents do it at once: two of them pick the same task. ``ClaimQueue.claim``
+picks and updates the task in one step instead. Todo tasks are kept in a
+heap ordered by priority (high, medium, low, unset) and then by age, so a
+claim pops the next eligible task without reading the whole list. A task is
+eligible when it is unassigned or assigned to the claimer, carries every
+requested tag and has all its dependencies done.
+
+Claims hold a thread lock and an ``flock`` on a lock file next to the
+database while they check and update the task, so no two claims get the
+same task, even from different server processes. The heap is rebuilt from
+the database whenever its file was changed by anything other than a claim
+or a release.
+"""
+
+import fcntl
+import heapq
+import itertools
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from tinydb import Query, TinyDB
+
+from .config import DB_PATH
+from .task_graph import TaskGraph
+
+# Heap order of priorities; unset sorts after low
+PRIORITY_RANK = {"high": 0, "medium": 1, "low": 2}
+UNSET_PRIORITY_RANK = len(PRIORITY_RANK)
+
+
+class ClaimQueue:
+    """Hands out todo tasks, one claimer per task."""
+
+    def __init__(self, db_path: Path = DB_PATH):
+        self.db_path = Path(db_path)
+        self.lock_path = self.db_path.with_name(self.db_path.name + ".lock")
+        self._lock = threading.Lock()
+        self._heap: List[Tuple[int, str, int, str]] = []
+        self._todo: Dict[str, Dict[str, Any]] = {}
+        self._dependencies: Dict[str, List[str]] = {}
+        self._unknown: Dict[str, List[str]] = {}
+        self._done: Set[str] = set()
+        self._loaded_stamp: Optional[Tuple[int, int]] = None
+        self._seq = itertools.count()
+        self.claimed = 0
+        self.rebuilds = 0
+
+    def _stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = self.db_path.stat()
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _refresh(self, db: TinyDB):
+        """Rebuild the heap if the database changed since it was last read."""
+        stamp = self._stamp()
+        if self._loaded_stamp is not None and stamp == self._loaded_stamp:
+            return
+        tasks = db.all()
+        graph = TaskGraph(tasks)
+        self._dependencies = graph.dependencies
+        self._unknown = graph.unknown
+        self._done = {t["id"] for t in tasks if t.get("status") == "done"}
+        self._todo = {t["id"]: dict(t) for t in tasks if t.get("status") == "todo"}
+        self._heap = [self._entry(t) for t in self._todo.values()]
+        heapq.heapify(self._heap)
+        self._loaded_stamp = stamp
+        self.rebuilds += 1
+
+    def _entry(self, task: Dict[str, Any]) -> Tuple[int, str, int, str]:
+        rank = PRIORITY_RANK.get(task.get("priority"), UNSET_PRIORITY_RANK)
+        return rank, task.get("updated_at") or "", next(self._seq), task["id"]
+
+    def _eligible(self, task: Dict[str, Any], assignee: str, tags: Optional[List[str]]) -> bool:
+        owner = task.get("assignee")
+        if owner and owner != assignee:
+            return False
+        if tags and not set(tags) <= set(task.get("tags") or []):
+            return False
+        if self._unknown.get(task["id"]):
+            return False
+        return all(d in self._done for d in self._dependencies.get(task["id"], []))
+
+    def claim(
+        self,
+        assignee: str,
+        tags: Optional[List[str]] = None,
+        lease_ttl: Optional[int] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Set the next eligible todo task to inprogress for ``assignee``.
+
+        Args:
+            assignee: Name of the claiming agent, stored as the task's assignee
+            tags: Only claim tasks that carry all of these tags
+            lease_ttl: Lease length in seconds, stored with the task
+
+        Returns:
+            The claimed task, or None if no todo task is eligible
+        """
+        with self._locked() as db:
+            return self._claim(db, assignee, tags, lease_ttl)
+
+    def release(self, task_id: str, assignee: str) -> Optional[Dict[str, Any]]:
+        """Return a task that ``assignee`` still has in progress to todo.
+
+        Returns:
+            The released task, or None if it moved on or belongs to someone else
+        """
+        with self._locked() as db:
+            self._refresh(db)
+            task = db.get(Query().id == task_id)
+            if task is None or task.get("status") != "inprogress" or task.get("assignee") != assignee:
+                return None
+            task = dict(task)
+            update = {"status": "todo", "assignee": None, "lease_ttl": None, "updated_at": datetime.now().isoformat()}
+            db.update(update, Query().id == task_id)
+            self._loaded_stamp = self._stamp()
+            task.update(update)
+            self._todo[task_id] = task
+            heapq.heappush(self._heap, self._entry(task))
+            return task
+
+    @contextmanager
+    def _locked(self) -> Iterator[TinyDB]:
+        with self._lock, open(self.lock_path, "a") as lock_file:
+            # Released when the file is closed
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            with TinyDB(str(self.db_path)) as db:
+                yield db
+
+    def _claim(
+        self,
+        db: TinyDB,
+        assignee: str,
+        tags: Optional[List[str]],
+        lease_ttl: Optional[int],
+    ) -> Optional[Dict[str, Any]]:
+        self._refresh(db)
+
+        task = None
+        skipped = []
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            candidate = self._todo.get(entry[-1])
+            if candidate is None:
+                continue
+            if self._eligible(candidate, assignee, tags):
+                task = candidate
+                break
+            skipped.append(entry)
+        for entry in skipped:
+            heapq.heappush(self._heap, entry)
+        if task is None:
+            return None
+
+        del self._todo[task["id"]]
+        update = {
+            "status": "inprogress",
+            "assignee": assignee,
+            "lease_ttl": lease_ttl or None,
+            "updated_at": datetime.now().isoformat(),
+        }
+        db.update(update, Query().id == task["id"])
+        self._loaded_stamp = self._stamp()
+        self.claimed += 1
+        task.update(update)
+        return task
@@ -0,0 +1,168 @@
+"""Board statistics kept up to date as tasks change.
+
+``TaskStats`` counts tasks per status, priority and assignee. It listens to
+the ``task_updated`` events of the event broadcaster and moves one task
+between counters per event, using the status, priority and assignee it last
+saw for that task, so reading the statistics never scans the tasks.
+
+An event only carries what changed: a missing or null priority or assignee
+means it stayed the same, except that an event with ``previous_assignee``
+(a lease that expired) leaves the task unassigned. A background check
+recounts the tasks from the database every ``TASKHUB_TASK_STATS_RECONCILE_INTERVAL``
+seconds and after a sync, and replaces the counters if they drifted, e.g.
+because another tool edited the database.
+"""
+
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .config import TASK_STATS_RECONCILE_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+STATUSES = ("todo", "inprogress", "review", "done")
+PRIORITIES = ("high", "medium", "low")
+# Counter keys for tasks without a priority or assignee
+NO_PRIORITY = "none"
+UNASSIGNED = "unassigned"
+
+# status, priority, assignee
+TaskKey = Tuple[str, Optional[str], Optional[str]]
+
+
+def count_tasks(tasks: Iterable[Dict[str, Any]]) -> Tuple[Dict[str, TaskKey], Counter, Counter, Counter]:
+    """Count tasks per status, priority and assignee in one pass."""
+    keys: Dict[str, TaskKey] = {}
+    by_status: Counter = Counter()
+    by_priority: Counter = Counter()
+    by_assignee: Counter = Counter()
+    for task in tasks:
+        key = (task.get("status") or "todo", task.get("priority"), task.get("assignee"))
+        keys[task["id"]] = key
+        by_status[key[0]] += 1
+        by_priority[key[1] or NO_PRIORITY] += 1
+        by_assignee[key[2] or UNASSIGNED] += 1
+    return keys, by_status, by_priority, by_assignee
+
+
+class TaskStats:
+    """Counters of tasks per status, priority and assignee."""
+
+    def __init__(
+        self,
+        load_tasks: Callable[[], List[Dict[str, Any]]],
+        interval: float = TASK_STATS_RECONCILE_INTERVAL,
+    ):
+        self.load_tasks = load_tasks
+        self.interval = interval
+        self._keys: Dict[str, TaskKey] = {}
+        self._by_status: Counter = Counter()
+        self._by_priority: Counter = Counter()
+        self._by_assignee: Counter = Counter()
+        # Events applied so far; a recount is only used if none arrived while it ran
+        self._applied = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.reconciled_at: Optional[str] = None
+        self.reconciles = 0
+        self.corrections = 0
+
+    def load(self):
+        """Count the tasks in the database, replacing the counters."""
+        self._replace(count_tasks(self.load_tasks()))
+
+    async def start(self):
+        if self.interval > 0 and (self._task is None or self._task.done()):
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def on_event(self, event: Dict[str, Any]):
+        """Event broadcaster listener."""
+        name = event.get("event")
+        if name == "task_updated":
+            data = event.get("data") or {}
+            if data.get("task_id") and data.get("status"):
+                self.apply(data)
+        elif name == "tasks_synced" and self._wakeup is not None:
+            self._wakeup.set()
+
+    def apply(self, change: Dict[str, Any]):
+        """Move a task between counters according to a task_updated event."""
+        task_id = change["task_id"]
+        old = self._keys.get(task_id)
+        priority = change.get("priority") or (old[1] if old else None)
+        if "previous_assignee" in change:
+            assignee = None
+        else:
+            assignee = change.get("assignee") or (old[2] if old else None)
+        new = (change["status"], priority, assignee)
+        self._applied += 1
+        if new == old:
+            return
+        if old is not None:
+            self._count(old, -1)
+        self._count(new, 1)
+        self._keys[task_id] = new
+
+    def _count(self, key: TaskKey, delta: int):
+        for counter, value in (
+            (self._by_status, key[0]),
+            (self._by_priority, key[1] or NO_PRIORITY),
+            (self._by_assignee, key[2] or UNASSIGNED),
+        ):
+            counter[value] += delta
+            if not counter[value]:
+                del counter[value]
+
+    def _replace(self, counted: Tuple[Dict[str, TaskKey], Counter, Counter, Counter]) -> bool:
+        keys, by_status, by_priority, by_assignee = counted
+        drifted = (by_status, by_priority, by_assignee) != (self._by_status, self._by_priority, self._by_assignee)
+        self._keys, self._by_status, self._by_priority, self._by_assignee = counted
+        self.reconciled_at = datetime.now().isoformat()
+        self.reconciles += 1
+        return drifted
+
+    async def reconcile(self) -> bool:
+        """Recount the tasks from the database; True if the counters had drifted."""
+        applied = self._applied
+        counted = count_tasks(await asyncio.to_thread(self.load_tasks))
+        if self._applied != applied:
+            # Tasks changed during the recount; try again next time
+            return False
+        drifted = self._replace(counted)
+        if drifted:
+            self.corrections += 1
+            logger.info("Task statistics drifted from the database and were recounted")
+        return drifted
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logger.warning(f"Could not reconcile task statistics: {e}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """The current counts, without reading the tasks."""
+        return {
+            "total": len(self._keys),
+            "by_status": {**dict.fromkeys(STATUSES, 0), **self._by_status},
+            "by_priority": {**dict.fromkeys(PRIORITIES + (NO_PRIORITY,), 0), **self._by_priority},
+            "by_assignee": dict(self._by_assignee),
+            "reconciled_at": self.reconciled_at,
+            "corrections": self.corrections,
+        }
@@ -0,0 +1,88 @@
+"""Hierarchical timer wheel for many timers with coarse deadlines.
+
+Time is counted in ticks. Level 0 has one slot per tick for the next
+``slots`` ticks; each higher level has slots ``slots`` times as wide. A
+timer goes into the lowest level whose range covers its deadline and moves
+down a level when the wheel reaches its slot, so scheduling, cancelling and
+advancing by one tick cost O(1), however many timers are pending.
+"""
+
+import math
+from typing import Dict, Hashable, List, Set, Tuple
+
+
+class TimerWheel:
+    """Timers keyed by any hashable; each key has at most one deadline."""
+
+    def __init__(self, now: float, tick: float = 1.0, slots: int = 64, levels: int = 4):
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+        self._current = math.floor(now / tick)
+        self._wheels: List[List[Set[Hashable]]] = [[set() for _ in range(slots)] for _ in range(levels)]
+        # key -> (level, slot, deadline tick)
+        self._where: Dict[Hashable, Tuple[int, int, int]] = {}
+        self._due: Set[Hashable] = set()
+
+    def __len__(self) -> int:
+        return len(self._where) + len(self._due)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._where or key in self._due
+
+    def schedule(self, key: Hashable, deadline: float):
+        """Fire ``key`` once the wheel passes ``deadline``, replacing its previous deadline."""
+        self.cancel(key)
+        self._place(key, math.ceil(deadline / self.tick))
+
+    def cancel(self, key: Hashable) -> bool:
+        """Drop the timer of ``key``; False if it had none."""
+        self._due.discard(key)
+        where = self._where.pop(key, None)
+        if where is None:
+            return False
+        level, slot, _ = where
+        self._wheels[level][slot].discard(key)
+        return True
+
+    def _place(self, key: Hashable, deadline: int):
+        delta = deadline - self._current
+        if delta <= 0:
+            self._due.add(key)
+            return
+        level = 0
+        while level < self.levels - 1 and delta >= self.slots ** (level + 1):
+            level += 1
+        # Beyond the top level's range: park in its farthest slot and place again from there
+        at = min(deadline, self._current + self.slots ** self.levels - 1)
+        slot = (at // self.slots ** level) % self.slots
+        self._wheels[level][slot].add(key)
+        self._where[key] = (level, slot, deadline)
+
+    def advance(self, now: float) -> List[Hashable]:
+        """Move the wheel to ``now`` and return the keys whose deadline passed."""
+        expired = list(self._due)
+        self._due.clear()
+        target = math.floor(now / self.tick)
+        while self._current < target:
+            self._current += 1
+            # Higher levels first, so their timers can land in the slots cascaded next
+            for level in range(self.levels - 1, 0, -1):
+                width = self.slots ** level
+                if self._current % width == 0:
+                    self._cascade(level, (self._current // width) % self.slots)
+            slot = self._wheels[0][self._current % self.slots]
+            for key in slot:
+                del self._where[key]
+            expired.extend(slot)
+            slot.clear()
+            expired.extend(self._due)
+            self._due.clear()
+        return expired
+
+    def _cascade(self, level: int, slot: int):
+        keys = self._wheels[level][slot]
+        self._wheels[level][slot] = set()
+        for key in keys:
+            _, _, deadline = self._where.pop(key)
+            self._place(key, deadline)
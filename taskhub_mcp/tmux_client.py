@@ -0,0 +1,209 @@
+"""Asynchronous tmux access for the task executor.
+
+Commands are multiplexed over one persistent control-mode connection
+(``tmux -C``) instead of forking a ``tmux`` process per call. Replies come
+back as ``%begin`` / ``%end`` (or ``%error``) blocks in the order the commands
+were sent. If control mode cannot be started, or a command has an argument
+with a line break, the command runs in its own
+``asyncio.create_subprocess_exec`` call, which still never blocks the
+event loop.
+"""
+
+import asyncio
+import logging
+import os
+from collections import deque
+from typing import Deque, List, Optional, Set, Tuple
+
+from .config import TMUX_CONTROL_MODE
+
+logger = logging.getLogger(__name__)
+
+# Sessions created for tasks start with this prefix; the control session
+# deliberately does not, so it never shows up as a task
+TASK_SESSION_PREFIX = "taskhub_"
+CONTROL_SESSION_PREFIX = "taskhubctl_"
+
+
+class TmuxError(RuntimeError):
+    """Raised when a tmux command fails."""
+
+
+def quote_argument(arg: str) -> str:
+    """Quote an argument for the tmux command parser.
+
+    Line breaks are not escaped; commands with them must not go through
+    control mode.
+    """
+    escaped = arg.replace("\\", "\\\\").replace('"', '\\"').replace("$", "\\$")
+    return f'"{escaped}"'
+
+
+class TmuxClient:
+    """Runs tmux commands without blocking the event loop."""
+
+    def __init__(self, control_mode: bool = TMUX_CONTROL_MODE, socket_name: Optional[str] = None):
+        self.control_mode = control_mode
+        # ``tmux -L``: a separate server instead of the default one
+        self._tmux = ("tmux", "-L", socket_name) if socket_name else ("tmux",)
+        self._proc: Optional[asyncio.subprocess.Process] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: Deque[asyncio.Future] = deque()
+        self._start_lock: Optional[asyncio.Lock] = None
+
+    @property
+    def session_name(self) -> str:
+        return f"{CONTROL_SESSION_PREFIX}{os.getpid()}"
+
+    async def _ensure_control(self) -> bool:
+        """Start the control-mode connection if needed.
+
+        Returns:
+            True if commands can be sent over control mode
+        """
+        if not self.control_mode:
+            return False
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # A new event loop (e.g. after a reload) cannot use the old pipes
+            self._proc = None
+            self._reader = None
+            self._pending = deque()
+            self._start_lock = asyncio.Lock()
+            self._loop = loop
+        if self._proc is not None and self._proc.returncode is None:
+            return True
+
+        async with self._start_lock:
+            if self._proc is not None and self._proc.returncode is None:
+                return True
+            try:
+                self._proc = await asyncio.create_subprocess_exec(
+                    *self._tmux, "-C", "new-session", "-A", "-s", self.session_name,
+                    "exec tail -f /dev/null",
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.DEVNULL,
+                )
+            except OSError as e:
+                logger.warning(f"tmux control mode unavailable, using subprocesses: {e}")
+                self.control_mode = False
+                return False
+            self._reader = asyncio.create_task(self._read_replies(self._proc))
+            return True
+
+    async def _read_replies(self, proc: asyncio.subprocess.Process):
+        block: Optional[List[str]] = None
+        block_is_reply = False
+        try:
+            while True:
+                raw = await proc.stdout.readline()
+                if not raw:
+                    break
+                line = raw.decode("utf-8", errors="replace").rstrip("\n")
+
+                if block is not None:
+                    if line.startswith(("%end ", "%error ")):
+                        if block_is_reply and self._pending:
+                            future = self._pending.popleft()
+                            if not future.done():
+                                future.set_result((line.startswith("%end "), block))
+                        block = None
+                    else:
+                        block.append(line)
+                elif line.startswith("%begin "):
+                    # Flag bit 1 marks replies to commands sent by this client;
+                    # other blocks (e.g. the initial new-session) are skipped
+                    parts = line.split()
+                    block_is_reply = len(parts) >= 4 and int(parts[3]) & 1 == 1
+                    block = []
+                elif line.startswith("%exit"):
+                    break
+                # Other notifications (%output, %session-changed, ...) are ignored
+        finally:
+            while self._pending:
+                future = self._pending.popleft()
+                if not future.done():
+                    future.set_exception(TmuxError("tmux control connection closed"))
+
+    async def run(self, *args: str) -> Tuple[bool, List[str]]:
+        """Run a tmux command.
+
+        Returns:
+            Whether the command succeeded, and its output lines
+        """
+        # Control mode reads one command per line, so an argument with a line
+        # break would be split into several commands and desync the replies
+        if not any("\n" in a or "\r" in a for a in args) and await self._ensure_control():
+            future = asyncio.get_running_loop().create_future()
+            self._pending.append(future)
+            try:
+                self._proc.stdin.write((" ".join(quote_argument(a) for a in args) + "\n").encode())
+                await self._proc.stdin.drain()
+                return await future
+            except (ConnectionError, TmuxError) as e:
+                logger.warning(f"tmux control connection failed, retrying with subprocess: {e}")
+                if future in self._pending:
+                    self._pending.remove(future)
+
+        proc = await asyncio.create_subprocess_exec(
+            *self._tmux, *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        stdout, stderr = await proc.communicate()
+        output = stdout if proc.returncode == 0 else stderr
+        return proc.returncode == 0, output.decode("utf-8", errors="replace").splitlines()
+
+    async def has_session(self, session_name: str) -> bool:
+        """Check whether a session exists."""
+        ok, _ = await self.run("has-session", "-t", f"={session_name}")
+        return ok
+
+    async def list_sessions(self) -> Set[str]:
+        """Return the names of all sessions in one round trip."""
+        ok, lines = await self.run("list-sessions", "-F", "#{session_name}")
+        return set(lines) if ok else set()
+
+    async def new_session(self, session_name: str, command: str):
+        """Create a detached session running a shell command."""
+        ok, lines = await self.run("new-session", "-d", "-s", session_name, command)
+        if not ok:
+            raise TmuxError("; ".join(lines) or f"Failed to create session {session_name}")
+
+    async def kill_session(self, session_name: str) -> bool:
+        """Kill a session. Returns False if it did not exist."""
+        ok, _ = await self.run("kill-session", "-t", f"={session_name}")
+        return ok
+
+    async def close(self):
+        """Close the control-mode connection and its session.
+
+        Waits for the process and the reply reader to finish, so nothing is
+        left to clean up after the event loop closes.
+        """
+        proc, reader = self._proc, self._reader
+        self._proc = None
+        self._reader = None
+        if proc is not None:
+            if proc.returncode is None:
+                try:
+                    proc.stdin.write(b"kill-session\n")
+                    await proc.stdin.drain()
+                    await asyncio.wait_for(proc.wait(), timeout=2)
+                except (ConnectionError, asyncio.TimeoutError):
+                    proc.kill()
+                    await proc.wait()
+            # The subprocess transport closes once all of its pipes are closed
+            proc.stdin.close()
+        if reader is not None:
+            try:
+                # Ends at the EOF of the exited process; cancelled if it hangs
+                await asyncio.wait_for(reader, timeout=2)
+            except asyncio.TimeoutError:
+                pass
+
+
+# Global tmux client shared by all executors in this process
+tmux_client = TmuxClient()
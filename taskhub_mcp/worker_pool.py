@@ -0,0 +1,146 @@
+"""Pools of idle workers spawned ahead of executions.
+
+Starting an execution normally spawns its processes (and, for tmux, its
+session) while the request waits. A pool keeps some of them spawned and
+idle, so starting a run only hands the job to one. Each worker runs a single
+job and exits with it, so nothing a script changes in its environment
+carries over to the next run. The pool is refilled in the background. Its
+size follows demand: the number of workers taken in the last
+``DEMAND_WINDOW`` seconds, at least one and at most ``max_size``.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Seconds of past demand the pool size follows
+DEMAND_WINDOW = 60.0
+# Seconds between checks of the pool size when nothing is taken
+REFILL_INTERVAL = 5.0
+
+
+class PoolWorker:
+    """An idle worker waiting for its job."""
+
+    def usable(self) -> bool:
+        """Whether the worker is still waiting and can take a job."""
+        return True
+
+    async def retire(self):
+        """Shut down a worker that will not get a job."""
+
+
+class WorkerPool:
+    """Keeps idle workers of one runner ready."""
+
+    def __init__(self, name: str, spawn: Callable[[], Awaitable[PoolWorker]], max_size: int):
+        self.name = name
+        self.spawn = spawn
+        self.max_size = max_size
+        self._idle: Deque[PoolWorker] = deque()
+        self._taken: Deque[float] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+        self.spawned = 0
+        self.spawn_failures = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def start(self):
+        """Start filling the pool."""
+        if self.enabled and (self._task is None or self._task.done()):
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._refill())
+
+    async def close(self):
+        """Stop refilling and shut down the idle workers."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        while self._idle:
+            await self._retire(self._idle.popleft())
+
+    def target_size(self) -> int:
+        now = time.monotonic()
+        while self._taken and now - self._taken[0] > DEMAND_WINDOW:
+            self._taken.popleft()
+        return min(self.max_size, max(1, len(self._taken)))
+
+    def acquire(self) -> Optional[PoolWorker]:
+        """Take an idle worker, or None if none is ready.
+
+        Call ``refill`` once the job is handed over, so spawning the
+        replacement does not compete with starting the job.
+        """
+        if not self.enabled:
+            return None
+        self.start()
+        self._taken.append(time.monotonic())
+        while self._idle:
+            worker = self._idle.popleft()
+            if worker.usable():
+                self.hits += 1
+                return worker
+            asyncio.create_task(self._retire(worker))
+        self.misses += 1
+        return None
+
+    def refill(self):
+        """Top the pool up to its target size in the background."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _retire(self, worker: PoolWorker):
+        try:
+            await worker.retire()
+        except Exception as e:
+            logger.warning(f"Could not retire {self.name} pool worker: {e}")
+
+    async def _refill(self):
+        while True:
+            self._wakeup.clear()
+            target = self.target_size()
+            failed = False
+            while len(self._idle) < target:
+                try:
+                    worker = await self.spawn()
+                except Exception as e:
+                    logger.warning(f"Could not spawn {self.name} pool worker: {e}")
+                    self.spawn_failures += 1
+                    failed = True
+                    break
+                self._idle.append(worker)
+                self.spawned += 1
+            while len(self._idle) > target:
+                await self._retire(self._idle.popleft())
+
+            if failed:
+                # Do not retry in a tight loop while spawning fails
+                await asyncio.sleep(REFILL_INTERVAL)
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), REFILL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "max_size": self.max_size,
+            "target_size": self.target_size() if self.enabled else 0,
+            "idle": len(self._idle),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "spawned": self.spawned,
+            "spawn_failures": self.spawn_failures,
+        }
@@ -0,0 +1,58 @@
+"""Shared fixtures.
+
+The configuration is read when ``taskhub_mcp`` is first imported, so the
+environment is set up here, before any test module imports it: every test
+session gets its own data directory, and executions use the native runner
+so the tests do not need tmux.
+"""
+
+import os
+import tempfile
+import time
+
+os.environ["TASKHUB_DATA_DIR"] = tempfile.mkdtemp(prefix="taskhub-test-")
+os.environ.setdefault("TASKHUB_RUNNER", "native")
+os.environ.setdefault("TASKHUB_CGROUP_ROOT", "none")
+os.environ.setdefault("TASKHUB_LOG_LIFECYCLE_INTERVAL", "0")
+os.environ.setdefault("TASKHUB_TASK_STATS_RECONCILE_INTERVAL", "0")
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from taskhub_mcp.api import app  # noqa: E402
+from taskhub_mcp.api.dependencies import get_db  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    """Client of the API with its background services running.
+
+    The services hold asyncio objects bound to the event loop they first run
+    on, so one client (and loop) serves the whole session.
+    """
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def db():
+    """The task database, emptied before the test."""
+    db = get_db()
+    db.truncate()
+    return db
+
+
+@pytest.fixture
+def wait_finished(client):
+    """Wait until a task's latest execution finished and return its status."""
+
+    def wait(task_id, timeout=10.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            status = client.get(f"/exec/status/{task_id}").json()
+            if status["status"] not in ("queued", "running"):
+                return status
+            time.sleep(0.05)
+        raise AssertionError(f"Execution of task {task_id} did not finish")
+
+    return wait
@@ -0,0 +1,53 @@
+from concurrent.futures import ThreadPoolExecutor
+
+
+def create_task(client, title, body=None, **params):
+    return client.post("/tasks/create", params={"title": title, **params}, json=body).json()["task"]["id"]
+
+
+def claim(client, assignee, tags=None):
+    # tags, a list or a string, is read from the body
+    response = client.post("/tasks/claim", params={"assignee": assignee, "lease_ttl": 0}, json=tags)
+    assert response.status_code == 200
+    return response.json()["task"]
+
+
+def test_claims_by_priority_then_age(client, db):
+    low = create_task(client, "low", priority="low")
+    first = create_task(client, "first high", priority="high")
+    second = create_task(client, "second high", priority="high")
+    unset = create_task(client, "unset")
+
+    assert [claim(client, "agent")["id"] for _ in range(4)] == [first, second, low, unset]
+    assert claim(client, "agent") is None
+    task = db.get(lambda t: t["id"] == first)
+    assert (task["status"], task["assignee"]) == ("inprogress", "agent")
+
+
+def test_claim_skips_ineligible_tasks(client, db):
+    blocker = create_task(client, "blocker")
+    blocked = create_task(client, "blocked", {"depends_on": [blocker]}, priority="high")
+    mine = create_task(client, "mine", priority="high", assignee="bob")
+    tagged = create_task(client, "tagged", {"tags": ["gpu", "cuda"]})
+
+    assert claim(client, "alice", ["gpu"])["id"] == tagged
+    assert claim(client, "alice")["id"] == blocker
+    assert claim(client, "alice") is None
+    assert claim(client, "bob")["id"] == mine
+
+    client.put(f"/tasks/status/{blocker}", params={"new_status": "done"})
+    assert claim(client, "alice")["id"] == blocked
+
+
+def test_concurrent_claims_get_distinct_tasks(client, db):
+    task_ids = {create_task(client, f"task {i}") for i in range(20)}
+
+    with ThreadPoolExecutor(8) as pool:
+        claimed = list(pool.map(lambda i: claim(client, f"agent-{i}"), range(30)))
+    claimed_ids = [task["id"] for task in claimed if task is not None]
+    assert sorted(claimed_ids) == sorted(task_ids)
+
+
+def test_claim_rejects_bad_arguments(client):
+    assert client.post("/tasks/claim", params={"assignee": " "}).status_code == 400
+    assert client.post("/tasks/claim", params={"assignee": "a", "lease_ttl": -1}).status_code == 400
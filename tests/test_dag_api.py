@@ -0,0 +1,92 @@
+import time
+
+from taskhub_mcp.api.routers import dag
+from taskhub_mcp.config import TASKS_DIR
+from taskhub_mcp.markdown_sync import MarkdownTaskParser
+
+
+def create_task(client, db, title, depends_on=None):
+    task_id = client.post("/tasks/create", params={"title": title}).json()["task"]["id"]
+    if depends_on:
+        db.update({"depends_on": depends_on}, lambda t: t["id"] == task_id)
+    return task_id
+
+
+def wait_for_run(client, run_id, timeout=15.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        run = client.get(f"/exec/dag/{run_id}").json()
+        if run["status"] != "running":
+            return run
+        time.sleep(0.05)
+    raise AssertionError(f"DAG run {run_id} did not finish")
+
+
+def test_only_selected_tasks_are_parsed(client, db, monkeypatch):
+    first = create_task(client, db, "first")
+    second = create_task(client, db, "second", [first])
+    unrelated = [create_task(client, db, f"unrelated {i}") for i in range(3)]
+    parsed = []
+    original = MarkdownTaskParser.parse_task_file
+
+    def parse_task_file(self, path):
+        parsed.append(path.name)
+        return original(self, path)
+
+    monkeypatch.setattr(MarkdownTaskParser, "parse_task_file", parse_task_file)
+    tasks, _ = dag._load_run([second])
+
+    files = {t["id"]: t["file_path"] for t in tasks}
+    assert sorted(parsed) == sorted([files[first], files[second]])
+    assert not set(parsed) & {files[t] for t in unrelated}
+
+
+def test_run_follows_dependencies(client, db):
+    first = create_task(client, db, "build")
+    second = create_task(client, db, "test", [first])
+
+    response = client.post("/exec/dag", json={"task_ids": [second]})
+    assert response.status_code == 200
+    run = wait_for_run(client, response.json()["run_id"])
+
+    assert run["status"] == "completed"
+    assert run["order"] == [first, second]
+    assert run["nodes"][first]["completed_at"] <= run["nodes"][second]["started_at"]
+    assert {t["status"] for t in db.all()} == {"done"}
+
+
+def test_cached_node_moves_to_review_without_mark_done(client, db):
+    task = client.post("/tasks/create", params={"title": "cached node"}).json()["task"]
+    task_file = TASKS_DIR / task["file_path"]
+    task_file.write_text(task_file.read_text().replace("status: todo", "cache: true\nstatus: todo", 1))
+    request = {"task_ids": [task["id"]], "mark_done": False}
+
+    first = wait_for_run(client, client.post("/exec/dag", json=request).json()["run_id"])
+    assert not first["nodes"][task["id"]]["cached"]
+    assert db.get(lambda t: t["id"] == task["id"])["status"] == "review"
+
+    # The cached run completes while it is submitted
+    second = wait_for_run(client, client.post("/exec/dag", json=request).json()["run_id"])
+    assert second["status"] == "completed"
+    assert second["nodes"][task["id"]]["cached"]
+    assert db.get(lambda t: t["id"] == task["id"])["status"] == "review"
+
+
+def test_node_that_cannot_start_keeps_its_status(client, db, wait_finished):
+    task_id = client.post("/tasks/create", params={"title": "busy"}).json()["task"]["id"]
+    client.post(f"/exec/{task_id}", json={"script_content": "#!/bin/bash\nsleep 30\n"})
+    client.put(f"/tasks/status/{task_id}", params={"new_status": "review"})
+
+    run = wait_for_run(client, client.post("/exec/dag", json={"task_ids": [task_id]}).json()["run_id"])
+    assert run["nodes"][task_id]["state"] == "failed"
+    assert "already" in run["nodes"][task_id]["error"]
+    assert db.get(lambda t: t["id"] == task_id)["status"] == "review"
+
+    client.post(f"/exec/stop/{task_id}")
+    wait_finished(task_id)
+
+
+def test_unknown_tasks_are_rejected(client, db):
+    response = client.post("/exec/dag", json={"task_ids": ["missing"]})
+    assert response.status_code == 400
+    assert "Unknown tasks" in response.json()["detail"]
@@ -0,0 +1,64 @@
+import json
+import re
+
+import pytest
+from rich.console import Console
+
+from taskhub_mcp import db_viewer
+
+
+def write_database(path, tables):
+    path.write_text(json.dumps(tables, indent=1))
+    return path
+
+
+def test_iter_tasks_reads_one_table_across_chunks(tmp_path):
+    tasks = {str(i): {"id": f"task-{i}", "title": "x" * i, "tags": ["a", "}"]} for i in range(1, 50)}
+    path = write_database(tmp_path / "db.json", {"other": {"1": {"id": "skip"}}, "_default": tasks, "last": {}})
+
+    # Chunks smaller than a document, so values span several reads
+    result = list(db_viewer.iter_tasks(path, chunk_size=7))
+    assert result == list(tasks.values())
+    assert [t["id"] for t in db_viewer.iter_tasks(path, table="other")] == ["skip"]
+
+
+def test_iter_tasks_handles_empty_files(tmp_path):
+    assert list(db_viewer.iter_tasks(write_database(tmp_path / "db.json", {}))) == []
+    empty = tmp_path / "empty.json"
+    empty.write_text("")
+    assert list(db_viewer.iter_tasks(empty)) == []
+
+
+def test_iter_tasks_rejects_truncated_files(tmp_path):
+    path = tmp_path / "db.json"
+    path.write_text('{"_default": {"1": {"id": "a"}, "2": {"id": ')
+    with pytest.raises(ValueError):
+        list(db_viewer.iter_tasks(path, chunk_size=4))
+
+
+def test_view_database_filters_limits_and_counts(tmp_path, monkeypatch):
+    tasks = {
+        str(i): {"id": f"task-{i:04d}", "status": "done" if i % 2 else "todo", "assignee": "alice" if i % 3 else None}
+        for i in range(1, 31)
+    }
+    path = write_database(tmp_path / "db.json", {"_default": tasks})
+    console = Console(record=True, width=200)
+    monkeypatch.setattr(db_viewer, "console", console)
+
+    db_viewer.view_database(str(path), status="done", page_size=4)
+    output = console.export_text()
+    statuses = re.findall(r"│ (todo|done) ", output)
+    assert statuses == ["done"] * 15
+    assert "Total: 15" in output
+    assert "alice: 10" in output
+    assert output.count("TaskHub Database") == 4
+
+    db_viewer.view_database(str(path), limit=5)
+    output = console.export_text()
+    assert "Stopped after 5 tasks" in output
+    assert "Total:" not in output
+
+    db_viewer.view_database(str(path), stats_only=True)
+    output = console.export_text()
+    assert "TaskHub Database" not in output
+    assert "Total: 30" in output
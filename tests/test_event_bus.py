@@ -0,0 +1,91 @@
+import asyncio
+import fcntl
+import os
+
+from taskhub_mcp.event_bus import FileEventBus
+
+
+async def collect(bus):
+    received = []
+
+    async def deliver(event_str):
+        received.append(event_str)
+
+    bus.bind(deliver)
+    return received
+
+
+async def wait_for(predicate, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def test_events_reach_other_processes_once(tmp_path):
+    async def run():
+        path = tmp_path / "bus.log"
+        sender = FileEventBus(path, poll_interval=0.01)
+        receiver = FileEventBus(path, poll_interval=0.01)
+        sent = await collect(sender)
+        received = await collect(receiver)
+        await sender.start()
+        await receiver.start()
+        for i in range(3):
+            await sender.publish(f'{{"n": {i}}}')
+        await wait_for(lambda: len(received) == 3)
+        await asyncio.sleep(0.05)
+        await sender.stop()
+        await receiver.stop()
+        return sent, received
+
+    sent, received = asyncio.run(run())
+    expected = [f'{{"n": {i}}}' for i in range(3)]
+    assert sent == expected
+    assert received == expected
+
+
+def test_events_survive_rotation(tmp_path):
+    async def run():
+        path = tmp_path / "bus.log"
+        sender = FileEventBus(path, max_bytes=200, poll_interval=0.01)
+        receiver = FileEventBus(path, poll_interval=0.01)
+        await collect(sender)
+        received = await collect(receiver)
+        await sender.start()
+        await receiver.start()
+        for i in range(50):
+            await sender.publish(f'{{"n": {i}}}')
+            await asyncio.sleep(0.002)
+        await wait_for(lambda: len(received) == 50)
+        await sender.stop()
+        await receiver.stop()
+        return received
+
+    received = asyncio.run(run())
+    assert received == [f'{{"n": {i}}}' for i in range(50)]
+    assert (tmp_path / "bus.log.1").exists()
+
+
+def test_publish_does_not_wait_for_a_rotation_lock(tmp_path):
+    async def run():
+        path = tmp_path / "bus.log"
+        bus = FileEventBus(path)
+        delivered = await collect(bus)
+        await bus.start()
+        # Another process rotating the log holds the lock exclusively
+        lock_fd = os.open(path.with_name("bus.log.lock"), os.O_RDWR | os.O_CREAT)
+        fcntl.flock(lock_fd, fcntl.LOCK_EX)
+        try:
+            await asyncio.wait_for(bus.publish('{"n": 1}'), timeout=1)
+            written_while_locked = path.read_bytes()
+        finally:
+            fcntl.flock(lock_fd, fcntl.LOCK_UN)
+            os.close(lock_fd)
+        await bus.stop()
+        return delivered, written_while_locked, path.read_text()
+
+    delivered, written_while_locked, log = asyncio.run(run())
+    assert delivered == ['{"n": 1}']
+    assert written_while_locked == b""
+    assert log.endswith(' {"n": 1}\n')
@@ -0,0 +1,43 @@
+import json
+
+from taskhub_mcp.event_history import EventHistory
+
+
+def event(task_id, **data):
+    return json.dumps({"event": "task_updated", "data": {"task_id": task_id, **data}})
+
+
+def write(tmp_path, events, **kwargs):
+    history = EventHistory(tmp_path, **kwargs)
+    for timestamp, event_str in events:
+        history.append(event_str, timestamp)
+    history.stop()
+    return history
+
+
+def test_query_range_across_segments(tmp_path):
+    events = [(1000 + i, event(f"task-{i}")) for i in range(200)]
+    history = write(tmp_path, events, segment_bytes=1024, index_interval=128)
+    assert len(list(tmp_path.glob("*.jsonl"))) > 1
+
+    result = [json.loads(e)["data"]["task_id"] for e in history.query(since=1050, until=1059)]
+    assert result == [f"task-{i}" for i in range(50, 60)]
+    assert len(list(history.query(limit=7))) == 7
+
+
+def test_task_filter_compares_the_task_id(tmp_path):
+    history = write(tmp_path, [
+        (1000, event("abc")),
+        (1001, event("abcd")),
+        (1002, event("other", depends_on={"task_id": "abc"})),
+        (1003, json.dumps({"event": "log", "data": {"output": '"task_id": "abc"'}})),
+        (1004, event("abc", status="done")),
+    ])
+
+    result = [json.loads(e) for e in history.query(task_id="abc")]
+    assert [e["data"].get("status") for e in result] == [None, "done"]
+
+
+def test_task_filter_matches_escaped_ids(tmp_path):
+    history = write(tmp_path, [(1000, event('tâche "1"')), (1001, event("tache"))])
+    assert [json.loads(e)["data"]["task_id"] for e in history.query(task_id='tâche "1"')] == ['tâche "1"']
@@ -0,0 +1,35 @@
+from functools import partial
+
+from taskhub_mcp.event_broadcaster import event_broadcaster
+
+
+def test_subscribe_replaces_filters(client):
+    with client.websocket_connect("/events/ws?event_types=task_updated") as ws:
+        assert ws.receive_json()["type"] == "connected"
+        ws.send_json({"action": "subscribe", "event_types": ["execution_event"], "task_ids": ["t1"]})
+        assert ws.receive_json() == {"type": "subscribed", "event_types": ["execution_event"], "task_ids": ["t1"]}
+
+        client.portal.call(partial(event_broadcaster.broadcast_task_update, task_id="t1", status="review"))
+        client.portal.call(partial(
+            event_broadcaster.broadcast_execution_event, task_id="t1", event_type="started", execution_id="e1"
+        ))
+        batch = ws.receive_json()
+        assert batch["type"] == "batch"
+        assert [e["event"] for e in batch["events"]] == ["execution_event"]
+
+
+def test_invalid_messages_get_errors_and_keep_the_socket_open(client):
+    with client.websocket_connect("/events/ws") as ws:
+        ws.receive_json()
+        for message in (
+            "not json",
+            '{"action": "unsubscribe"}',
+            '{"action": "subscribe", "event_types": "task_updated"}',
+            '{"action": "subscribe", "task_ids": {"t1": true}}',
+            '{"action": "subscribe", "task_ids": [1, 2]}',
+        ):
+            ws.send_text(message)
+            assert ws.receive_json()["type"] == "error", message
+
+        ws.send_json({"action": "subscribe", "event_types": None, "task_ids": ["t2"]})
+        assert ws.receive_json()["type"] == "subscribed"
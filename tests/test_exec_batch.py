@@ -0,0 +1,51 @@
+def create_task(client, title):
+    return client.post("/tasks/create", params={"title": title}).json()["task"]["id"]
+
+
+def task_status(db, task_id):
+    return db.get(lambda t: t["id"] == task_id)["status"]
+
+
+def test_batch_queues_tasks_and_reports_missing(client, db, wait_finished):
+    task_ids = [create_task(client, f"batch {i}") for i in range(3)]
+
+    response = client.post("/exec/batch", json={"task_ids": task_ids + ["missing", task_ids[0]]})
+    assert response.status_code == 200
+    result = response.json()
+    assert sorted(e["task_id"] for e in result["executions"]) == sorted(task_ids)
+    assert result["errors"] == {"missing": "Task not found"}
+    for task_id in task_ids:
+        assert wait_finished(task_id)["status"] == "completed"
+        assert task_status(db, task_id) == "inprogress"
+
+
+def test_batch_moves_fast_runs_to_review(client, db, wait_finished):
+    task_ids = [create_task(client, f"fast {i}") for i in range(10)]
+
+    result = client.post("/exec/batch", json={"task_ids": task_ids, "review_on_complete": True}).json()
+    assert len(result["executions"]) == 10
+    for task_id in task_ids:
+        wait_finished(task_id)
+    assert [task_status(db, task_id) for task_id in task_ids] == ["review"] * 10
+
+
+def test_batch_restores_status_of_tasks_it_cannot_queue(client, db, wait_finished):
+    running = create_task(client, "already running")
+    client.post(f"/exec/{running}", json={"script_content": "#!/bin/bash\nsleep 30\n"})
+    client.put(f"/tasks/status/{running}", params={"new_status": "review"})
+    other = create_task(client, "queued")
+
+    result = client.post("/exec/batch", json={"task_ids": [running, other]}).json()
+    assert [e["task_id"] for e in result["executions"]] == [other]
+    assert "already" in result["errors"][running]
+    assert task_status(db, running) == "review"
+    assert task_status(db, other) == "inprogress"
+
+    client.post(f"/exec/stop/{running}")
+    wait_finished(running)
+    wait_finished(other)
+
+
+def test_batch_rejects_empty_and_oversized_requests(client):
+    assert client.post("/exec/batch", json={"task_ids": []}).status_code == 400
+    assert client.post("/exec/batch", json={"task_ids": [str(i) for i in range(1000)]}).status_code == 400
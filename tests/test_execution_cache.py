@@ -0,0 +1,124 @@
+from pathlib import Path
+
+from taskhub_mcp.api.dependencies import get_executor
+from taskhub_mcp.execution_cache import ExecutionCache
+from taskhub_mcp.runners import completion_status
+
+
+def write_script(path, text="#!/bin/bash\necho hello\n"):
+    path.write_text(text)
+    return str(path)
+
+
+def store_run(cache, key, tmp_path, execution_id, lines=b"line\n"):
+    log = tmp_path / f"{execution_id}.log"
+    log.write_bytes(lines)
+    return cache.store(key, {"log_file": str(log), "exit_code": 0, "execution_id": execution_id, "task_id": "t"})
+
+
+def test_completion_status():
+    assert completion_status(0) == "completed"
+    assert completion_status(1) == "failed"
+    # The session died before the script recorded its exit code
+    assert completion_status(None) == "failed"
+
+
+def test_key_depends_on_script_params_and_inputs(tmp_path):
+    cache = ExecutionCache(tmp_path / "cache")
+    script = write_script(tmp_path / "run.sh")
+    (tmp_path / "in.txt").write_text("one")
+
+    key = cache.compute_key(script, ["in.txt"], base_dir=tmp_path)
+    assert cache.compute_key(script, ["in.txt"], base_dir=tmp_path) == key
+    assert cache.compute_key(script, ["in.txt"], base_dir=tmp_path, params={"N": "1"}) != key
+
+    (tmp_path / "in.txt").write_text("two")
+    changed = cache.compute_key(script, ["in.txt"], base_dir=tmp_path)
+    assert changed != key
+
+    write_script(tmp_path / "run.sh", "#!/bin/bash\necho bye\n")
+    assert cache.compute_key(script, ["in.txt"], base_dir=tmp_path) != changed
+
+
+def test_key_covers_files_in_input_directories(tmp_path):
+    cache = ExecutionCache(tmp_path / "cache")
+    script = write_script(tmp_path / "run.sh")
+    (tmp_path / "data" / "sub").mkdir(parents=True)
+    (tmp_path / "data" / "sub" / "a").write_text("a")
+
+    key = cache.compute_key(script, ["data"], base_dir=tmp_path)
+    (tmp_path / "data" / "sub" / "b").write_text("b")
+    assert cache.compute_key(script, ["data"], base_dir=tmp_path) != key
+
+
+def test_store_and_lookup(tmp_path):
+    cache = ExecutionCache(tmp_path / "cache")
+    store_run(cache, "k", tmp_path, "e1", b"working\nARTIFACT: out/result.bin\n")
+
+    entry = cache.lookup("k")
+    assert entry.exit_code == 0
+    assert entry.artifacts == ["out/result.bin"]
+    restored = tmp_path / "restored.log"
+    cache.restore(entry, str(restored))
+    assert restored.read_bytes() == b"working\nARTIFACT: out/result.bin\n"
+    assert cache.lookup("missing") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Entries survive a restart
+    assert ExecutionCache(tmp_path / "cache").lookup("k").execution_id == "e1"
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = ExecutionCache(tmp_path / "cache", max_entries=2)
+    store_run(cache, "a", tmp_path, "e1")
+    store_run(cache, "b", tmp_path, "e2")
+    cache.lookup("a")
+    store_run(cache, "c", tmp_path, "e3")
+
+    assert cache.lookup("b") is None
+    assert cache.lookup("a") is not None
+    assert cache.lookup("c") is not None
+    assert cache.evictions == 1
+    assert not (tmp_path / "cache" / "b.log").exists()
+
+
+def test_evicts_beyond_max_bytes(tmp_path):
+    cache = ExecutionCache(tmp_path / "cache", max_bytes=10)
+    store_run(cache, "a", tmp_path, "e1", b"123456\n")
+    store_run(cache, "b", tmp_path, "e2", b"123456\n")
+
+    assert cache.lookup("a") is None
+    assert cache.metrics()["bytes"] == 7
+
+
+def test_run_without_exit_code_is_not_cached(client, db):
+    executor = get_executor()
+    task_id = client.post("/tasks/create", params={"title": "killed run"}).json()["task"]["id"]
+
+    async def finish_without_exit_code():
+        record = await executor.prepare_execution(task_id, "#!/bin/bash\necho hi\n", cache_key="no-exit-code")
+        Path(record["log_file"]).write_text("hi\n")
+        # As when the session is killed before the script records its exit code
+        return await executor._record_completion(record, None)
+
+    record = client.portal.call(finish_without_exit_code)
+    assert record["status"] == "failed"
+    assert executor.cache.lookup("no-exit-code") is None
+
+
+def test_cache_hit_moves_task_to_review(client, db, wait_finished):
+    task_id = client.post("/tasks/create", params={"title": "cached run"}).json()["task"]["id"]
+    request = {"script_content": "#!/bin/bash\necho cached\n", "use_cache": True, "review_on_complete": True}
+
+    version = client.get("/tasks/wait", params={"timeout": 0}).json()["version"]
+    client.post(f"/exec/{task_id}", json=request)
+    wait_finished(task_id)
+    # The run is recorded as finished before its completion listeners move the task
+    params = {"since_version": version, "status": "review", "task_id": task_id, "timeout": 10}
+    assert not client.get("/tasks/wait", params=params).json()["timed_out"]
+    assert db.get(lambda t: t["id"] == task_id)["status"] == "review"
+
+    cached = client.post(f"/exec/{task_id}", json=request).json()
+    assert cached["cached"]
+    assert cached["status"] == "completed"
+    assert db.get(lambda t: t["id"] == task_id)["status"] == "review"
@@ -0,0 +1,69 @@
+import os
+import time
+from datetime import datetime
+
+from taskhub_mcp.execution_registry import ExecutionRegistry
+from taskhub_mcp.log_lifecycle import LogLifecycleManager
+from taskhub_mcp.models import TaskExecution
+
+
+def execution(task_id, status, **fields):
+    return TaskExecution(
+        task_id=task_id, session_name=task_id, log_file="", status=status, **fields
+    )
+
+
+def add_run(registry, logs_dir, task_id, status, age_days=0.0, matrix_id=None):
+    run = execution(task_id, status, started_at=datetime.now())
+    record = registry.add(run, matrix_id=matrix_id)
+    log = logs_dir / f"{task_id}_{record['execution_id']}.log"
+    log.write_text("output\n")
+    mtime = time.time() - age_days * 24 * 60 * 60
+    os.utime(log, (mtime, mtime))
+    return record["execution_id"]
+
+
+def test_retention_removes_records_of_deleted_logs(tmp_path):
+    logs_dir = tmp_path / "logs"
+    logs_dir.mkdir()
+    registry = ExecutionRegistry(tmp_path / "executions_db.json")
+    old = add_run(registry, logs_dir, "t1", "completed", age_days=10, matrix_id="m1")
+    running = add_run(registry, logs_dir, "t1", "running", age_days=10)
+    recent = add_run(registry, logs_dir, "t2", "completed", matrix_id="m1")
+    manager = LogLifecycleManager(
+        logs_dir, registry, compression="none", retention_days=7, retention_bytes=0, interval=0
+    )
+
+    assert manager.run_once()["deleted"] == 1
+
+    assert registry.get(old) is None
+    assert [r["execution_id"] for r in registry.history("t1")] == [running]
+    assert [r["execution_id"] for r in registry.matrix("m1")] == [recent]
+    # Another process reading the file sees the same records
+    reloaded = ExecutionRegistry(tmp_path / "executions_db.json")
+    assert {r["execution_id"] for r in reloaded.all()} == {running, recent}
+
+
+def test_remove_keeps_active_records(tmp_path):
+    registry = ExecutionRegistry(tmp_path / "executions_db.json")
+    queued = registry.add(execution("t1", "queued"))["execution_id"]
+    done = registry.add(execution("t1", "failed"))["execution_id"]
+
+    assert registry.remove([queued, done, "unknown"]) == 1
+    assert [r["execution_id"] for r in registry.all()] == [queued]
+    assert registry.latest("t1")["execution_id"] == queued
+
+
+def test_same_second_writes_from_another_process_are_seen(tmp_path):
+    path = tmp_path / "executions_db.json"
+    registry = ExecutionRegistry(path)
+    other = ExecutionRegistry(path)
+    first = registry.add(execution("t1", "completed"))["execution_id"]
+    assert other.get(first) is not None
+    stat = path.stat()
+
+    second = other.add(execution("t1", "completed"))["execution_id"]
+    # Coarse file systems can give both writes the same timestamp
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert registry.get(second) is not None
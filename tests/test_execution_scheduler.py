@@ -0,0 +1,112 @@
+import asyncio
+from types import SimpleNamespace
+
+from taskhub_mcp.execution_scheduler import ExecutionScheduler
+
+
+class FakeExecutor:
+    """Records started executions; each runs until it is finished by the test."""
+
+    def __init__(self):
+        self.records = {}
+        self.started = []
+        self.finished = {}
+        self.registry = SimpleNamespace(get=self.records.get)
+
+    def add(self, execution_id, task_id):
+        self.records[execution_id] = {"execution_id": execution_id, "task_id": task_id, "status": "queued"}
+
+    async def prepare_execution(self, task_id, script_content=None, runner=None, **extra):
+        execution_id = f"{task_id}-{len(self.records)}"
+        self.add(execution_id, task_id)
+        return {**self.records[execution_id], **extra}
+
+    async def start_execution(self, execution_id):
+        self.started.append(execution_id)
+        self.finished[execution_id] = asyncio.Event()
+        record = self.records[execution_id]
+        record["status"] = "running"
+        return {**record, "session_name": execution_id, "log_file": f"{execution_id}.log"}
+
+    async def wait_for_completion(self, execution_id):
+        await self.finished[execution_id].wait()
+
+
+def make_scheduler(max_concurrent=1):
+    executor = FakeExecutor()
+    return ExecutionScheduler(executor, max_concurrent=max_concurrent), executor
+
+
+def test_positions_follow_priority_then_submission():
+    async def run():
+        scheduler, executor = make_scheduler()
+        # The dispatcher only runs once this coroutine awaits
+        for execution_id, priority in (("a", None), ("b", "low"), ("c", "high"), ("d", "high"), ("e", "medium")):
+            executor.add(execution_id, execution_id)
+            scheduler._enqueue(execution_id, execution_id, priority)
+        positions = scheduler.positions()
+        single = {execution_id: scheduler.position(execution_id) for execution_id in positions}
+        await scheduler.stop()
+        return positions, single
+
+    positions, single = asyncio.run(run())
+    assert positions == {"c": 1, "d": 2, "e": 3, "b": 4, "a": 5}
+    assert single == positions
+
+
+def test_annotate_and_cancel():
+    async def run():
+        scheduler, executor = make_scheduler()
+        for execution_id in ("a", "b"):
+            executor.add(execution_id, f"task-{execution_id}")
+            scheduler._enqueue(execution_id, f"task-{execution_id}", None)
+        annotated = scheduler.annotate({"status": "queued", "execution_id": "b"})
+        running = scheduler.annotate({"status": "running", "execution_id": "a"})
+        cancelled = scheduler.cancel("task-a")
+        after_cancel = scheduler.annotate({"status": "queued", "execution_id": "b"}, scheduler.positions())
+        await scheduler.stop()
+        return annotated, running, cancelled, after_cancel
+
+    annotated, running, cancelled, after_cancel = asyncio.run(run())
+    assert annotated["queue_position"] == 2
+    assert "queue_position" not in running
+    assert cancelled
+    assert after_cancel["queue_position"] == 1
+
+
+def test_dispatch_respects_the_concurrency_limit():
+    async def run():
+        scheduler, executor = make_scheduler(max_concurrent=2)
+        for execution_id, priority in (("a", "low"), ("b", "low"), ("c", "low"), ("d", "high")):
+            executor.add(execution_id, execution_id)
+            scheduler._enqueue(execution_id, execution_id, priority)
+        await asyncio.sleep(0.01)
+        first = list(executor.started)
+        executor.finished[first[0]].set()
+        await asyncio.sleep(0.01)
+        second = list(executor.started)
+        metrics = scheduler.metrics()
+        await scheduler.stop()
+        return first, second, metrics
+
+    first, second, metrics = asyncio.run(run())
+    assert first == ["d", "a"]
+    assert second == ["d", "a", "b"]
+    assert metrics["running"] == 2
+    assert metrics["queue_depth"] == 1
+
+
+def test_matrix_runs_are_placed_with_one_sort():
+    async def run():
+        scheduler, executor = make_scheduler()
+        scheduler.max_concurrent = 0
+        scan_calls = []
+        scheduler.position = lambda execution_id: scan_calls.append(execution_id)
+        matrix = await scheduler.submit_matrix("t", [{"N": str(i)} for i in range(50)])
+        positions = scheduler.positions()
+        await scheduler.stop()
+        return matrix, positions, scan_calls
+
+    matrix, positions, scan_calls = asyncio.run(run())
+    assert scan_calls == []
+    assert [positions[e["execution_id"]] for e in matrix["executions"]] == list(range(1, 51))
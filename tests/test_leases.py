@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from taskhub_mcp.task_leases import LeaseManager
+
+
+def test_lease_expires_without_renewal():
+    async def run():
+        expired = []
+
+        async def on_expire(task_id, assignee):
+            expired.append((task_id, assignee))
+
+        leases = LeaseManager(on_expire, tick=0.02)
+        await leases.start()
+        leases.grant("kept", "alice", 0.2)
+        leases.grant("dropped", "bob", 0.1)
+        leases.grant("released", "carol", 0.1)
+        leases.release("released")
+        for _ in range(10):
+            await asyncio.sleep(0.03)
+            leases.renew("kept", "alice")
+        await asyncio.sleep(0.3)
+        await leases.stop()
+        return expired, leases.metrics()
+
+    expired, metrics = asyncio.run(run())
+    assert expired == [("dropped", "bob"), ("kept", "alice")]
+    assert metrics == {"active": 0, "granted": 3, "renewed": 10, "expired": 2}
+
+
+def test_renew_checks_the_assignee():
+    leases = LeaseManager(None)
+    with pytest.raises(KeyError):
+        leases.renew("task", "alice")
+    leases.grant("task", "alice", 60)
+    with pytest.raises(ValueError):
+        leases.renew("task", "bob")
+    assert leases.renew("task", "alice", 120).ttl == 120
+
+
+def test_recover_leases_inprogress_tasks():
+    leases = LeaseManager(None)
+    count = leases.recover([
+        {"id": "a", "status": "inprogress", "assignee": "alice", "lease_ttl": 60},
+        {"id": "b", "status": "inprogress", "assignee": "bob", "lease_ttl": None},
+        {"id": "c", "status": "todo", "assignee": None, "lease_ttl": 60},
+    ])
+    assert count == 1
+    assert leases.get("a").ttl == 60
+
+
+def create_task(client, title):
+    return client.post("/tasks/create", params={"title": title}).json()["task"]["id"]
+
+
+def claim(client, assignee, lease_ttl):
+    return client.post("/tasks/claim", params={"assignee": assignee, "lease_ttl": lease_ttl}).json()
+
+
+def test_heartbeat_renews_the_lease(client, db):
+    task_id = create_task(client, "leased")
+    result = claim(client, "alice", 60)
+    assert result["lease"]["lease_ttl"] == 60
+
+    response = client.post(f"/tasks/heartbeat/{task_id}", params={"assignee": "alice", "lease_ttl": 120})
+    assert response.status_code == 200
+    assert response.json()["lease_ttl"] == 120
+    # Kept with the task for a restart
+    assert db.get(lambda t: t["id"] == task_id)["lease_ttl"] == 120
+    assert client.post(f"/tasks/heartbeat/{task_id}", params={"assignee": "bob"}).status_code == 400
+    assert client.post("/tasks/heartbeat/missing", params={"assignee": "alice"}).status_code == 404
+
+    # Finishing the task ends the lease
+    client.put(f"/tasks/status/{task_id}", params={"new_status": "review"})
+    assert client.post(f"/tasks/heartbeat/{task_id}", params={"assignee": "alice"}).status_code == 404
+
+
+def test_heartbeat_starts_a_lease_for_an_unleased_claim(client, db):
+    task_id = create_task(client, "unleased")
+    assert "lease" not in claim(client, "alice", 0)
+
+    response = client.post(f"/tasks/heartbeat/{task_id}", params={"assignee": "alice", "lease_ttl": 30})
+    assert response.json()["lease_ttl"] == 30
+    assert db.get(lambda t: t["id"] == task_id)["lease_ttl"] == 30
+    client.put(f"/tasks/status/{task_id}", params={"new_status": "done"})
+
+
+def test_expired_lease_returns_the_task_to_todo(client, db):
+    task_id = create_task(client, "abandoned")
+    version = client.get("/tasks/wait", params={"timeout": 0}).json()["version"]
+    claim(client, "alice", 1)
+
+    # Wait on the change feed: reading the file while the expiry rewrites it can see it half written
+    params = {"since_version": version, "status": "todo", "task_id": task_id, "timeout": 5}
+    assert not client.get("/tasks/wait", params=params).json()["timed_out"], "lease did not expire"
+    assert db.get(lambda t: t["id"] == task_id)["assignee"] is None
+    assert claim(client, "bob", 0)["task"]["id"] == task_id
@@ -0,0 +1,78 @@
+import pytest
+
+from taskhub_mcp import log_reader
+
+LINES = [f"line {i}" + "x" * (i % 7) for i in range(200)]
+
+
+@pytest.fixture
+def log(tmp_path, monkeypatch):
+    # Small blocks, so lines span block boundaries
+    monkeypatch.setattr(log_reader, "BLOCK_SIZE", 16)
+    path = tmp_path / "run.log"
+    path.write_text("\n".join(LINES) + "\n")
+    return str(path)
+
+
+def test_tail(log):
+    page = log_reader.tail(log, 5)
+    assert page.lines == LINES[-5:]
+    assert page.end_offset == page.file_size
+    assert log_reader.tail(log, 1000).lines == LINES
+    assert log_reader.tail(log, 0).lines == []
+
+
+def test_page_forward_and_back_with_cursors(log):
+    pages = []
+    cursor = 0
+    while True:
+        page = log_reader.read_after(log, cursor, 30)
+        if not page.lines:
+            break
+        pages.append(page.lines)
+        cursor = page.next_cursor
+    assert [line for page in pages for line in page] == LINES
+
+    page = log_reader.tail(log, 30)
+    back = []
+    while page.lines:
+        back = page.lines + back
+        if page.prev_cursor is None:
+            break
+        page = log_reader.read_before(log, page.prev_cursor, 30)
+    assert back == LINES
+
+
+def test_read_from_offset_aligns_to_the_next_line(log):
+    start = len(LINES[0]) + 1
+    assert log_reader.read_from_offset(log, start, 2).lines == LINES[1:3]
+    assert log_reader.read_from_offset(log, start - 3, 2).lines == LINES[1:3]
+    assert log_reader.read_from_offset(log, 10**9, 2).lines == []
+
+
+def test_pages_are_capped_in_bytes(log):
+    page = log_reader.read_after(log, 0, 1000, max_bytes=100)
+    assert page.end_offset <= 100
+    assert log_reader.tail(log, 1000, max_bytes=100).start_offset >= page.file_size - 100
+
+
+def test_unterminated_last_line(tmp_path):
+    path = tmp_path / "partial.log"
+    path.write_text("one\ntwo\nthr")
+    assert log_reader.tail(str(path), 2).lines == ["two", "thr"]
+    assert log_reader.read_after(str(path), 0, 5).lines == ["one", "two", "thr"]
+
+
+def test_logs_endpoint_pages_an_execution_log(client, db, wait_finished):
+    task_id = client.post("/tasks/create", params={"title": "paged"}).json()["task"]["id"]
+    client.post(f"/exec/{task_id}", json={"script_content": "#!/bin/bash\nfor i in $(seq 1 50); do echo row $i; done\n"})
+    wait_finished(task_id)
+
+    last = client.get(f"/exec/logs/{task_id}", params={"tail": 10}).json()
+    # The executor's own lines follow the script output
+    assert "row 50" in last["logs"] and "row 1" not in last["logs"]
+    before = client.get(f"/exec/logs/{task_id}", params={"before": last["prev_cursor"], "limit": 5}).json()
+    assert before["end_offset"] == last["start_offset"]
+    after = client.get(f"/exec/logs/{task_id}", params={"after": before["start_offset"], "limit": 5}).json()
+    assert after["logs"] == before["logs"]
+    assert client.get(f"/exec/logs/{task_id}", params={"before": 1, "after": 1}).status_code == 400
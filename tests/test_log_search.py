@@ -0,0 +1,67 @@
+import pytest
+
+from taskhub_mcp import log_search
+from taskhub_mcp.log_search import index_path, read_index, search_log, trigrams
+
+LINES = [f"step {i} ok" for i in range(100)]
+LINES[37] = "step 37 ERROR: disk full"
+LINES[80] = "step 80 error: Disk Full again"
+
+
+@pytest.fixture
+def log(tmp_path, monkeypatch):
+    # Small blocks, so lines span block boundaries
+    monkeypatch.setattr(log_search, "SCAN_BLOCK_SIZE", 16)
+    path = tmp_path / "run.log"
+    path.write_text("\n".join(LINES) + "\n")
+    return str(path)
+
+
+def test_trigrams_of_words():
+    assert trigrams(b"abcd ab abcd") == {b"abc", b"bcd"}
+
+
+def test_hits_have_offsets_and_line_numbers(log):
+    scan = search_log(log, "disk full")
+    assert [(h.line_number, h.line) for h in scan.hits] == [(38, LINES[37])]
+    with open(log, "rb") as f:
+        f.seek(scan.hits[0].offset)
+        assert f.readline().decode().rstrip("\n") == LINES[37]
+
+    scan = search_log(log, "DISK FULL", ignore_case=True)
+    assert [h.line_number for h in scan.hits] == [38, 81]
+    assert search_log(log, "step", max_hits=5).truncated
+
+
+def test_finished_logs_are_indexed_and_skipped(log):
+    scan = search_log(log, "disk", finished=True)
+    assert scan.indexed and len(scan.hits) == 1
+    assert read_index(index_path(log), scan.bytes_scanned) is not None
+
+    missing = search_log(log, "timeout", finished=True)
+    assert missing.skipped and missing.bytes_scanned == 0
+    # The index is lowercased, so it serves case-insensitive searches too
+    assert len(search_log(log, "ERROR", ignore_case=True, finished=True).hits) == 2
+
+    # A log that changed size has a stale index, which is rebuilt
+    with open(log, "a") as f:
+        f.write("late timeout\n")
+    scan = search_log(log, "timeout", finished=True)
+    assert scan.indexed and not scan.skipped and len(scan.hits) == 1
+
+
+def test_running_logs_are_not_indexed(log):
+    assert not search_log(log, "disk").indexed
+    assert not index_path(log).exists()
+
+
+def test_search_endpoint(client, db, wait_finished):
+    task_id = client.post("/tasks/create", params={"title": "searched"}).json()["task"]["id"]
+    client.post(f"/exec/{task_id}", json={"script_content": "#!/bin/bash\necho needle-in-haystack\n"})
+    wait_finished(task_id)
+
+    result = client.get("/exec/logs/search", params={"q": "needle-in-haystack", "task_id": task_id}).json()
+    assert [hit["line"] for hit in result["hits"]] == ["needle-in-haystack"]
+    page = client.get(f"/exec/logs/{task_id}", params={"offset": result["hits"][0]["offset"], "limit": 1}).json()
+    assert page["logs"] == ["needle-in-haystack"]
+    assert client.get("/exec/logs/search", params={"q": ""}).status_code == 400
@@ -0,0 +1,45 @@
+import json
+
+
+def read_events(client, url):
+    events = []
+    with client.stream("GET", url) as response:
+        assert response.status_code == 200
+        event = {}
+        for line in response.iter_lines():
+            if not line:
+                if event:
+                    events.append(event)
+                event = {}
+                continue
+            field, _, value = line.partition(": ")
+            event[field] = event[field] + "\n" + value if field in event else value
+    return events
+
+
+def test_stream_sends_every_line_then_the_end(client, db, wait_finished):
+    task_id = client.post("/tasks/create", params={"title": "chatty"}).json()["task"]["id"]
+    # More lines than the stream buffers, so reading the log waits for the client
+    script = "#!/bin/bash\nfor i in $(seq 1 3000); do echo line $i; done\n"
+    client.post(f"/exec/{task_id}", json={"script_content": script})
+    wait_finished(task_id)
+
+    events = read_events(client, f"/exec/logs/{task_id}/stream")
+    lines = "\n".join(e["data"] for e in events if e["event"] == "log").split("\n")
+    assert [line for line in lines if line.startswith("line ")] == [f"line {i}" for i in range(1, 3001)]
+    end = events[-1]
+    assert end["event"] == "end"
+    assert json.loads(end["data"])["status"] == "completed"
+    assert json.loads(end["data"])["offset"] == int(end["id"])
+
+
+def test_stream_resumes_from_an_offset(client, db, wait_finished):
+    task_id = client.post("/tasks/create", params={"title": "resume"}).json()["task"]["id"]
+    client.post(f"/exec/{task_id}", json={"script_content": "#!/bin/bash\necho first\necho second\n"})
+    wait_finished(task_id)
+
+    events = read_events(client, f"/exec/logs/{task_id}/stream")
+    first = next(e for e in events if e["event"] == "log" and "first" in e["data"])
+    # A log event's ID is the offset after its lines
+    resumed = read_events(client, f"/exec/logs/{task_id}/stream?offset={first['id']}")
+    assert "first" not in "".join(e["data"] for e in resumed if e["event"] == "log")
@@ -0,0 +1,100 @@
+import asyncio
+
+from taskhub_mcp.api.services.sse_stream import SSEStreamRegistry, SSEStreamResponse, encode_event
+
+
+def test_encode_event():
+    assert encode_event("a\nb", event_id="7", event="log") == b"id: 7\nevent: log\ndata: a\ndata: b\n\n"
+
+
+async def serve(response):
+    """Send a response to a client that reads until the stream ends."""
+    sent = []
+
+    async def receive():
+        await asyncio.Event().wait()
+
+    async def send(message):
+        sent.append(message)
+
+    await response({"type": "http"}, receive, send)
+    return sent
+
+
+def test_stream_sends_queued_frames_and_unregisters():
+    async def run():
+        registry = SSEStreamRegistry(keepalive_interval=30, max_connections=1)
+        queue = asyncio.Queue()
+        for item in ("hello", b": raw\n\n", None):
+            queue.put_nowait(item)
+        sent = await serve(SSEStreamResponse(queue, registry=registry))
+        return registry.count, sent
+
+    count, sent = asyncio.run(run())
+    assert count == 0
+    assert sent[0]["status"] == 200
+    assert [m["body"] for m in sent[1:]] == [b"data: hello\n\n", b": raw\n\n", b""]
+
+
+def test_unsent_responses_hold_no_slot():
+    async def run():
+        registry = SSEStreamRegistry(keepalive_interval=30, max_connections=1)
+        # Built but never sent, e.g. because the request failed afterwards
+        for _ in range(3):
+            SSEStreamResponse(asyncio.Queue(), registry=registry)
+        queue = asyncio.Queue()
+        queue.put_nowait(None)
+        return registry.count, await serve(SSEStreamResponse(queue, registry=registry))
+
+    count, sent = asyncio.run(run())
+    assert count == 0
+    assert sent[0]["status"] == 200
+
+
+def test_stream_beyond_the_cap_gets_503():
+    async def run():
+        registry = SSEStreamRegistry(keepalive_interval=30, max_connections=1)
+        open_stream = asyncio.create_task(serve(SSEStreamResponse(asyncio.Queue(), registry=registry)))
+        await asyncio.sleep(0)
+        closed = []
+
+        async def on_close():
+            closed.append(True)
+
+        refused = await serve(SSEStreamResponse(asyncio.Queue(), on_close=on_close, registry=registry))
+        count = registry.count
+        open_stream.cancel()
+        return count, refused, closed
+
+    count, refused, closed = asyncio.run(run())
+    assert count == 1
+    assert refused[0]["status"] == 503
+    assert closed == [True]
+
+
+def test_disconnect_ends_a_stream_with_a_full_queue():
+    async def run():
+        registry = SSEStreamRegistry(keepalive_interval=30, max_connections=1)
+        queue = asyncio.Queue(maxsize=1)
+        queue.put_nowait("one")
+        disconnected = asyncio.Event()
+        sent = []
+
+        async def receive():
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+            if message.get("body") and not disconnected.is_set():
+                # The producer fills the queue again, then the client goes away
+                queue.put_nowait("two")
+                disconnected.set()
+                await asyncio.sleep(0.01)
+
+        await asyncio.wait_for(SSEStreamResponse(queue, registry=registry)({"type": "http"}, receive, send), 1)
+        return registry.count, sent
+
+    count, sent = asyncio.run(run())
+    assert count == 0
+    assert [m["body"] for m in sent[1:]] == [b"data: one\n\n"]
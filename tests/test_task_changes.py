@@ -0,0 +1,69 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from taskhub_mcp.task_changes import TaskChangeFeed
+
+
+def test_changes_since_filters_and_resets():
+    async def run():
+        feed = TaskChangeFeed(buffer_size=3)
+        for task_id, status in (("a", "todo"), ("b", "todo"), ("a", "inprogress"), ("c", "todo")):
+            await feed.publish({"task_id": task_id, "status": status})
+        return feed
+
+    feed = asyncio.run(run())
+    assert feed.version == 4
+    assert [c["task_id"] for c in feed.changes_since(1)[0]] == ["b", "a", "c"]
+    assert [c["version"] for c in feed.changes_since(1, status="todo")[0]] == [2, 4]
+    assert [c["version"] for c in feed.changes_since(2, task_id="a")[0]] == [3]
+    assert feed.changes_since(4) == ([], False)
+    # Older than the buffer, or from before a restart
+    assert feed.changes_since(0) == ([], True)
+    assert feed.changes_since(5) == ([], True)
+
+
+def test_wait_wakes_on_a_matching_change():
+    async def run():
+        feed = TaskChangeFeed()
+        waiter = asyncio.create_task(feed.wait(status="done", timeout=5))
+        await asyncio.sleep(0.01)
+        await feed.publish({"task_id": "a", "status": "todo"})
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        await feed.publish({"task_id": "a", "status": "done"})
+        return await waiter
+
+    result = asyncio.run(run())
+    assert result["version"] == 2
+    assert [c["status"] for c in result["changes"]] == ["done"]
+    assert not result["timed_out"] and not result["reset"]
+
+
+def test_wait_times_out_and_sync_resets():
+    async def run():
+        feed = TaskChangeFeed()
+        timed_out = await feed.wait(timeout=0.01)
+        waiter = asyncio.create_task(feed.wait(since=0, task_id="a", timeout=5))
+        await asyncio.sleep(0.01)
+        await feed.on_event({"event": "tasks_synced", "data": {}})
+        return timed_out, await waiter
+
+    timed_out, synced = asyncio.run(run())
+    assert timed_out == {"version": 0, "changes": [], "timed_out": True, "reset": False}
+    assert synced["reset"] and synced["changes"] == []
+
+
+def test_wait_endpoint_returns_new_tasks(client, db):
+    version = client.get("/tasks/wait", params={"timeout": 0}).json()["version"]
+
+    with ThreadPoolExecutor(1) as pool:
+        waiting = pool.submit(client.get, "/tasks/wait", params={"since_version": version, "status": "todo", "timeout": 5})
+        task_id = client.post("/tasks/create", params={"title": "new work"}).json()["task"]["id"]
+        result = waiting.result(10).json()
+    assert [c["task_id"] for c in result["changes"]] == [task_id]
+    assert result["version"] > version
+
+    result = client.get("/tasks/wait", params={"since_version": result["version"], "timeout": 0.05}).json()
+    assert result["timed_out"]
+    assert client.get("/tasks/wait", params={"since_version": result["version"] + 10, "timeout": 1}).json()["reset"]
+    assert client.get("/tasks/wait", params={"timeout": -1}).status_code == 400
@@ -0,0 +1,33 @@
+import asyncio
+from pathlib import Path
+
+from taskhub_mcp.api.dependencies import get_executor
+
+
+def test_vanished_run_is_recorded_through_the_completion_path(client, db):
+    executor = get_executor()
+    finished = []
+
+    async def listener(record):
+        finished.append((record["execution_id"], record["status"]))
+
+    async def vanish(log_text):
+        task_id = (await asyncio.to_thread(
+            client.post, "/tasks/create", params={"title": "vanished run"}
+        )).json()["task"]["id"]
+        record = await executor.prepare_execution(task_id, "#!/bin/bash\necho hi\n", "native")
+        Path(record["log_file"]).write_text(log_text)
+        # Started by a server process that is gone; no one watches it
+        executor.registry.update(record["execution_id"], status="running", pid=None)
+        return record["execution_id"], await executor.get_execution_status(task_id)
+
+    executor.add_completion_listener(listener)
+    try:
+        exited, exited_status = client.portal.call(vanish, "hi\nExit code: 0\n")
+        killed, killed_status = client.portal.call(vanish, "hi\n")
+    finally:
+        executor._completion_listeners.remove(listener)
+
+    assert (exited_status["status"], exited_status["exit_code"]) == ("completed", 0)
+    assert (killed_status["status"], killed_status["exit_code"]) == ("failed", None)
+    assert finished == [(exited, "completed"), (killed, "failed")]
@@ -0,0 +1,53 @@
+import pytest
+
+from taskhub_mcp.dag_scheduler import select_tasks
+from taskhub_mcp.task_graph import TaskGraph
+
+
+def task(task_id, depends_on=None, status="todo"):
+    return {"id": task_id, "file_path": f"{task_id}.md", "status": status, "depends_on": depends_on}
+
+
+def test_dependencies_resolve_ids_and_file_paths():
+    graph = TaskGraph([task("a"), task("b", ["a"]), task("c", ["b.md", "a", "missing"])])
+    assert graph.dependencies == {"a": [], "b": ["a"], "c": ["b", "a"]}
+    assert graph.unknown == {"c": ["missing"]}
+    assert graph.dependents() == {"a": ["b", "c"], "b": ["c"], "c": []}
+    with pytest.raises(ValueError, match="Unknown task dependencies"):
+        graph.validate()
+
+
+def test_find_cycle():
+    assert TaskGraph([task("a"), task("b", ["a"])]).find_cycle() is None
+    graph = TaskGraph([task("a", ["c"]), task("b", ["a"]), task("c", ["b"]), task("d")])
+    cycle = graph.find_cycle()
+    assert cycle[0] == cycle[-1]
+    assert set(cycle) == {"a", "b", "c"}
+    with pytest.raises(ValueError, match="Dependency cycle"):
+        graph.validate()
+    assert TaskGraph([task("a", ["a"])]).find_cycle() == ["a", "a"]
+
+
+def test_closure_and_topological_order():
+    graph = TaskGraph([task("a"), task("b", ["a"]), task("c", ["b"]), task("d", ["a"]), task("e")])
+    assert graph.closure(["c"]) == {"a", "b", "c"}
+    assert graph.closure(["c"], skip={"a"}) == {"b", "c"}
+    order = graph.topological_order(["a", "b", "c", "d"])
+    assert order.index("a") < order.index("b") < order.index("c")
+    assert order.index("a") < order.index("d")
+
+
+def test_critical_path():
+    graph = TaskGraph([task("a"), task("b", ["a"]), task("c", ["a"]), task("d", ["b", "c"])])
+    path, seconds = graph.critical_path({"a": 1.0, "b": 5.0, "c": 2.0, "d": 1.0})
+    assert path == ["a", "b", "d"]
+    assert seconds == 7.0
+    assert graph.critical_path({}) == ([], 0.0)
+
+
+def test_select_tasks():
+    graph = TaskGraph([task("a", status="done"), task("b", ["a"]), task("c", ["b"]), task("d")])
+    assert select_tasks(graph, ["c"]) == {"b", "c"}
+    assert select_tasks(graph) == {"b", "c", "d"}
+    with pytest.raises(ValueError, match="Unknown tasks: x"):
+        select_tasks(graph, ["x"])
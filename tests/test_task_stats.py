@@ -0,0 +1,60 @@
+import asyncio
+
+from taskhub_mcp.api.dependencies import get_task_stats
+from taskhub_mcp.task_stats import TaskStats, count_tasks
+
+TASKS = [
+    {"id": "a", "status": "todo", "priority": "high", "assignee": None},
+    {"id": "b", "status": "inprogress", "priority": None, "assignee": "alice"},
+    {"id": "c", "status": "done", "priority": "high", "assignee": "alice"},
+]
+
+
+def test_count_tasks():
+    keys, by_status, by_priority, by_assignee = count_tasks(TASKS)
+    assert keys["b"] == ("inprogress", None, "alice")
+    assert by_status == {"todo": 1, "inprogress": 1, "done": 1}
+    assert by_priority == {"high": 2, "none": 1}
+    assert by_assignee == {"alice": 2, "unassigned": 1}
+
+
+def test_events_move_tasks_between_counters():
+    stats = TaskStats(lambda: TASKS, interval=0)
+    stats.load()
+    # Only the status changed; the priority and assignee carry over
+    stats.apply({"task_id": "a", "status": "inprogress"})
+    # A lease expired
+    stats.apply({"task_id": "b", "status": "todo", "previous_assignee": "alice"})
+    stats.apply({"task_id": "d", "status": "todo", "priority": "low", "assignee": "bob"})
+
+    snapshot = stats.snapshot()
+    assert snapshot["total"] == 4
+    assert snapshot["by_status"] == {"todo": 2, "inprogress": 1, "review": 0, "done": 1}
+    assert snapshot["by_priority"] == {"high": 2, "medium": 0, "low": 1, "none": 1}
+    assert snapshot["by_assignee"] == {"alice": 1, "unassigned": 2, "bob": 1}
+
+
+def test_reconcile_replaces_drifted_counters():
+    tasks = list(TASKS)
+    stats = TaskStats(lambda: tasks, interval=0)
+    stats.load()
+    assert not asyncio.run(stats.reconcile())
+
+    tasks.append({"id": "d", "status": "review"})
+    assert asyncio.run(stats.reconcile())
+    snapshot = stats.snapshot()
+    assert snapshot["by_status"]["review"] == 1
+    assert snapshot["corrections"] == 1
+
+
+def test_stats_endpoint_follows_task_changes(client, db):
+    client.portal.call(get_task_stats().reconcile)
+    task_id = client.post("/tasks/create", params={"title": "counted", "priority": "high"}).json()["task"]["id"]
+    client.post("/tasks/create", params={"title": "other", "assignee": "bob"})
+    client.put(f"/tasks/status/{task_id}", params={"new_status": "review", "assignee": "alice"})
+
+    stats = client.get("/tasks/stats").json()
+    assert stats["total"] == 2
+    assert stats["by_status"] == {"todo": 1, "inprogress": 0, "review": 1, "done": 0}
+    assert stats["by_priority"]["high"] == 1
+    assert stats["by_assignee"] == {"alice": 1, "bob": 1}
@@ -0,0 +1,59 @@
+import random
+
+from taskhub_mcp.timer_wheel import TimerWheel
+
+
+def test_fires_each_timer_once_at_its_tick():
+    wheel = TimerWheel(0, slots=4, levels=3)
+    deadlines = {"a": 1, "b": 3.5, "c": 5, "d": 17, "e": 63}
+    for key, deadline in deadlines.items():
+        wheel.schedule(key, deadline)
+
+    fired = {}
+    for now in range(70):
+        for key in wheel.advance(now):
+            fired[key] = now
+    # Deadlines are rounded up to the next tick
+    assert fired == {"a": 1, "b": 4, "c": 5, "d": 17, "e": 63}
+    assert len(wheel) == 0
+
+
+def test_matches_a_sorted_scan_with_random_deadlines():
+    rng = random.Random(0)
+    wheel = TimerWheel(0, slots=8, levels=3)
+    deadlines = {i: rng.randint(1, 2000) for i in range(500)}
+    for key, deadline in deadlines.items():
+        wheel.schedule(key, deadline)
+
+    fired = {}
+    now = 0
+    while now < 2100:
+        now += rng.randint(1, 40)
+        for key in wheel.advance(now):
+            fired[key] = now
+    for key, deadline in deadlines.items():
+        # Fired on the first advance that reached its deadline
+        assert deadline <= fired[key] < deadline + 41
+
+
+def test_reschedule_and_cancel():
+    wheel = TimerWheel(0)
+    wheel.schedule("a", 10)
+    wheel.schedule("b", 10)
+    wheel.schedule("a", 20)
+    assert wheel.cancel("b")
+    assert not wheel.cancel("b")
+    assert "a" in wheel and "b" not in wheel
+
+    assert wheel.advance(15) == []
+    assert wheel.advance(20) == ["a"]
+
+
+def test_past_and_far_deadlines():
+    wheel = TimerWheel(100, slots=4, levels=2)
+    wheel.schedule("past", 50)
+    # Beyond the 16 ticks the wheel covers
+    wheel.schedule("far", 200)
+    assert wheel.advance(100) == ["past"]
+    assert wheel.advance(199) == []
+    assert wheel.advance(200) == ["far"]
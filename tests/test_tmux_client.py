@@ -0,0 +1,92 @@
+import asyncio
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from taskhub_mcp import tmux_client as tmux_module
+from taskhub_mcp.tmux_client import TmuxClient, quote_argument
+
+
+def test_quote_argument():
+    assert quote_argument("plain") == '"plain"'
+    assert quote_argument('say "hi" to $USER\\') == '"say \\"hi\\" to \\$USER\\\\"'
+
+
+def test_line_breaks_bypass_control_mode(monkeypatch):
+    client = TmuxClient(control_mode=True)
+    calls = []
+
+    async def ensure_control():
+        raise AssertionError("sent over control mode")
+
+    class Process:
+        returncode = 0
+
+        async def communicate(self):
+            return b"ok\n", b""
+
+    async def create_subprocess_exec(*args, **kwargs):
+        calls.append(args)
+        return Process()
+
+    monkeypatch.setattr(client, "_ensure_control", ensure_control)
+    monkeypatch.setattr(tmux_module.asyncio, "create_subprocess_exec", create_subprocess_exec)
+
+    for value in ("a\nb", "a\rb"):
+        assert asyncio.run(client.run("new-session", "-d", "-s", "x", value)) == (True, ["ok"])
+    assert [call[-1] for call in calls] == ["a\nb", "a\rb"]
+
+
+def tmux_server_running(socket_name):
+    return subprocess.run(["tmux", "-L", socket_name, "list-sessions"], capture_output=True).returncode == 0
+
+
+@pytest.mark.skipif(shutil.which("tmux") is None, reason="tmux is not installed")
+def test_line_breaks_reach_tmux_intact():
+    # A server of its own, so no other tmux client can interfere
+    socket_name = f"taskhub-test-{os.getpid()}"
+
+    async def run():
+        client = TmuxClient(control_mode=True, socket_name=socket_name)
+        try:
+            # Starts the server; a command sent without control mode needs one running
+            ready = await client.run("display-message", "-p", "ready")
+            stored = await client.run("set-environment", "-g", "TASKHUB_TEST_VALUE", "first\ndisplay-message -p second")
+            value = await client.run("show-environment", "-g", "TASKHUB_TEST_VALUE")
+            following = [await client.run("display-message", "-p", str(i)) for i in range(3)]
+        finally:
+            await client.close()
+        return ready, stored, value, following
+
+    try:
+        ready, stored, value, following = asyncio.run(run())
+        assert ready == (True, ["ready"])
+        assert stored == (True, [])
+        assert value == (True, ["TASKHUB_TEST_VALUE=first", "display-message -p second"])
+        assert following == [(True, [str(i)]) for i in range(3)]
+        # Closing killed the control session, and with it the server
+        assert not tmux_server_running(socket_name)
+    finally:
+        subprocess.run(["tmux", "-L", socket_name, "kill-server"], capture_output=True)
+
+
+@pytest.mark.skipif(shutil.which("tmux") is None, reason="tmux is not installed")
+def test_close_waits_for_the_control_connection():
+    socket_name = f"taskhub-test-close-{os.getpid()}"
+
+    async def run():
+        client = TmuxClient(control_mode=True, socket_name=socket_name)
+        await client.run("display-message", "-p", "ready")
+        proc, reader = client._proc, client._reader
+        await client.close()
+        return proc, reader
+
+    try:
+        proc, reader = asyncio.run(run())
+        # Nothing is left for the garbage collector once the event loop closes
+        assert proc.returncode is not None
+        assert reader.done() and not reader.cancelled()
+    finally:
+        subprocess.run(["tmux", "-L", socket_name, "kill-server"], capture_output=True)